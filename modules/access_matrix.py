@@ -0,0 +1,250 @@
+"""
+Модуль матрицы доступа АРМ к учреждениям (DB_ConnectLEtoARM.csv).
+Матрица IP x ИНН хранится упакованной по битам (numpy.packbits, 8 флагов в байте) с хеш-индексами
+IP и ИНН, что позволяет отвечать на запросы по строке (к каким учреждениям есть доступ у АРМ),
+по столбцу (какие АРМ имеют доступ к учреждению) и сравнивать два снимка матрицы целиком.
+Разобранная матрица кэшируется рядом с CSV (файл '<имя>.csv.access.npz') и пересобирается
+при изменении размера или времени изменения CSV-файла.
+
+Запуск для администраторов:
+    python -m modules.access_matrix <DB_ConnectLEtoARM.csv> --ip 10.0.0.1
+    python -m modules.access_matrix <DB_ConnectLEtoARM.csv> --inn 7700000000
+    python -m modules.access_matrix <новый.csv> --diff <старый.csv>
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    # Установка без NumPy (бэкенд csv в data_handler): доступны только функции пути кэша
+    np = None
+
+from settings import MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_ERROR
+from .main_functions import write_log
+
+# --- НАСТРОЙКИ ---
+# Расширение файла кэша матрицы
+CACHE_SUFFIX = ".access.npz"
+# Версия формата кэша
+CACHE_VERSION = 1
+# Столбец с IP-адресом АРМ
+IP_COLUMN = "IPaddress"
+# Значения, означающие наличие доступа (без учёта регистра)
+TRUE_VALUES = ("true", "1", "yes")
+# Строк CSV в одном блоке разбора (ограничивает память под массив строк блока)
+PARSE_BLOCK_ROWS = 1024
+# --- /НАСТРОЙКИ ---
+
+
+def cache_path(csv_path: str) -> str:
+    """Путь к файлу кэша матрицы для CSV-файла csv_path."""
+    return csv_path + CACHE_SUFFIX
+
+
+def is_cache_file(path: str) -> bool:
+    """Путь — файл кэша матрицы доступа."""
+    return path.endswith(CACHE_SUFFIX)
+
+
+class AccessMatrix:
+    """
+    Матрица доступа IP x ИНН, упакованная по битам.
+    bits — массив uint8 формы (число IP, ceil(число ИНН / 8)), биты в порядке numpy.packbits.
+    """
+
+    __slots__ = ("ips", "inns", "bits", "_ip_index", "_inn_index")
+
+    def __init__(self, ips: list[str], inns: list[str], bits: np.ndarray):
+        self.ips = list(ips)
+        self.inns = list(inns)
+        self.bits = bits
+        # При повторе IP действует первая строка (как и при поиске по CSV)
+        self._ip_index: dict[str, int] = {}
+        for i, ip in enumerate(self.ips):
+            self._ip_index.setdefault(ip, i)
+        self._inn_index = {inn: j for j, inn in enumerate(self.inns)}
+
+    def __len__(self):
+        return len(self.ips)
+
+    def __contains__(self, ip: str) -> bool:
+        return ip in self._ip_index
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.ips), len(self.inns)
+
+    def to_bool(self) -> np.ndarray:
+        """Распакованная матрица bool формы (число IP, число ИНН)."""
+        return np.unpackbits(self.bits, axis=1, count=len(self.inns)).astype(bool)
+
+    # --- ЗАПРОСЫ ---
+    def row(self, ip: str) -> np.ndarray:
+        """Флаги доступа АРМ ip ко всем учреждениям (в порядке inns)."""
+        return np.unpackbits(self.bits[self._ip_index[ip]], count=len(self.inns)).astype(bool)
+
+    def column(self, inn: str) -> np.ndarray:
+        """Флаги доступа всех АРМ (в порядке ips) к учреждению inn."""
+        j = self._inn_index[inn]
+        return ((self.bits[:, j >> 3] >> (7 - (j & 7))) & 1).astype(bool)
+
+    def inns_for_ip(self, ip: str) -> list[str]:
+        """ИНН учреждений, к которым у АРМ ip есть доступ (пустой список, если IP нет в матрице)."""
+        if ip not in self._ip_index:
+            return []
+        return [self.inns[j] for j in np.flatnonzero(self.row(ip))]
+
+    def ips_for_inn(self, inn: str) -> list[str]:
+        """IP-адреса АРМ, имеющих доступ к учреждению inn (пустой список, если ИНН нет в матрице)."""
+        if inn not in self._inn_index:
+            return []
+        return [self.ips[i] for i in np.flatnonzero(self.column(inn))]
+
+    def reindex(self, ips: list[str], inns: list[str]) -> np.ndarray:
+        """
+        Упакованная матрица в порядке ips x inns: отсутствующие в этой матрице IP и ИНН
+        дают нулевые флаги.
+        """
+        rows = np.array([self._ip_index.get(ip, -1) for ip in ips], dtype=np.int64)
+        cols = np.array([self._inn_index.get(inn, -1) for inn in inns], dtype=np.int64)
+        result = np.zeros((len(ips), len(inns)), dtype=bool)
+        rows_present, cols_present = np.flatnonzero(rows >= 0), np.flatnonzero(cols >= 0)
+        result[np.ix_(rows_present, cols_present)] = self.to_bool()[np.ix_(rows[rows_present], cols[cols_present])]
+        return np.packbits(result, axis=1)
+
+    def diff(self, old: "AccessMatrix") -> dict:
+        """
+        Сравнивает матрицу со старым снимком old (по объединению IP и ИНН обоих снимков).
+
+        Returns:
+            Словарь: granted и revoked — списки пар (IP, ИНН), где доступ появился и пропал.
+        """
+        ips = list(dict.fromkeys(self.ips + old.ips))
+        inns = list(dict.fromkeys(self.inns + old.inns))
+        new_bits, old_bits = self.reindex(ips, inns), old.reindex(ips, inns)
+        result = {}
+        for name, bits in (("granted", new_bits & ~old_bits), ("revoked", old_bits & ~new_bits)):
+            changed_rows = np.flatnonzero(bits.any(axis=1))
+            rows, cols = np.nonzero(np.unpackbits(bits[changed_rows], axis=1, count=len(inns)))
+            result[name] = [(ips[changed_rows[i]], inns[j]) for i, j in zip(rows, cols)]
+        return result
+    # --- /ЗАПРОСЫ ---
+
+    # --- ЗАГРУЗКА И СОХРАНЕНИЕ ---
+    @classmethod
+    def from_csv(cls, csv_path: str, skiprows: int = 1) -> "AccessMatrix":
+        """
+        Разбирает DB_ConnectLEtoARM.csv (первые skiprows строк — служебные): столбец IPaddress
+        и столбцы ИНН со значениями True/False.
+        """
+        with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+            for _ in range(skiprows):
+                f.readline()
+            reader = csv.reader(f)
+            header = next(reader)
+            width = len(header)
+            ip_position = header.index(IP_COLUMN)
+            inn_positions = np.array([j for j in range(width) if j != ip_position], dtype=np.intp)
+            ips, blocks, block = [], [], []
+            for row in reader:
+                if not row:
+                    continue
+                ips.append(row[ip_position])
+                # Короткие строки дополняются пустыми ячейками (нет доступа)
+                block.append(row[:width] if len(row) >= width else row + [""] * (width - len(row)))
+                if len(block) == PARSE_BLOCK_ROWS:
+                    blocks.append(cls._pack_block(block, inn_positions))
+                    block = []
+            if block:
+                blocks.append(cls._pack_block(block, inn_positions))
+        inns = [header[j] for j in inn_positions]
+        bits = np.vstack(blocks) if blocks else np.zeros((0, (len(inns) + 7) // 8), dtype=np.uint8)
+        return cls(ips, inns, bits)
+
+    @staticmethod
+    def _pack_block(block: list[list[str]], inn_positions: np.ndarray) -> np.ndarray:
+        """
+        Упакованные флаги доступа блока строк CSV (одинаковой длины) по столбцам inn_positions.
+        Обычные значения (True, False, пусто) сравниваются с массивом целиком; пробелы и другой
+        регистр нормализуются только в остальных ячейках.
+        """
+        cells = np.array(block, dtype=str)[:, inn_positions]
+        flags = cells == "True"
+        irregular = ~(flags | (cells == "False") | (cells == ""))
+        if irregular.any():
+            flags[irregular] = np.isin(np.char.lower(np.char.strip(cells[irregular])), TRUE_VALUES)
+        return np.packbits(flags, axis=1)
+
+    def save(self, path: str, csv_size: int = -1, csv_mtime_ns: int = -1):
+        """Сохраняет матрицу в сжатый .npz (атомарно, через временный файл)."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, version=np.int64(CACHE_VERSION), ips=np.array(self.ips, dtype=str),
+                                inns=np.array(self.inns, dtype=str), bits=self.bits,
+                                csv_size=np.int64(csv_size), csv_mtime_ns=np.int64(csv_mtime_ns))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_npz(cls, path: str) -> tuple["AccessMatrix", dict]:
+        """Читает матрицу из .npz; вторым значением возвращаются сведения о CSV-источнике."""
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != CACHE_VERSION:
+                raise ValueError(f"Неподдерживаемая версия кэша матрицы доступа: {int(data['version'])}.")
+            meta = {"csv_size": int(data["csv_size"]), "csv_mtime_ns": int(data["csv_mtime_ns"])}
+            return cls(data["ips"].tolist(), data["inns"].tolist(), data["bits"]), meta
+
+    @classmethod
+    def load(cls, csv_path: str, skiprows: int = 1) -> "AccessMatrix":
+        """
+        Матрица доступа для CSV-файла: из кэша рядом с файлом, если он актуален,
+        иначе разбирает CSV и обновляет кэш.
+        """
+        stat = os.stat(csv_path)
+        path = cache_path(csv_path)
+        if os.path.exists(path):
+            try:
+                matrix, meta = cls.load_npz(path)
+                if meta["csv_size"] == stat.st_size and meta["csv_mtime_ns"] == stat.st_mtime_ns:
+                    return matrix
+            except Exception as e:
+                write_log(f"[access_matrix] Кэш '{path}' не прочитан ({e}), матрица строится заново.",
+                          MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+
+        matrix = cls.from_csv(csv_path, skiprows)
+        matrix.save(path, stat.st_size, stat.st_mtime_ns)
+        write_log(f"[access_matrix] Матрица доступа '{csv_path}' построена: IP {len(matrix.ips)}, "
+                  f"ИНН {len(matrix.inns)}, кэш '{path}' ({os.path.getsize(path)} байт).",
+                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+        return matrix
+    # --- /ЗАГРУЗКА И СОХРАНЕНИЕ ---
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Запросы к матрице доступа DB_ConnectLEtoARM.csv ElOrgEDS.")
+    parser.add_argument("csv_path", help="путь к DB_ConnectLEtoARM.csv")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--ip", help="учреждения, доступные АРМ с этим IP-адресом")
+    group.add_argument("--inn", help="АРМ, имеющие доступ к учреждению с этим ИНН")
+    group.add_argument("--diff", metavar="OLD_CSV", help="изменения доступа относительно старого снимка")
+    args = parser.parse_args()
+
+    matrix = AccessMatrix.load(args.csv_path)
+    if args.ip:
+        print("\n".join(matrix.inns_for_ip(args.ip)))
+    elif args.inn:
+        print("\n".join(matrix.ips_for_inn(args.inn)))
+    else:
+        changes = matrix.diff(AccessMatrix.load(args.diff))
+        for ip, inn in changes["granted"]:
+            print(f"+ {ip} {inn}")
+        for ip, inn in changes["revoked"]:
+            print(f"- {ip} {inn}")
+
+
+if __name__ == "__main__":
+    main()
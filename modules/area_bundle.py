@@ -0,0 +1,267 @@
+"""
+Модуль пакетов областей (bundle) для общей сетевой папки.
+На стороне публикации каждая папка области упаковывается в один архив tar.gz с манифестом
+(папка '.bundles' в корне общей папки); клиент скачивает архив одним последовательным
+чтением и распаковывает его локально вместо тысяч отдельных обращений к мелким файлам по CIFS.
+
+Запуск на стороне публикации (после каждого изменения папок областей, например по расписанию):
+    python -m modules.area_bundle <путь к общей папке> [область ...]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tarfile
+import time
+from datetime import datetime
+
+from settings import MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_ERROR
+from . import delta_sync
+from .incremental_sync import PathFilter, scan_tree
+from .main_functions import write_log
+
+# --- НАСТРОЙКИ ---
+# Папка пакетов в корне общей папки
+BUNDLE_DIR_NAME = ".bundles"
+# Версия формата манифеста пакета
+BUNDLE_VERSION = 1
+# Уровень сжатия gzip (zstd в стандартной библиотеке отсутствует)
+BUNDLE_COMPRESSLEVEL = 6
+# Размер блока чтения при скачивании пакета
+DOWNLOAD_CHUNK_BYTES = 8 * 1024 * 1024
+# Файл состояния распакованного пакета в локальной папке области
+STATE_FILE_NAME = ".bundle_state.json"
+# --- /НАСТРОЙКИ ---
+
+
+def bundle_path(share_root: str, area: str) -> str:
+    """Путь к архиву пакета области."""
+    return os.path.join(share_root, BUNDLE_DIR_NAME, f"{area}.tar.gz")
+
+
+def bundle_manifest_path(share_root: str, area: str) -> str:
+    """Путь к манифесту пакета области."""
+    return os.path.join(share_root, BUNDLE_DIR_NAME, f"{area}.json")
+
+
+def has_bundle(share_root: str, area: str) -> bool:
+    """Для области опубликован пакет."""
+    return os.path.exists(bundle_manifest_path(share_root, area))
+
+
+def _read_json(path: str) -> dict | None:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, body: dict):
+    """Атомарная запись JSON (через временный файл и os.replace)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(body, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+# --- ПУБЛИКАЦИЯ ---
+def pack_area(share_root: str, area: str, force: bool = False) -> bool:
+    """
+    Упаковывает папку области share_root/area в '.bundles/<area>.tar.gz' и записывает манифест.
+    Если содержимое папки (пути, размеры, время изменения) не изменилось с прошлой упаковки,
+    пакет не пересобирается.
+
+    Returns:
+        True — пакет пересобран, False — пропущен как неизменённый.
+    """
+    area_root = os.path.join(share_root, area)
+    files, dirs = scan_tree(area_root)
+    # Файлы-спутники delta_sync в пакет не включаются
+    listing = {rel_path: list(meta) for rel_path, meta in sorted(files.items()) if not delta_sync.is_sidecar(rel_path)}
+    manifest_file = bundle_manifest_path(share_root, area)
+    old_manifest = _read_json(manifest_file)
+    if (not force and old_manifest and old_manifest.get("version") == BUNDLE_VERSION
+            and old_manifest.get("files") == listing and os.path.exists(bundle_path(share_root, area))):
+        return False
+
+    os.makedirs(os.path.join(share_root, BUNDLE_DIR_NAME), exist_ok=True)
+    archive = bundle_path(share_root, area)
+    tmp_archive = archive + ".tmp"
+    digest = hashlib.sha256()
+    try:
+        with open(tmp_archive, 'wb') as raw:
+            with tarfile.open(fileobj=raw, mode='w:gz', compresslevel=BUNDLE_COMPRESSLEVEL) as tar:
+                for rel_dir in sorted(dirs):
+                    tar.add(os.path.join(area_root, rel_dir), arcname=rel_dir, recursive=False)
+                for rel_path in listing:
+                    tar.add(os.path.join(area_root, rel_path), arcname=rel_path, recursive=False)
+        with open(tmp_archive, 'rb') as f:
+            for block in iter(lambda: f.read(DOWNLOAD_CHUNK_BYTES), b""):
+                digest.update(block)
+        os.replace(tmp_archive, archive)
+    except BaseException:
+        if os.path.exists(tmp_archive):
+            os.remove(tmp_archive)
+        raise
+
+    # Манифест записывается после архива: клиент, увидевший новый манифест, получит и новый архив
+    _write_json(manifest_file, {
+        "version": BUNDLE_VERSION,
+        "area": area,
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "bundle_size": os.path.getsize(archive),
+        "bundle_sha256": digest.hexdigest(),
+        "files": listing,
+    })
+    write_log(f"[area_bundle] Пакет области '{area}' собран: файлов {len(listing)}, "
+              f"размер {os.path.getsize(archive)} байт.", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+    return True
+
+
+def pack_share(share_root: str, areas: list[str] | None = None, force: bool = False) -> dict:
+    """
+    Упаковывает папки областей общей папки (по умолчанию — все папки верхнего уровня)
+    и удаляет пакеты областей, которых больше нет.
+
+    Returns:
+        Словарь {область: True — пересобран / False — не изменился}.
+    """
+    all_areas = sorted(entry.name for entry in os.scandir(share_root)
+                       if entry.is_dir() and entry.name != BUNDLE_DIR_NAME and not entry.name.startswith("."))
+    result = {area: pack_area(share_root, area, force) for area in (areas or all_areas)}
+
+    bundle_dir = os.path.join(share_root, BUNDLE_DIR_NAME)
+    if not areas and os.path.isdir(bundle_dir):
+        for name in os.listdir(bundle_dir):
+            # Удаляются только архивы и манифесты: временные файлы параллельной упаковки не трогаем
+            if name.endswith(".tar.gz"):
+                area = name[:-len(".tar.gz")]
+            elif name.endswith(".json"):
+                area = name[:-len(".json")]
+            else:
+                continue
+            if area not in all_areas:
+                os.remove(os.path.join(bundle_dir, name))
+    return result
+# --- /ПУБЛИКАЦИЯ ---
+
+
+# --- ПОЛУЧЕНИЕ ---
+def _safe_member(member: tarfile.TarInfo) -> bool:
+    """Элемент архива — обычный файл или папка с относительным путём внутри области."""
+    name = member.name
+    return ((member.isfile() or member.isdir()) and not name.startswith(("/", "\\"))
+            and ".." not in name.replace("\\", "/").split("/"))
+
+
+def _extract(archive: str, target_root: str, area: str, include: PathFilter | None) -> int:
+    """Распаковывает архив области в target_root, пропуская элементы, отклонённые include."""
+    files = 0
+    with tarfile.open(archive, mode='r:gz') as tar:
+        for member in tar:
+            if not _safe_member(member):
+                raise ValueError(f"[area_bundle] Недопустимый элемент архива: '{member.name}'.")
+            if include is not None:
+                parts = member.name.split("/")
+                # Фильтр применяется к пути от корня общей папки; элемент отклоняется вместе с родителями
+                if not all(include("/".join([area, *parts[:i + 1]]), member.isdir() or i < len(parts) - 1)
+                           for i in range(len(parts))):
+                    continue
+            path = os.path.join(target_root, *member.name.split("/"))
+            if member.isdir():
+                os.makedirs(path, exist_ok=True)
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with tar.extractfile(member) as src, open(path, 'wb') as dst:
+                shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK_BYTES)
+            os.utime(path, (member.mtime, member.mtime))
+            files += 1
+    return files
+
+
+def sync_area_bundle(share_root: str, area: str, dst_root: str, include: PathFilter | None = None,
+                     include_key: str = "", force: bool = False) -> dict:
+    """
+    Получает область из пакета: если манифест пакета (и ключ фильтра include_key) не изменились
+    с прошлой распаковки, скачивание пропускается; иначе архив скачивается одним
+    последовательным чтением, проверяется по SHA-256 и распаковывается на место папки области.
+
+    Args:
+        share_root: Общая сетевая папка.
+        area: Имя области (папки).
+        dst_root: Локальная папка (область распаковывается в dst_root/area).
+        include: Фильтр элементов (путь от корня общей папки), как в incremental_sync.sync_tree.
+        include_key: Строка, описывающая фильтр (при её изменении пакет распаковывается заново).
+        force: Скачать и распаковать пакет, даже если он не изменился.
+
+    Returns:
+        Словарь: downloaded, files, bytes, seconds.
+    """
+    start = time.perf_counter()
+    manifest = _read_json(bundle_manifest_path(share_root, area))
+    if not manifest or manifest.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"[area_bundle] Манифест пакета области '{area}' отсутствует или неподдерживаемой версии.")
+
+    area_root = os.path.join(dst_root, area)
+    state = {"bundle_sha256": manifest["bundle_sha256"], "include_key": include_key}
+    if not force and _read_json(os.path.join(area_root, STATE_FILE_NAME)) == state:
+        write_log(f"[area_bundle] Пакет области '{area}' не изменился, скачивание пропущено.",
+                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+        return {"downloaded": False, "files": 0, "bytes": 0, "seconds": time.perf_counter() - start}
+
+    tmp_archive = os.path.join(dst_root, f".{area}.tar.gz.tmp")
+    tmp_root = os.path.join(dst_root, f".{area}.bundle.tmp")
+    old_root = os.path.join(dst_root, f".{area}.bundle.old")
+    try:
+        # 1. Скачиваем архив одним последовательным чтением и проверяем контрольную сумму
+        digest = hashlib.sha256()
+        with open(bundle_path(share_root, area), 'rb', buffering=0) as src, open(tmp_archive, 'wb') as dst:
+            for block in iter(lambda: src.read(DOWNLOAD_CHUNK_BYTES), b""):
+                dst.write(block)
+                digest.update(block)
+        if digest.hexdigest() != manifest["bundle_sha256"]:
+            raise ValueError(f"[area_bundle] Контрольная сумма пакета области '{area}' не совпадает с манифестом "
+                             f"(пакет пересобирается или повреждён).")
+
+        # 2. Распаковываем во временную папку и подменяем папку области
+        shutil.rmtree(tmp_root, ignore_errors=True)
+        os.makedirs(tmp_root)
+        files = _extract(tmp_archive, tmp_root, area, include)
+        _write_json(os.path.join(tmp_root, STATE_FILE_NAME), state)
+        shutil.rmtree(old_root, ignore_errors=True)
+        if os.path.exists(area_root):
+            os.replace(area_root, old_root)
+        os.replace(tmp_root, area_root)
+        shutil.rmtree(old_root, ignore_errors=True)
+    except Exception as e:
+        shutil.rmtree(tmp_root, ignore_errors=True)
+        write_log(f"[area_bundle] Ошибка получения пакета области '{area}': {e}",
+                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+        raise
+    finally:
+        if os.path.exists(tmp_archive):
+            os.remove(tmp_archive)
+
+    result = {"downloaded": True, "files": files, "bytes": manifest["bundle_size"],
+              "seconds": time.perf_counter() - start}
+    write_log(f"[area_bundle] Пакет области '{area}' получен за {result['seconds']:.2f} с: "
+              f"{result['bytes']} байт, распаковано файлов {files}.", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+    return result
+# --- /ПОЛУЧЕНИЕ ---
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Упаковка папок областей общей папки ElOrgEDS в пакеты.")
+    parser.add_argument("share_root", help="путь к общей папке")
+    parser.add_argument("areas", nargs="*", help="области для упаковки (по умолчанию — все)")
+    parser.add_argument("--force", action="store_true", help="пересобрать пакеты даже без изменений")
+    args = parser.parse_args()
+    for area, rebuilt in pack_share(args.share_root, args.areas or None, args.force).items():
+        print(f"{area}: {'пересобран' if rebuilt else 'без изменений'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+"""
+Модуль бенчмарков горячих путей шифрования и работы с CSV.
+Запуск из корня проекта:
+    python -m modules.benchmark                                   — микро-бенчмарки
+    python -m modules.benchmark --suite results.json              — набор на синтетических данных
+    python -m modules.benchmark --suite new.json --compare old.json — сравнение с прошлым прогоном
+    python -m modules.benchmark --check-startup                   — проверка импорта при запуске (код
+                                                                    возврата 1, если загружаются отложенные пакеты)
+"""
+
+import argparse
+import binascii
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+from . import crypto, data_handler, main_functions
+
+
+def synthetic_table(rows: int, columns: int) -> list[dict]:
+    """Формирует таблицу rows x columns со строковыми значениями (как строки CSV)."""
+    return [{f"Col{j}": f"value-{i}-{j}" for j in range(columns)} for i in range(rows)]
+
+
+def bench_codec_per_cell(cells: int = 100_000, columns: int = 10) -> dict:
+    """
+    Сравнивает стоимость ячейки при поштучном шифровании/дешифровании
+    (func_EncryptText_NEW/func_DecryptText_NEW в цикле) и при пакетной обработке
+    func_EncryptArray_NEW/func_DecryptArray_NEW через AesCbcCodec.
+
+    Returns:
+        Словарь с временем на ячейку в микросекундах.
+    """
+    key = os.urandom(32)
+    table = synthetic_table(cells // columns, columns)
+    values = [value for row in table for value in row.values()]
+
+    start = time.perf_counter()
+    encrypted_values = [crypto.func_EncryptText_NEW(value, key) for value in values]
+    encrypt_per_cell = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for value in encrypted_values:
+        crypto.func_DecryptText_NEW(value, key)
+    decrypt_per_cell = time.perf_counter() - start
+
+    start = time.perf_counter()
+    encrypted_table = crypto.func_EncryptArray_NEW(table, key)
+    encrypt_bulk = time.perf_counter() - start
+
+    start = time.perf_counter()
+    crypto.func_DecryptArray_NEW(encrypted_table, key)
+    decrypt_bulk = time.perf_counter() - start
+
+    count = len(values)
+    return {
+        "cells": count,
+        "encrypt_per_cell_us": encrypt_per_cell / count * 1e6,
+        "decrypt_per_cell_us": decrypt_per_cell / count * 1e6,
+        "encrypt_bulk_us": encrypt_bulk / count * 1e6,
+        "decrypt_bulk_us": decrypt_bulk / count * 1e6,
+    }
+
+
+def _peak_memory(func, *args) -> int:
+    """Пиковый прирост памяти (байт) при вызове func, по данным tracemalloc."""
+    tracemalloc.start()
+    try:
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_dataframe_memory(rows: int = 20_000, columns: int = 30) -> dict:
+    """
+    Сравнивает пиковую память дешифрования широкой таблицы: через список словарей
+    (to_dict -> func_DecryptArray_NEW -> DataFrame) и постолбцово (decrypt_dataframe).
+
+    Returns:
+        Словарь с пиковым приростом памяти в мегабайтах.
+    """
+    key = os.urandom(32)
+    df_encrypted = data_handler.encrypt_dataframe(pd.DataFrame(synthetic_table(rows, columns)), key)
+
+    def records_path(df):
+        return pd.DataFrame(crypto.func_DecryptArray_NEW(df.to_dict('records'), key))
+
+    def columns_path(df):
+        return data_handler.decrypt_dataframe(df, key, workers=1)
+
+    return {
+        "rows": rows,
+        "columns": columns,
+        "records_peak_mb": _peak_memory(records_path, df_encrypted.copy()) / 2 ** 20,
+        "columns_peak_mb": _peak_memory(columns_path, df_encrypted.copy()) / 2 ** 20,
+    }
+
+
+def bench_table_formats(rows: int = 10_000) -> dict:
+    """
+    Сравнивает размер и время чтения DB_ConnectLEtoARM-подобной таблицы в поячеечном
+    CSV (v1) и в контейнере table_container (v2).
+    """
+    key = os.urandom(32)
+    df = synthetic_db_connect(rows)
+    result = {"rows": rows, "plain_csv_bytes": len(df.to_csv(index=False).encode('utf-8'))}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for version in (1, 2):
+            path = os.path.join(tmp_dir, f"table_v{version}")
+            data_handler.write_encrypted_csv(df, path, key, format_version=version)
+            crypto.decrypt_cache.clear()
+            start = time.perf_counter()
+            data_handler.read_encrypted_csv(path, key)
+            result[f"v{version}_read_s"] = time.perf_counter() - start
+            result[f"v{version}_bytes"] = os.path.getsize(path)
+    return result
+
+
+def bench_bytes_api(cells: int = 100_000, payload_mb: int = 8) -> dict:
+    """
+    Сравнивает строковые функции (func_EncryptText_NEW/func_DecryptText_NEW, Base64 + UTF-8)
+    и байтовый API кодека (encrypt_bytes/decrypt_into) на мелких ячейках и на одном
+    многомегабайтном буфере.
+
+    Returns:
+        Словарь: время на ячейку в микросекундах и пропускная способность в МБ/с.
+    """
+    key = os.urandom(32)
+    codec = crypto.get_codec(key)
+    results = {"cells": cells, "payload_mb": payload_mb}
+
+    # Мелкие ячейки
+    text_values = [f"10.0.{i // 256}.{i % 256}" for i in range(cells)]
+    byte_values = [value.encode('utf-8') for value in text_values]
+
+    start = time.perf_counter()
+    encrypted_texts = [crypto.func_EncryptText_NEW(value, key) for value in text_values]
+    results["text_encrypt_cell_us"] = (time.perf_counter() - start) / cells * 1e6
+    start = time.perf_counter()
+    for value in encrypted_texts:
+        crypto.func_DecryptText_NEW(value, key)
+    results["text_decrypt_cell_us"] = (time.perf_counter() - start) / cells * 1e6
+
+    # Доля декодирования Base64 (по значению) в пакетном дешифровании AesCbcCodec.decrypt_many
+    start = time.perf_counter()
+    codec.decrypt_many(encrypted_texts)
+    results["many_decrypt_cell_us"] = (time.perf_counter() - start) / cells * 1e6
+    start = time.perf_counter()
+    for value in encrypted_texts:
+        binascii.a2b_base64(value)
+    results["base64_decode_cell_us"] = (time.perf_counter() - start) / cells * 1e6
+    results["base64_decode_share"] = results["base64_decode_cell_us"] / results["many_decrypt_cell_us"]
+
+    start = time.perf_counter()
+    encrypted_bytes = [codec.encrypt_bytes(value) for value in byte_values]
+    results["bytes_encrypt_cell_us"] = (time.perf_counter() - start) / cells * 1e6
+    out = bytearray(max(len(value) for value in encrypted_bytes))
+    start = time.perf_counter()
+    for value in encrypted_bytes:
+        codec.decrypt_into(value, out)
+    results["bytes_decrypt_cell_us"] = (time.perf_counter() - start) / cells * 1e6
+
+    # Многомегабайтный буфер
+    payload = os.urandom(payload_mb * 2 ** 20)
+    payload_text = payload.hex()[:len(payload)]
+
+    start = time.perf_counter()
+    encrypted_text = crypto.func_EncryptText_NEW(payload_text, key)
+    results["text_encrypt_mb_s"] = payload_mb / (time.perf_counter() - start)
+    start = time.perf_counter()
+    crypto.func_DecryptText_NEW(encrypted_text, key)
+    results["text_decrypt_mb_s"] = payload_mb / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    encrypted_payload = codec.encrypt_bytes(payload)
+    results["bytes_encrypt_mb_s"] = payload_mb / (time.perf_counter() - start)
+    out = bytearray(len(encrypted_payload))
+    start = time.perf_counter()
+    codec.decrypt_into(encrypted_payload, out)
+    results["bytes_decrypt_mb_s"] = payload_mb / (time.perf_counter() - start)
+    return results
+
+
+def bench_csv_backends(sizes: tuple[int, ...] = (1_000, 100_000)) -> dict:
+    """
+    Сравнивает бэкенды pandas и csv (data_handler.CSV_BACKEND) на DB_InfoARM-подобных файлах
+    размеров sizes: полное чтение записями и поиск строки по IPaddress в конце файла.
+    Результаты обоих бэкендов сверяются.
+    """
+    key = os.urandom(32)
+    backend = data_handler.CSV_BACKEND
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for rows in sizes:
+                path = os.path.join(tmp_dir, f"DB_InfoARM_{rows}.csv")
+                write_synthetic_csv(synthetic_db_info_arm(rows), path, key)
+                last_ip = f"10.{(rows - 1) // 65536 % 256}.{(rows - 1) // 256 % 256}.{(rows - 1) % 256}"
+                operations = {
+                    "read": lambda: data_handler.read_encrypted_records(path, key),
+                    "find": lambda: data_handler.find_encrypted_csv_records(path, key, "IPaddress", last_ip,
+                                                                            columns=["AreaApp"]),
+                }
+                for operation, func in operations.items():
+                    outputs = {}
+                    for name in ("pandas", "csv"):
+                        data_handler.CSV_BACKEND = name
+                        crypto.decrypt_cache.clear()
+                        start = time.perf_counter()
+                        outputs[name] = func()
+                        results[f"{rows}_{operation}_{name}_s"] = time.perf_counter() - start
+                    results[f"{rows}_{operation}_equal"] = outputs["pandas"] == outputs["csv"]
+    finally:
+        data_handler.CSV_BACKEND = backend
+    return results
+
+
+def bench_write_log(calls: int = 100_000, error_every: int = 10) -> dict:
+    """
+    Сравнивает синхронную и фоновую (main_functions.LOG_ASYNC) запись лога: calls вызовов
+    write_log в три файла (каждый error_every-й — с mode="error"). Время фоновой записи включает
+    дозапись очереди (flush_log); содержимое файлов обоих режимов сверяется без отметок времени.
+    """
+    log_async = main_functions.LOG_ASYNC
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            contents = {}
+            for name, enabled in (("sync", False), ("async", True)):
+                paths = [os.path.join(tmp_dir, f"{name}_{kind}.log") for kind in ("all", "last", "error")]
+                for path in paths:
+                    open(path, 'w').close()
+                main_functions.LOG_ASYNC = enabled
+                start = time.perf_counter()
+                for i in range(calls):
+                    mode = "error" if i % error_every == 0 else "normal"
+                    main_functions.write_log(f"[benchmark] Запись {i}", paths[0], paths[1], mode, paths[2])
+                main_functions.flush_log()
+                elapsed = time.perf_counter() - start
+                results[f"write_log_{name}_s"] = elapsed
+                results[f"write_log_{name}_calls_s"] = calls / elapsed
+                contents[name] = []
+                for path in paths:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        contents[name].append([line.split("] ", 1)[1] for line in f])
+            results["write_log_equal"] = contents["sync"] == contents["async"]
+    finally:
+        main_functions.LOG_ASYNC = log_async
+    return results
+
+
+# --- ВРЕМЯ ИМПОРТА ПРИ ЗАПУСКЕ ---
+# Модули, импортируемые точкой входа ElOrgEDS_ARM_silent.py
+STARTUP_MODULES = ("modules.main_functions", "modules.api_client", "modules.server_sync", "modules.notifications")
+# Пакеты, которые не должны загружаться при запуске (загружаются при первом использовании)
+STARTUP_DEFERRED_PACKAGES = ("pandas", "numpy", "PyQt6", "cryptography")
+# Ориентир времени импорта модулей запуска (мс): превышение только выводится как предупреждение,
+# так как время зависит от машины (регрессии времени — через --compare с прошлым прогоном)
+STARTUP_IMPORT_BUDGET_MS = 300
+# Количество прогонов (берётся лучший)
+STARTUP_RUNS = 3
+
+
+def _parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """Разбирает вывод python -X importtime: (модуль с отступом вложенности, self мкс, cumulative мкс)."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if self_us.strip().isdigit():
+            entries.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return entries
+
+
+def bench_startup_imports(modules: tuple[str, ...] = STARTUP_MODULES, runs: int = STARTUP_RUNS) -> dict:
+    """
+    Время импорта модулей точки входа в отдельном интерпретаторе (python -X importtime).
+
+    Returns:
+        Словарь: startup_import_ms (лучший из runs прогонов), deferred_loaded — загруженные
+        при запуске пакеты из STARTUP_DEFERRED_PACKAGES, slowest — самые долгие импорты верхнего уровня.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best = None
+    for _ in range(runs):
+        process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+                                 capture_output=True, text=True, cwd=root)
+        if process.returncode != 0:
+            last_line = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else ""
+            raise RuntimeError(f"Ошибка импорта модулей запуска: {last_line}")
+        entries = _parse_importtime(process.stderr)
+        top_level = [(name, cumulative) for name, _, cumulative in entries if not name.startswith(" ")]
+        total_ms = sum(cumulative for _, cumulative in top_level) / 1000
+        if best is None or total_ms < best["startup_import_ms"]:
+            loaded = {name.strip().split(".")[0] for name, _, _ in entries}
+            best = {
+                "startup_import_ms": total_ms,
+                "deferred_loaded": [package for package in STARTUP_DEFERRED_PACKAGES if package in loaded],
+                "slowest": [f"{name} {cumulative / 1000:.1f} мс"
+                            for name, cumulative in sorted(top_level, key=lambda item: -item[1])[:5]],
+            }
+    return best
+
+
+def check_startup_imports(result: dict) -> list[str]:
+    """Нарушения для результата bench_startup_imports (пустой список — регрессии нет)."""
+    return [f"При запуске загружается пакет '{package}'" for package in result["deferred_loaded"]]
+# --- /ВРЕМЯ ИМПОРТА ПРИ ЗАПУСКЕ ---
+
+
+# --- НАБОР БЕНЧМАРКОВ НА СИНТЕТИЧЕСКИХ ДАННЫХ ---
+# Размеры синтетических таблиц (строк)
+SUITE_SIZES = (1_000, 10_000, 100_000)
+# Количество столбцов-ИНН в синтетическом DB_ConnectLEtoARM.csv
+SUITE_INN_COLUMNS = 50
+
+AREAS = ("1C-Отчетность", "АИС БП-ЭК", "ЕИС или ГМУ", "СБИС")
+
+
+def synthetic_db_info_arm(rows: int) -> pd.DataFrame:
+    """Таблица в форме DB_InfoARM.csv: IP-адрес, имя ПК, области применения, комментарий."""
+    return pd.DataFrame({
+        "IPaddress": [f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}" for i in range(rows)],
+        "NamePC": [f"ARM-{i:06d}" for i in range(rows)],
+        "AreaApp": [";".join(AREAS[:1 + i % len(AREAS)]) for i in range(rows)],
+        "Comment": [f"Рабочее место {i}" for i in range(rows)],
+    })
+
+
+def synthetic_db_connect(rows: int, inn_columns: int = SUITE_INN_COLUMNS) -> pd.DataFrame:
+    """Таблица в форме DB_ConnectLEtoARM.csv: IP-адрес и матрица доступа к ИНН (True/False)."""
+    data = {"IPaddress": [f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}" for i in range(rows)]}
+    for j in range(inn_columns):
+        data[f"{7700000000 + j}"] = ["True" if (i + j) % 7 == 0 else "False" for i in range(rows)]
+    return pd.DataFrame(data)
+
+
+def write_synthetic_csv(df: pd.DataFrame, file_path: str, aes_key: bytes):
+    """Записывает зашифрованный CSV с первой служебной строкой, как его читает read_encrypted_csv."""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(data_handler.CSV_PREAMBLE + "\n")
+        data_handler.encrypt_dataframe(df, aes_key).to_csv(f, index=False)
+
+
+def _measure(func, rows: int) -> dict:
+    """
+    Время выполнения, строк в секунду и пиковый прирост памяти (отдельный прогон под tracemalloc).
+    Кэш дешифрования сбрасывается перед каждым прогоном, чтобы оба шли с холодным кэшем.
+    """
+    crypto.decrypt_cache.clear()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    crypto.decrypt_cache.clear()
+    peak_mb = _peak_memory(func) / 2 ** 20
+    return {
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds > 0 else 0.0,
+        "peak_mb": peak_mb,
+    }
+
+
+def _git_commit() -> str:
+    """Текущий коммит репозитория (если доступен git)."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except Exception:
+        return ""
+
+
+def run_suite(sizes=SUITE_SIZES) -> dict:
+    """
+    Прогоняет набор бенчмарков для DB_InfoARM- и DB_ConnectLEtoARM-подобных таблиц
+    каждого размера из sizes.
+
+    Returns:
+        Словарь результатов: {набор: {размер: {операция: {seconds, rows_per_sec, peak_mb}}}}
+        и метаданные прогона (коммит, время, версия Python).
+    """
+    key = os.urandom(32)
+    datasets = {"DB_InfoARM": synthetic_db_info_arm, "DB_ConnectLEtoARM": synthetic_db_connect}
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, factory in datasets.items():
+            results[name] = {}
+            for rows in sizes:
+                df = factory(rows)
+                records = df.to_dict('records')
+                encrypted_records = crypto.func_EncryptArray_NEW(records, key)
+                first_column = df.iloc[:, 0].tolist()
+                encrypted_first_column = [row[df.columns[0]] for row in encrypted_records]
+                read_path = os.path.join(tmp_dir, f"{name}_{rows}_read.csv")
+                write_path = os.path.join(tmp_dir, f"{name}_{rows}_write.csv")
+                table_path = os.path.join(tmp_dir, f"{name}_{rows}_v2.tbl")
+                write_synthetic_csv(df, read_path, key)
+                data_handler.write_encrypted_csv(df, table_path, key, format_version=2)
+
+                operations = {
+                    "func_EncryptText_NEW": lambda: [crypto.func_EncryptText_NEW(v, key) for v in first_column],
+                    "func_DecryptText_NEW": lambda: [crypto.func_DecryptText_NEW(v, key)
+                                                     for v in encrypted_first_column],
+                    "func_EncryptArray_NEW": lambda: crypto.func_EncryptArray_NEW(records, key),
+                    "func_DecryptArray_NEW": lambda: crypto.func_DecryptArray_NEW(encrypted_records, key),
+                    "read_encrypted_csv": lambda: data_handler.read_encrypted_csv(read_path, key),
+                    "write_encrypted_csv": lambda: data_handler.write_encrypted_csv(df, write_path, key),
+                    "read_table_v2": lambda: data_handler.read_encrypted_csv(table_path, key),
+                    "write_table_v2": lambda: data_handler.write_encrypted_csv(df, write_path, key,
+                                                                               format_version=2),
+                }
+                results[name][str(rows)] = {}
+                for operation, func in operations.items():
+                    results[name][str(rows)][operation] = _measure(func, rows)
+                    print(f"{name} {rows:>7} {operation:<22} "
+                          f"{results[name][str(rows)][operation]['seconds']:.3f} с", file=sys.stderr)
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "startup": bench_startup_imports(),
+        "results": results,
+    }
+
+
+def compare_results(old: dict, new: dict) -> list[str]:
+    """
+    Сравнивает два прогона run_suite: для каждой операции — отношение времени нового
+    прогона к старому (больше 1 — регрессия) и изменение пиковой памяти.
+    """
+    lines = [f"{'набор':<18} {'строк':>7} {'операция':<22} {'время':>8} {'память':>8}"]
+    for name, sizes in new["results"].items():
+        for rows, operations in sizes.items():
+            for operation, metrics in operations.items():
+                old_metrics = old.get("results", {}).get(name, {}).get(rows, {}).get(operation)
+                if not old_metrics:
+                    continue
+                time_ratio = metrics["seconds"] / old_metrics["seconds"] if old_metrics["seconds"] else 0.0
+                memory_ratio = metrics["peak_mb"] / old_metrics["peak_mb"] if old_metrics["peak_mb"] else 0.0
+                lines.append(f"{name:<18} {rows:>7} {operation:<22} {time_ratio:>7.2f}x {memory_ratio:>7.2f}x")
+    if old.get("startup") and new.get("startup") and old["startup"]["startup_import_ms"]:
+        startup_ratio = new["startup"]["startup_import_ms"] / old["startup"]["startup_import_ms"]
+        lines.append(f"{'запуск':<18} {'':>7} {'импорт модулей':<22} {startup_ratio:>7.2f}x {'':>8}")
+    return lines
+# --- /НАБОР БЕНЧМАРКОВ НА СИНТЕТИЧЕСКИХ ДАННЫХ ---
+
+
+def _print_results(results: dict):
+    for name, value in results.items():
+        print(f"{name}: {value:.2f}" if isinstance(value, float) else f"{name}: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки шифрования и работы с CSV ElOrgEDS.")
+    parser.add_argument("--suite", metavar="RESULTS_JSON",
+                        help="прогнать набор на синтетических данных и сохранить результаты в JSON")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in SUITE_SIZES),
+                        help="размеры таблиц через запятую (по умолчанию %(default)s)")
+    parser.add_argument("--compare", metavar="OLD_JSON", help="сравнить результаты с прошлым прогоном")
+    parser.add_argument("--check-startup", action="store_true",
+                        help="проверить импорт при запуске (код возврата 1, если загружаются отложенные пакеты)")
+    args = parser.parse_args()
+
+    if args.check_startup:
+        startup = bench_startup_imports()
+        _print_results(startup)
+        problems = check_startup_imports(startup)
+        if startup["startup_import_ms"] > STARTUP_IMPORT_BUDGET_MS:
+            print(f"Предупреждение: время импорта при запуске {startup['startup_import_ms']:.1f} мс "
+                  f"больше ориентира {STARTUP_IMPORT_BUDGET_MS} мс.")
+        print("\n".join(problems) if problems else "Отложенные пакеты при запуске не загружаются.")
+        sys.exit(1 if problems else 0)
+
+    if not args.suite:
+        _print_results(bench_codec_per_cell())
+        _print_results(bench_dataframe_memory())
+        _print_results(bench_bytes_api())
+        _print_results(bench_table_formats())
+        _print_results(bench_csv_backends())
+        _print_results(bench_write_log())
+        _print_results(bench_startup_imports())
+        return
+
+    suite_results = run_suite(tuple(int(size) for size in args.sizes.split(",")))
+    with open(args.suite, 'w', encoding='utf-8') as f:
+        json.dump(suite_results, f, ensure_ascii=False, indent=2)
+    print(f"Результаты сохранены: {args.suite}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print("\n".join(compare_results(json.load(f), suite_results)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Модуль слепого индекса (blind index) для зашифрованных CSV-файлов.
+Индекс хранится рядом с CSV (файл '<имя>.csv.idx') и сопоставляет HMAC от значения
+столбца поиска смещениям строк в файле, что позволяет найти строку без дешифрования таблицы.
+Индекс считается устаревшим при изменении размера или времени изменения CSV-файла.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+
+from settings import MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_ERROR
+from .main_functions import write_log
+
+# --- НАСТРОЙКИ ---
+# Расширение файла индекса
+INDEX_SUFFIX = ".idx"
+# Версия формата индекса
+INDEX_VERSION = 2
+# Контекст выработки ключа индекса из общего AES-ключа
+INDEX_KEY_CONTEXT = b"ElOrgEDS blind index v1"
+# --- /НАСТРОЙКИ ---
+
+
+def index_path(csv_path: str) -> str:
+    """Путь к файлу индекса для CSV-файла csv_path."""
+    return csv_path + INDEX_SUFFIX
+
+
+def _index_key(aes_key: bytes) -> bytes:
+    """Отдельный ключ HMAC для индекса, выработанный из общего AES-ключа."""
+    return hmac.new(aes_key, INDEX_KEY_CONTEXT, hashlib.sha256).digest()
+
+
+def _token(index_key: bytes, column: str, value: str) -> str:
+    """HMAC-SHA256 значения столбца (hex)."""
+    return hmac.new(index_key, f"{column}\x00{value}".encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def _sign(index_key: bytes, body: dict) -> str:
+    """HMAC-SHA256 канонического JSON-представления индекса (hex)."""
+    payload = json.dumps(body, sort_keys=True, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return hmac.new(index_key, payload, hashlib.sha256).hexdigest()
+
+
+def _line_offsets(csv_path: str) -> list[int]:
+    """Смещения начала всех непустых строк файла."""
+    offsets = []
+    with open(csv_path, 'rb') as f:
+        offset = 0
+        for line in f:
+            if line.strip():
+                offsets.append(offset)
+            offset += len(line)
+    return offsets
+
+
+def build_blind_index(csv_path: str, column: str, values: list[str], aes_key: bytes):
+    """
+    Строит слепой индекс для уже записанного зашифрованного CSV-файла.
+
+    Args:
+        csv_path: Путь к зашифрованному CSV-файлу.
+        column: Имя столбца поиска (например, 'IPaddress').
+        values: Расшифрованные значения столбца в порядке строк данных файла.
+        aes_key: 32-байтовый общий AES-ключ (из него вырабатывается ключ HMAC).
+    """
+    line_offsets = _line_offsets(csv_path)
+    if len(line_offsets) < len(values) + 1:
+        raise ValueError(f"[blind_index] В файле '{csv_path}' меньше строк, чем значений для индекса.")
+    # Строки данных — последние len(values) строк, перед ними — строка заголовка
+    data_offsets = line_offsets[len(line_offsets) - len(values):]
+    header_offset = line_offsets[len(line_offsets) - len(values) - 1]
+
+    index_key = _index_key(aes_key)
+    entries: dict[str, list[int]] = {}
+    for value, offset in zip(values, data_offsets):
+        entries.setdefault(_token(index_key, column, str(value)), []).append(offset)
+
+    stat = os.stat(csv_path)
+    body = {
+        "version": INDEX_VERSION,
+        "column": column,
+        "csv_size": stat.st_size,
+        "csv_mtime_ns": stat.st_mtime_ns,
+        "header_offset": header_offset,
+        "entries": entries,
+    }
+    body["mac"] = _sign(index_key, body)
+
+    path = index_path(csv_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(body, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    write_log(f"[blind_index] Индекс по столбцу '{column}' записан: '{path}' (строк: {len(values)}).",
+              MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+
+
+def lookup_blind_index(csv_path: str, column: str, value: str, aes_key: bytes) -> tuple[int, list[int]] | None:
+    """
+    Ищет значение в слепом индексе CSV-файла.
+
+    Args:
+        csv_path: Путь к зашифрованному CSV-файлу.
+        column: Имя столбца поиска.
+        value: Искомое расшифрованное значение.
+        aes_key: 32-байтовый общий AES-ключ.
+
+    Returns:
+        (смещение строки заголовка, список смещений найденных строк) — пустой список,
+        если значения в индексе нет; None, если индекса нет, он устарел или не прошёл проверку
+        (в этом случае нужен полный просмотр файла).
+    """
+    path = index_path(csv_path)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            body = json.load(f)
+        index_key = _index_key(aes_key)
+        mac = body.pop("mac", "")
+        if not hmac.compare_digest(mac, _sign(index_key, body)):
+            write_log(f"[blind_index] Индекс '{path}' не прошёл проверку подписи и не используется.",
+                      MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+            return None
+        if body.get("version") != INDEX_VERSION or body.get("column") != column:
+            return None
+        stat = os.stat(csv_path)
+        if body["csv_size"] != stat.st_size or body["csv_mtime_ns"] != stat.st_mtime_ns:
+            write_log(f"[blind_index] Индекс '{path}' устарел (CSV-файл изменён) и не используется.",
+                      MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+            return None
+        return body["header_offset"], body["entries"].get(_token(index_key, column, str(value)), [])
+
+    except Exception as e:
+        write_log(f"[blind_index] Ошибка чтения индекса '{path}': {e}. Используется полный просмотр.",
+                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+        return None
+
+
+def remove_blind_index(csv_path: str):
+    """Удаляет файл индекса (если есть), чтобы он не остался устаревшим после перезаписи CSV."""
+    path = index_path(csv_path)
+    if os.path.exists(path):
+        os.remove(path)
@@ -42,7 +42,7 @@ def read_encrypted_cba(file_path: str, aes_key: bytes) -> str:
 
         # 2. Дешифруем пароль
         write_log("[cba_handler] Дешифрование пароля...",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
-        decrypted_password = crypto.func_DecryptText_NEW(encrypted_password_b64, aes_key)
+        decrypted_password = crypto.decrypt_values([encrypted_password_b64], aes_key, use_cache=False)[0]
 
         write_log(f"[cba_handler] Пароль из файла '{file_path}' успешно прочитан и расшифрован.")
         return decrypted_password
@@ -65,7 +65,7 @@ def write_encrypted_cba(password: str, file_path: str, aes_key: bytes):
     try:
         # 1. Шифруем пароль
         write_log("[cba_handler] Шифрование пароля...",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
-        encrypted_password_b64 = crypto.func_EncryptText_NEW(password, aes_key)
+        encrypted_password_b64 = crypto.get_codec(aes_key).encrypt_text(password)
 
         # 2. Записываем в файл в кодировке UTF-8 с BOM
         write_log(f"[cba_handler] Запись зашифрованного пароля в .cba файл: '{file_path}'...",
@@ -4,8 +4,14 @@
 Совместим с обновлёнными PowerShell-функциями func_EncryptText_NEW и func_DecryptText_NEW.
 """
 
-import base64
+import binascii
+import hashlib
+import mmap
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 from .main_functions import write_log
 from settings import MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_ERROR
@@ -15,8 +21,400 @@ from settings import MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_
 AES_BLOCK_SIZE_BYTES = 16
 # Длина IV для CBC (16 байт)
 AES_CBC_IV_LENGTH_BYTES = 16
+# Минимальное количество строк, начиная с которого дешифрование выполняется в пуле процессов
+PARALLEL_MIN_ROWS = 5000
+# Минимальный размер порции строк, передаваемой одному процессу
+PARALLEL_CHUNK_ROWS = 1000
+# Максимальное количество записей в кэше дешифрования (0 — кэш отключён). IV случаен, поэтому
+# попадания бывают только при повторном чтении тех же файлов в одном процессе (поиск строк
+# DB_InfoARM и т. п.); при полном чтении таблицы кэш вытесняется, не давая попаданий
+DECRYPT_CACHE_MAX_ITEMS = 10_000
+# Размер данных, начиная с которого encrypt_bytes шифрует без копирования входного буфера
+ZERO_COPY_MIN_BYTES = 4096
+# Размер порции потокового шифрования/дешифрования файлов (1 МиБ)
+FILE_CHUNK_BYTES = 1024 * 1024
 # --- /НАСТРОЙКИ ---
 
+# --- КОДЕК AES-256-CBC ---
+class AesCbcCodec:
+    """
+    Долгоживущий кодек AES-256-CBC, совместимый с func_EncryptText_NEW/func_DecryptText_NEW.
+    Формат значения: Base64(IV + Ciphertext), PKCS7 padding.
+
+    Ключ проверяется и привязывается один раз, объект алгоритма AES и модули
+    cryptography подготавливаются при создании кодека, а PKCS7 выполняется
+    встроенными помощниками без создания padder/unpadder на каждую ячейку.
+    Режим CBC всегда выполняет cryptography (контекст Cipher(AES, CBC(iv)) на значение).
+    """
+
+    __slots__ = ("_key", "_algorithm", "_cipher_cls", "_cbc_cls")
+
+    def __init__(self, key: bytes):
+        if len(key) != 32:
+            write_log("Ключ должен быть длиной 32 байта (256 бит) для AES-256-CBC.", MODULE_LOG_FILE_ALL,
+                      MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+            raise ValueError("Ключ должен быть длиной 32 байта (256 бит) для AES-256-CBC.")
+
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+        self._key = bytes(key)
+        self._algorithm = algorithms.AES(self._key)
+        self._cipher_cls = Cipher
+        self._cbc_cls = modes.CBC
+
+    @property
+    def key(self) -> bytes:
+        """32-байтовый ключ, к которому привязан кодек."""
+        return self._key
+
+    # --- PKCS7 ---
+    @staticmethod
+    def _pad(data: bytes) -> bytes:
+        """Добавляет PKCS7 padding до размера блока AES."""
+        pad_len = AES_BLOCK_SIZE_BYTES - len(data) % AES_BLOCK_SIZE_BYTES
+        return data + bytes((pad_len,)) * pad_len
+
+    @staticmethod
+    def _unpad(data: bytes) -> bytes:
+        """Удаляет и проверяет PKCS7 padding."""
+        if not data or len(data) % AES_BLOCK_SIZE_BYTES:
+            raise ValueError("Неверная длина данных для удаления PKCS7 padding.")
+        pad_len = data[-1]
+        if pad_len < 1 or pad_len > AES_BLOCK_SIZE_BYTES or data[-pad_len:] != bytes((pad_len,)) * pad_len:
+            raise ValueError("Неверный PKCS7 padding.")
+        return data[:-pad_len]
+
+    @staticmethod
+    def _split_encrypted(encrypted_b64) -> bytes:
+        """Декодирует Base64 и проверяет длину IV + Ciphertext."""
+        combined_bytes = binascii.a2b_base64(encrypted_b64)
+        AesCbcCodec._check_encrypted_length(len(combined_bytes))
+        return combined_bytes
+
+    @staticmethod
+    def _check_encrypted_length(length: int):
+        """Проверяет длину IV + Ciphertext."""
+        # IV 16 + хотя бы 1 блок 16 = 32 байта
+        if length < AES_CBC_IV_LENGTH_BYTES + AES_BLOCK_SIZE_BYTES:
+            raise ValueError(f"Недостаточная длина данных для CBC (менее 32 байт). Длина: {length}")
+        if length % AES_BLOCK_SIZE_BYTES:
+            raise ValueError(f"Длина данных CBC не кратна размеру блока. Длина: {length}")
+    # --- /PKCS7 ---
+
+    # --- БАЙТОВЫЙ API ---
+    def encrypt_bytes(self, data) -> bytes | bytearray:
+        """
+        Шифрует буфер data (bytes, bytearray, memoryview) и возвращает IV + Ciphertext без Base64.
+        Для больших буферов полные блоки шифруются прямо из исходного буфера в выходной,
+        копируется только последний неполный блок для добавления PKCS7 padding.
+        """
+        view = memoryview(data).cast('B')
+        block = AES_BLOCK_SIZE_BYTES
+        iv_len = AES_CBC_IV_LENGTH_BYTES
+        full_len = len(view) - len(view) % block
+        pad_len = block - len(view) % block
+
+        if full_len < ZERO_COPY_MIN_BYTES:
+            # Мелкие значения: копия дешевле подготовки буферов для update_into
+            iv = os.urandom(iv_len)
+            encryptor = self._cipher_cls(self._algorithm, self._cbc_cls(iv)).encryptor()
+            return iv + encryptor.update(view.tobytes() + bytes((pad_len,)) * pad_len) + encryptor.finalize()
+
+        # update_into требует запас в block - 1 байт сверх длины входных данных
+        out = bytearray(iv_len + full_len + 2 * block - 1)
+        iv = os.urandom(iv_len)
+        out[:iv_len] = iv
+        out_view = memoryview(out)
+        encryptor = self._cipher_cls(self._algorithm, self._cbc_cls(iv)).encryptor()
+        written = encryptor.update_into(view[:full_len], out_view[iv_len:]) if full_len else 0
+        tail = bytes(view[full_len:]) + bytes((pad_len,)) * pad_len
+        written += encryptor.update_into(tail, out_view[iv_len + written:])
+        encryptor.finalize()
+        out_view.release()
+        del out[iv_len + written:]
+        return out
+
+    def decrypt_into(self, data, out) -> int:
+        """
+        Дешифрует буфер data (IV + Ciphertext) в записываемый буфер out без промежуточных копий.
+        Размер out должен быть не меньше len(data).
+
+        Returns:
+            Длина открытого текста в out (после удаления PKCS7 padding).
+        """
+        view = memoryview(data).cast('B')
+        self._check_encrypted_length(len(view))
+        out_view = memoryview(out).cast('B')
+        if len(out_view) < len(view):
+            raise ValueError(f"Выходной буфер слишком мал: {len(out_view)} < {len(view)}.")
+
+        iv_len = AES_CBC_IV_LENGTH_BYTES
+        decryptor = self._cipher_cls(self._algorithm, self._cbc_cls(view[:iv_len])).decryptor()
+        written = decryptor.update_into(view[iv_len:], out_view)
+        decryptor.finalize()
+
+        pad_len = out_view[written - 1]
+        if (pad_len < 1 or pad_len > AES_BLOCK_SIZE_BYTES
+                or out_view[written - pad_len:written] != bytes((pad_len,)) * pad_len):
+            raise ValueError("Неверный PKCS7 padding.")
+        return written - pad_len
+
+    def decrypt_bytes(self, data) -> bytearray:
+        """Дешифрует буфер IV + Ciphertext и возвращает открытый текст."""
+        out = bytearray(len(memoryview(data).cast('B')))
+        del out[self.decrypt_into(data, out):]
+        return out
+    # --- /БАЙТОВЫЙ API ---
+
+    # --- ПОТОКОВАЯ ОБРАБОТКА ---
+    @staticmethod
+    def _iter_chunks(source, chunk_bytes: int):
+        """
+        Выдаёт порции источника: файла (readinto в один переиспользуемый буфер)
+        или буфера/mmap (срезы memoryview без копирования).
+        """
+        if hasattr(source, 'readinto'):
+            buffer = bytearray(chunk_bytes)
+            view = memoryview(buffer)
+            while True:
+                read = source.readinto(buffer)
+                if not read:
+                    return
+                yield view[:read]
+        else:
+            view = memoryview(source).cast('B')
+            for offset in range(0, len(view), chunk_bytes):
+                yield view[offset:offset + chunk_bytes]
+
+    def encrypt_stream(self, source, dst, chunk_bytes: int = FILE_CHUNK_BYTES) -> int:
+        """
+        Шифрует источник (файл, открытый в 'rb', или буфер/mmap) порциями по chunk_bytes
+        и пишет в dst формат IV + Ciphertext (PKCS7), как у encrypt_bytes, но без Base64.
+        Память не зависит от размера данных.
+
+        Returns:
+            Количество прочитанных байт открытого текста.
+        """
+        block = AES_BLOCK_SIZE_BYTES
+        iv = os.urandom(AES_CBC_IV_LENGTH_BYTES)
+        encryptor = self._cipher_cls(self._algorithm, self._cbc_cls(iv)).encryptor()
+        out = bytearray(chunk_bytes + 2 * block)
+        out_view = memoryview(out)
+        dst.write(iv)
+
+        total = 0
+        for chunk in self._iter_chunks(source, chunk_bytes):
+            total += len(chunk)
+            dst.write(out_view[:encryptor.update_into(chunk, out_view)])
+        pad_len = block - total % block
+        dst.write(out_view[:encryptor.update_into(bytes((pad_len,)) * pad_len, out_view)])
+        encryptor.finalize()
+        return total
+
+    def decrypt_stream(self, source, dst, chunk_bytes: int = FILE_CHUNK_BYTES) -> int:
+        """
+        Дешифрует источник формата IV + Ciphertext (файл в 'rb' или буфер/mmap) порциями
+        по chunk_bytes и пишет открытый текст в dst. Последний блок удерживается до конца
+        потока для проверки и удаления PKCS7 padding.
+
+        Returns:
+            Количество записанных байт открытого текста.
+        """
+        block = AES_BLOCK_SIZE_BYTES
+        iv_len = AES_CBC_IV_LENGTH_BYTES
+        chunks = self._iter_chunks(source, chunk_bytes)
+        header = bytearray()
+        out = bytearray(chunk_bytes + 2 * block)
+        out_view = memoryview(out)
+        decryptor = None
+        last_block = b""
+        received = 0
+        total = 0
+
+        for chunk in chunks:
+            if decryptor is None:
+                # IV может прийти не целиком в первой порции
+                take = iv_len - len(header)
+                header += chunk[:take]
+                chunk = chunk[take:]
+                if len(header) < iv_len:
+                    continue
+                decryptor = self._cipher_cls(self._algorithm, self._cbc_cls(bytes(header))).decryptor()
+            received += len(chunk)
+            written = decryptor.update_into(chunk, out_view)
+            if written:
+                # Предыдущий удержанный блок точно не последний — записываем его
+                dst.write(last_block)
+                dst.write(out_view[:written - block])
+                total += len(last_block) + written - block
+                last_block = out[written - block:written]
+
+        self._check_encrypted_length(iv_len + received if decryptor else len(header))
+        decryptor.finalize()
+        plaintext_tail = self._unpad(bytes(last_block))
+        dst.write(plaintext_tail)
+        return total + len(plaintext_tail)
+    # --- /ПОТОКОВАЯ ОБРАБОТКА ---
+
+    # --- ОДИНОЧНЫЕ ЗНАЧЕНИЯ ---
+    def encrypt_text(self, plaintext: str) -> str:
+        """Шифрует одну строку и возвращает Base64(IV + Ciphertext)."""
+        return binascii.b2a_base64(self.encrypt_bytes(plaintext.encode('utf-8')), newline=False).decode('ascii')
+
+    def decrypt_text(self, encrypted_b64) -> str:
+        """Дешифрует одну Base64-строку IV + Ciphertext и возвращает строку UTF-8."""
+        return self.decrypt_bytes(binascii.a2b_base64(encrypted_b64)).decode('utf-8')
+    # --- /ОДИНОЧНЫЕ ЗНАЧЕНИЯ ---
+
+    # --- ПАКЕТНАЯ ОБРАБОТКА ---
+    def encrypt_many(self, values) -> list[str]:
+        """
+        Шифрует последовательность строк. Каждое значение получает собственный случайный IV
+        (случайные байты запрашиваются одним вызовом на весь набор) и шифруется своим
+        CBC-контекстом на общем объекте алгоритма; формат результата идентичен encrypt_text.
+        """
+        padded = [self._pad(value.encode('utf-8')) for value in values]
+        if not padded:
+            return []
+
+        iv_len = AES_CBC_IV_LENGTH_BYTES
+        ivs = os.urandom(iv_len * len(padded))
+        cipher_cls, cbc_cls, algorithm = self._cipher_cls, self._cbc_cls, self._algorithm
+        b2a_base64 = binascii.b2a_base64
+        result = []
+        for i, data in enumerate(padded):
+            iv = ivs[i * iv_len:(i + 1) * iv_len]
+            encryptor = cipher_cls(algorithm, cbc_cls(iv)).encryptor()
+            result.append(b2a_base64(iv + encryptor.update(data) + encryptor.finalize(),
+                                     newline=False).decode('ascii'))
+        return result
+
+    def decrypt_many(self, values) -> list[str]:
+        """
+        Дешифрует последовательность Base64-строк IV + Ciphertext: каждое значение —
+        своим CBC-контекстом на общем объекте алгоритма.
+        """
+        iv_len = AES_CBC_IV_LENGTH_BYTES
+        cipher_cls, cbc_cls, algorithm = self._cipher_cls, self._cbc_cls, self._algorithm
+        unpad = self._unpad
+        result = []
+        for value in values:
+            data = memoryview(self._split_encrypted(value))
+            decryptor = cipher_cls(algorithm, cbc_cls(data[:iv_len])).decryptor()
+            result.append(unpad(decryptor.update(data[iv_len:]) + decryptor.finalize()).decode('utf-8'))
+        return result
+    # --- /ПАКЕТНАЯ ОБРАБОТКА ---
+
+
+# Последний использованный кодек (ключ обычно один на весь запуск)
+_shared_codec: AesCbcCodec | None = None
+
+
+def get_codec(key: bytes) -> AesCbcCodec:
+    """
+    Возвращает кодек для ключа key, переиспользуя последний созданный, если ключ не изменился.
+    При смене ключа кэш дешифрования очищается.
+    """
+    global _shared_codec
+    codec = _shared_codec
+    if codec is None or codec.key != key:
+        codec = AesCbcCodec(key)
+        if _shared_codec is not None:
+            decrypt_cache.clear()
+        _shared_codec = codec
+    return codec
+# --- /КОДЕК AES-256-CBC ---
+
+# --- КЭШ ДЕШИФРОВАНИЯ ---
+def key_fingerprint(key: bytes) -> bytes:
+    """Короткий отпечаток ключа (первые 8 байт SHA-256), не раскрывающий сам ключ."""
+    return hashlib.sha256(key).digest()[:8]
+
+
+class DecryptCache:
+    """
+    Ограниченный LRU-кэш результатов дешифрования по шифротексту. Кэш относится к одному
+    AES-ключу (его отпечаток хранится один раз на весь кэш) и очищается при смене ключа.
+    Так как IV случаен, одинаковый шифротекст встречается только у одной и той же ячейки,
+    поэтому кэш полезен при повторном чтении тех же файлов в рамках процесса.
+    Расшифрованные значения хранятся только в памяти процесса.
+    """
+
+    __slots__ = ("max_items", "hits", "misses", "_entries", "_fingerprint", "_lock")
+
+    def __init__(self, max_items: int = DECRYPT_CACHE_MAX_ITEMS):
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._fingerprint = b""
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Очищает кэш и счётчики."""
+        with self._lock:
+            self._entries.clear()
+            self._fingerprint = b""
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Счётчики попаданий/промахов и текущий размер кэша."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "max_items": self.max_items}
+
+    def decrypt_many(self, values: list[str], aes_key: bytes) -> list[str]:
+        """
+        Дешифрует значения через кэш: промахи дешифруются одним вызовом AesCbcCodec.decrypt_many.
+        """
+        codec = get_codec(aes_key)
+        if self.max_items <= 0:
+            return codec.decrypt_many(values)
+
+        fingerprint = key_fingerprint(codec.key)
+        result: list[str | None] = []
+        missing: list[int] = []
+        with self._lock:
+            if fingerprint != self._fingerprint:
+                # Ключ сменился — старые записи бесполезны
+                self._entries.clear()
+                self._fingerprint = fingerprint
+            entries = self._entries
+            for i, value in enumerate(values):
+                cached = entries.get(value)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    entries.move_to_end(value)
+                result.append(cached)
+            self.hits += len(values) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            decrypted_values = codec.decrypt_many([values[i] for i in missing])
+            with self._lock:
+                # Пока шло дешифрование, другой поток мог сменить ключ: тогда результаты не кэшируются
+                cache_results = fingerprint == self._fingerprint
+                for i, decrypted_value in zip(missing, decrypted_values):
+                    result[i] = decrypted_value
+                    if cache_results:
+                        self._entries[values[i]] = decrypted_value
+                while len(self._entries) > self.max_items:
+                    self._entries.popitem(last=False)
+        return result
+
+
+# Общий кэш дешифрования процесса
+decrypt_cache = DecryptCache()
+
+
+def decrypt_cached(values: list[str], aes_key: bytes) -> list[str]:
+    """Дешифрует список Base64-значений через общий кэш decrypt_cache."""
+    return decrypt_cache.decrypt_many(values, aes_key)
+# --- /КЭШ ДЕШИФРОВАНИЯ ---
+
 # --- ФУНКЦИИ ШИФРОВАНИЯ/ДЕШИФРОВАНИЯ ---
 # Data encrypt (NEW - AES-256-CBC, Python Compatible)
 def func_EncryptText_NEW(plaintext: str, key: bytes) -> str:
@@ -32,43 +430,10 @@ def func_EncryptText_NEW(plaintext: str, key: bytes) -> str:
     Returns:
         Base64-строка, содержащая IV и зашифрованный текст.
     """
-    if len(key) != 32:
-        write_log("Ключ должен быть длиной 32 байта (256 бит) для AES-256-CBC.", MODULE_LOG_FILE_ALL,
-                  MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
-        raise ValueError("Ключ должен быть длиной 32 байта (256 бит) для AES-256-CBC.")
+    codec = get_codec(key)
 
     try:
-        # 1. Преобразуем строку в байты UTF-8
-        plaintext_bytes = plaintext.encode('utf-8')
-
-        # 2. Создаем AES объект (CBC)
-        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-        from cryptography.hazmat.backends import default_backend
-
-        backend = default_backend()
-        # Генерируем случайный IV (16 байт для AES CBC)
-        iv = os.urandom(16)
-
-        cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=backend)
-
-        # 3. Создаем шифратор
-        encryptor = cipher.encryptor()
-
-        # 4. Добавляем PKCS7 padding
-        from cryptography.hazmat.primitives import padding
-        padder = padding.PKCS7(128).padder() # 128 бит = 16 байт для AES
-        padded_plaintext_bytes = padder.update(plaintext_bytes) + padder.finalize()
-
-        # 5. Шифруем
-        ciphertext = encryptor.update(padded_plaintext_bytes) + encryptor.finalize()
-
-        # 6. Объединяем IV и Ciphertext
-        combined_bytes = iv + ciphertext
-
-        # 7. Кодируем в Base64
-        encrypted_string = base64.b64encode(combined_bytes).decode('utf-8')
-
-        return encrypted_string
+        return codec.encrypt_text(plaintext)
 
     except Exception as e:
         write_log(f"Ошибка в func_EncryptText_NEW (AES-256-CBC): {e}",MODULE_LOG_FILE_ALL,
@@ -89,50 +454,10 @@ def func_DecryptText_NEW(encrypted_b64: str, key: bytes) -> str:
     Returns:
         Расшифрованная строка UTF-8.
     """
-    if len(key) != 32:
-        write_log("Ключ должен быть длиной 32 байта (256 бит) для AES-256-CBC.", MODULE_LOG_FILE_ALL,
-                  MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
-        raise ValueError("Ключ должен быть длиной 32 байта (256 бит) для AES-256-CBC.")
+    codec = get_codec(key)
 
     try:
-        # 1. Декодируем Base64
-        combined_bytes = base64.b64decode(encrypted_b64)
-
-        # 2. Проверяем минимальную длину (IV 16 + хотя бы 1 блок 16 = 32 байта)
-        if len(combined_bytes) < 32:
-            write_log(f"Недостаточная длина данных для CBC (менее 32 байт). Длина: {len(combined_bytes)}", MODULE_LOG_FILE_ALL,
-                      MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
-            raise ValueError(f"Недостаточная длина данных для CBC (менее 32 байт). Длина: {len(combined_bytes)}")
-
-        # 3. Извлекаем IV (первые 16 байт)
-        iv = combined_bytes[:16]
-
-        # 4. Извлекаем Ciphertext (остальное)
-        ciphertext_length = len(combined_bytes) - 16
-        ciphertext = combined_bytes[16:]
-
-        # 5. Создаем AES объект (CBC)
-        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
-        from cryptography.hazmat.backends import default_backend
-
-        backend = default_backend()
-        cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=backend)
-
-        # 6. Создаем дешифратор
-        decryptor = cipher.decryptor()
-
-        # 7. Дешифруем
-        padded_plaintext = decryptor.update(ciphertext) + decryptor.finalize()
-
-        # 8. Удаляем PKCS7 padding
-        from cryptography.hazmat.primitives import padding
-        unpadder = padding.PKCS7(128).unpadder() # 128 бит = 16 байт для AES
-        plaintext_bytes = unpadder.update(padded_plaintext) + unpadder.finalize()
-
-        # 9. Преобразуем байты в строку UTF-8
-        decrypted_string = plaintext_bytes.decode('utf-8')
-
-        return decrypted_string
+        return codec.decrypt_text(encrypted_b64)
 
     except Exception as e:
         write_log(f"Ошибка в func_DecryptText_NEW (AES-256-CBC): {e}",MODULE_LOG_FILE_ALL,
@@ -147,78 +472,208 @@ def func_DecryptText_NEW(encrypted_b64: str, key: bytes) -> str:
 def func_EncryptArray_NEW(data_csv: list[dict], aes_key: bytes) -> list[dict]:
     """
     Шифрует значения в списке словарей (как строки CSV) с использованием AES-256-CBC.
+    Значения шифруются постолбцово одним вызовом AesCbcCodec.encrypt_many.
     """
     if not data_csv:
         return []
 
+    codec = get_codec(aes_key)
     columns = list(data_csv[0].keys()) if data_csv else []
-    encrypted_array = []
+    encrypted_array = [{} for _ in data_csv]
 
-    for row in data_csv:
-        new_row = {}
-        for col in columns:
+    for col in columns:
+        plain_values = []
+        for row in data_csv:
             plain_value = row.get(col, "")
             if not isinstance(plain_value, str):
                 plain_value = str(plain_value)
-            if not plain_value:
-                encrypted_value = ""
-            else:
-                try:
-                    # ВАЖНО: Здесь должна быть вызвана РЕАЛЬНАЯ новая функция шифрования
-                    encrypted_value = func_EncryptText_NEW(plain_value, aes_key)
-                    if encrypted_value is None:
-                        write_log("Шифрование новым методом вернуло None.",MODULE_LOG_FILE_ALL,
-                                  MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
-                        raise ValueError("Шифрование новым методом вернуло None.")
-                except Exception as e:
-                    write_log(f"Предупреждение: Ошибка шифрования для ячейки "
-                              f"[{row.get('__index__', '?')}][{col}]: {e}", MODULE_LOG_FILE_ALL,
-                              MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
-                    raise ValueError(f"Ошибка шифрования для ячейки [{row.get('__index__', '?')}][{col}]: {e}")
-                    # Продолжаем с пустым значением или останавливаем. Выберем продолжение.
-                    encrypted_value = "" # Или пустая строка, в зависимости от логики
-            new_row[col] = encrypted_value
-        # Для отладки можно добавить индекс строки
-        # new_row['__index__'] = data_csv.index(row)
-        encrypted_array.append(new_row)
+            plain_values.append(plain_value)
+
+        targets = [i for i, plain_value in enumerate(plain_values) if plain_value]
+        try:
+            encrypted_values = codec.encrypt_many([plain_values[i] for i in targets])
+        except Exception as e:
+            write_log(f"Предупреждение: Ошибка шифрования для столбца [{col}]: {e}", MODULE_LOG_FILE_ALL,
+                      MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+            raise ValueError(f"Ошибка шифрования для столбца [{col}]: {e}")
+
+        for new_row in encrypted_array:
+            new_row[col] = ""
+        for i, encrypted_value in zip(targets, encrypted_values):
+            encrypted_array[i][col] = encrypted_value
 
     return [row for row in encrypted_array if any(v for v in row.values() if v)] # Фильтруем пустые строки
 
 def func_DecryptArray_NEW(data_csv: list[dict], aes_key: bytes) -> list[dict]:
     """
     Дешифрует значения в списке словарей (как строки CSV), зашифрованные AES-256-CBC.
+    Значения дешифруются постолбцово одним вызовом AesCbcCodec.decrypt_many (через кэш decrypt_cache);
+    пустые, нестроковые и начинающиеся с '#' значения возвращаются без изменений.
     """
     if not data_csv:
         return []
 
     columns = list(data_csv[0].keys()) if data_csv else []
-    decrypted_array = []
+    decrypted_array = [{} for _ in data_csv]
 
-    for row in data_csv:
-        new_row = {}
-        for col in columns:
+    for col in columns:
+        targets = []
+        for i, row in enumerate(data_csv):
             encrypted_value = row.get(col, "")
-            if not isinstance(encrypted_value, str) or not encrypted_value or encrypted_value.startswith("#"):
-                decrypted_value = encrypted_value
-            else:
-                try:
-                    # ВАЖНО: Здесь должна быть вызвана РЕАЛЬНАЯ новая функция дешифрования
-                    decrypted_value = func_DecryptText_NEW(encrypted_value, aes_key)
-                    if decrypted_value is None:
-                        write_log("Дешифрование новым методом вернуло None.", MODULE_LOG_FILE_ALL,
-                                  MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
-                        raise ValueError("Дешифрование новым методом вернуло None.")
-                except Exception as e:
-                    write_log(f"Предупреждение: Ошибка дешифрования для ячейки "
-                              f"[{row.get('__index__', '?')}][{col}]: {e}", MODULE_LOG_FILE_ALL,
-                              MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
-                    raise ValueError(f"Ошибка дешифрования для ячейки [{row.get('__index__', '?')}][{col}]: {e}")
-                    # Продолжаем с пустым значением или останавливаем. Выберем продолжение.
-                    decrypted_value = "" # Или пустая строка, в зависимости от логики
-            new_row[col] = decrypted_value
-        # Для отладки можно добавить индекс строки
-        # new_row['__index__'] = data_csv.index(row)
-        decrypted_array.append(new_row)
+            decrypted_array[i][col] = encrypted_value
+            if isinstance(encrypted_value, str) and encrypted_value and not encrypted_value.startswith("#"):
+                targets.append(i)
+
+        try:
+            decrypted_values = decrypt_cached([decrypted_array[i][col] for i in targets], aes_key)
+        except Exception as e:
+            write_log(f"Предупреждение: Ошибка дешифрования для столбца [{col}]: {e}", MODULE_LOG_FILE_ALL,
+                      MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+            raise ValueError(f"Ошибка дешифрования для столбца [{col}]: {e}")
+
+        for i, decrypted_value in zip(targets, decrypted_values):
+            decrypted_array[i][col] = decrypted_value
 
     return [row for row in decrypted_array if any(v for v in row.values() if v)] # Фильтруем пустые строки
-# --- /ФУНКЦИИ ДЛЯ РАБОТЫ С МАССИВАМИ ---
\ No newline at end of file
+# --- /ФУНКЦИИ ДЛЯ РАБОТЫ С МАССИВАМИ ---
+
+# --- ПАРАЛЛЕЛЬНОЕ ШИФРОВАНИЕ/ДЕШИФРОВАНИЕ ---
+# Ключ рабочего процесса: передаётся один раз в инициализаторе пула, а не с каждой задачей
+_worker_aes_key: bytes | None = None
+
+
+def _init_crypto_worker(aes_key: bytes):
+    """Инициализатор рабочего процесса: сохраняет ключ и готовит кодек."""
+    global _worker_aes_key
+    _worker_aes_key = aes_key
+    get_codec(aes_key)
+
+
+def _decrypt_values_chunk(chunk: list[str]) -> list[str]:
+    """Дешифрует порцию отдельных значений в рабочем процессе."""
+    return get_codec(_worker_aes_key).decrypt_many(chunk)
+
+
+def _encrypt_values_chunk(chunk: list[str]) -> list[str]:
+    """Шифрует порцию отдельных значений в рабочем процессе."""
+    return get_codec(_worker_aes_key).encrypt_many(chunk)
+
+
+def crypto_pool(aes_key: bytes, workers: int) -> ProcessPoolExecutor:
+    """
+    Создаёт пул процессов для шифрования/дешифрования; ключ передаётся один раз в инициализаторе.
+    """
+    # Проверяем ключ до запуска пула, чтобы ошибка не повторялась в каждом процессе
+    get_codec(aes_key)
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_crypto_worker, initargs=(aes_key,))
+
+
+def decrypt_values(values: list[str], aes_key: bytes, executor: ProcessPoolExecutor | None = None,
+                   use_cache: bool = True) -> list[str]:
+    """
+    Дешифрует список Base64-значений; при переданном пуле процессов — порциями
+    по PARALLEL_CHUNK_ROWS значений. use_cache=False — без кэша decrypt_cache
+    (для учётных данных: открытый текст не остаётся в памяти процесса).
+    """
+    if executor is None or len(values) <= PARALLEL_CHUNK_ROWS:
+        return decrypt_cached(values, aes_key) if use_cache else get_codec(aes_key).decrypt_many(values)
+
+    chunks = [values[i:i + PARALLEL_CHUNK_ROWS] for i in range(0, len(values), PARALLEL_CHUNK_ROWS)]
+    decrypted_values = []
+    for decrypted_chunk in executor.map(_decrypt_values_chunk, chunks):
+        decrypted_values.extend(decrypted_chunk)
+    return decrypted_values
+
+
+def encrypt_values(values: list[str], aes_key: bytes, executor: ProcessPoolExecutor | None = None) -> list[str]:
+    """
+    Шифрует список строк; при переданном пуле процессов — порциями по PARALLEL_CHUNK_ROWS значений.
+    """
+    if executor is None or len(values) <= PARALLEL_CHUNK_ROWS:
+        return get_codec(aes_key).encrypt_many(values)
+
+    chunks = [values[i:i + PARALLEL_CHUNK_ROWS] for i in range(0, len(values), PARALLEL_CHUNK_ROWS)]
+    encrypted_values = []
+    for encrypted_chunk in executor.map(_encrypt_values_chunk, chunks):
+        encrypted_values.extend(encrypted_chunk)
+    return encrypted_values
+# --- /ПАРАЛЛЕЛЬНОЕ ШИФРОВАНИЕ/ДЕШИФРОВАНИЕ ---
+
+# --- ПОТОКОВОЕ ШИФРОВАНИЕ ФАЙЛОВ ---
+def _process_file(src_path: str, dst_path: str, aes_key: bytes, encrypt: bool, chunk_bytes: int) -> dict:
+    """
+    Общая часть encrypt_file/decrypt_file: источник отображается в память (mmap),
+    результат пишется во временный файл рядом с dst_path и атомарно переименовывается.
+    """
+    action = "Шифрование" if encrypt else "Дешифрование"
+    codec = get_codec(aes_key)
+    tmp_path = f"{dst_path}.tmp{os.getpid()}"
+    try:
+        start = time.perf_counter()
+        with open(src_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            size = os.fstat(src.fileno()).st_size
+            # Пустой файл отобразить в память нельзя — читаем его как обычный поток
+            source = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) if size else src
+            try:
+                if encrypt:
+                    codec.encrypt_stream(source, dst, chunk_bytes)
+                else:
+                    codec.decrypt_stream(source, dst, chunk_bytes)
+            finally:
+                if source is not src:
+                    try:
+                        source.close()
+                    except BufferError:
+                        # При ошибке срезы mmap ещё удерживаются трассировкой — mmap закроется сборщиком
+                        pass
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_path, dst_path)
+        seconds = time.perf_counter() - start
+
+        mb_s = size / 2 ** 20 / seconds if seconds > 0 else 0.0
+        write_log(f"[crypto] {action} файла '{src_path}' -> '{dst_path}': {size} байт "
+                  f"за {seconds:.2f} с ({mb_s:.1f} МБ/с).", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+        return {"bytes": size, "seconds": seconds, "mb_s": mb_s}
+
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        write_log(f"[crypto] Ошибка: {action.lower()} файла '{src_path}': {e}", MODULE_LOG_FILE_ALL,
+                  MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+        raise RuntimeError(f"Ошибка: {action.lower()} файла '{src_path}': {e}") from e
+
+
+def encrypt_file(src_path: str, dst_path: str, aes_key: bytes, chunk_bytes: int = FILE_CHUNK_BYTES) -> dict:
+    """
+    Потоково шифрует файл src_path в dst_path (формат IV + Ciphertext, PKCS7) с постоянным
+    расходом памяти.
+
+    Args:
+        src_path: Путь к исходному файлу.
+        dst_path: Путь к зашифрованному файлу.
+        aes_key: 32-байтовый AES-ключ.
+        chunk_bytes: Размер порции в байтах.
+
+    Returns:
+        Словарь: bytes (размер исходного файла), seconds, mb_s (пропускная способность).
+    """
+    return _process_file(src_path, dst_path, aes_key, True, chunk_bytes)
+
+
+def decrypt_file(src_path: str, dst_path: str, aes_key: bytes, chunk_bytes: int = FILE_CHUNK_BYTES) -> dict:
+    """
+    Потоково дешифрует файл src_path, зашифрованный encrypt_file, в dst_path
+    с постоянным расходом памяти.
+
+    Args:
+        src_path: Путь к зашифрованному файлу.
+        dst_path: Путь к расшифрованному файлу.
+        aes_key: 32-байтовый AES-ключ.
+        chunk_bytes: Размер порции в байтах.
+
+    Returns:
+        Словарь: bytes (размер зашифрованного файла), seconds, mb_s (пропускная способность).
+    """
+    return _process_file(src_path, dst_path, aes_key, False, chunk_bytes)
+# --- /ПОТОКОВОЕ ШИФРОВАНИЕ ФАЙЛОВ ---
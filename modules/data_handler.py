@@ -2,25 +2,178 @@
 """
 Модуль для работы с CSV-файлами.
 Чтение, запись, шифрование/дешифрование данных.
+Чтение записями (read_encrypted_records, find_encrypted_csv_records) работает и без pandas —
+через модуль csv стандартной библиотеки (см. CSV_BACKEND).
+
+Формат зашифрованного CSV (v1) — как у Export-Csv в PowerShell: первая строка служебная
+('#TYPE ...', её пропускают и Import-Csv, и чтение здесь — skiprows=1), затем строка заголовка
+и строки с ячейками Base64(IV + Ciphertext). При перезаписи существующего файла его служебная
+строка сохраняется, новый файл получает CSV_PREAMBLE.
 """
+from __future__ import annotations
+
+import csv
+import io
+import itertools
 import os
+import shutil
 import sys
+from collections.abc import Mapping
+from contextlib import closing, nullcontext
+from typing import Iterator
 
-import pandas as pd
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    # Установка без pandas: доступно только чтение записями через бэкенд csv
+    np = pd = None
 
 from settings import MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_ERROR
-from . import crypto  # Импортируем модуль crypto из того же папки
-from .main_functions import write_log
+from . import blind_index, crypto, table_container  # Импортируем модули из той же папки
+from .main_functions import fsync_dir, write_log
 from .notifications import show_popup_notification
 
+# --- НАСТРОЙКИ ---
+# Количество строк в одной порции потокового чтения зашифрованного CSV
+READ_CHUNK_ROWS = 5000
+# Количество строк в одной порции потоковой записи зашифрованного CSV
+WRITE_CHUNK_ROWS = 20000
+# Первая служебная строка нового зашифрованного CSV (как у Export-Csv в PowerShell; пропускается
+# при чтении, skiprows=1). У существующего файла при перезаписи сохраняется его собственная
+CSV_PREAMBLE = "#TYPE System.Management.Automation.PSCustomObject"
+# Формат записи по умолчанию: 1 — поячеечный CSV, 2 — контейнер table_container
+DEFAULT_FORMAT_VERSION = 1
+# Бэкенд чтения записями: "pandas", "csv" (модуль csv стандартной библиотеки) или
+# "auto" — pandas, если он установлен, иначе csv
+CSV_BACKEND = "auto"
+# --- /НАСТРОЙКИ ---
+
+
+def csv_backend() -> str:
+    """Действующий бэкенд чтения записями: 'pandas' или 'csv' (по настройке CSV_BACKEND)."""
+    if CSV_BACKEND == "csv" or (CSV_BACKEND == "auto" and pd is None):
+        return "csv"
+    if pd is None:
+        raise RuntimeError("CSV_BACKEND = 'pandas', но pandas не установлен.")
+    return "pandas"
+
+
+def _is_encrypted_value(value) -> bool:
+    """Значение подлежит дешифрованию (те же правила, что в func_DecryptArray_NEW)."""
+    return isinstance(value, str) and value != "" and not value.startswith("#")
+
+
+def decrypt_dataframe(df: pd.DataFrame, aes_key: bytes, workers: int | None = None,
+                      parallel_min_rows: int = crypto.PARALLEL_MIN_ROWS,
+                      columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Дешифрует DataFrame постолбцово, без преобразования в список словарей.
+    Каждый столбец заменяется массивом object с расшифрованными значениями; пустые,
+    нестроковые и начинающиеся с '#' значения остаются без изменений, строки без
+    единого непустого значения отбрасываются (как в func_DecryptArray_NEW).
+    Ради экономии памяти столбцы переданного df заменяются расшифрованными на месте (без копии
+    всей таблицы): после вызова df содержит расшифрованные значения. Если исходная таблица
+    ещё нужна, передавайте df.copy().
+
+    Args:
+        df: DataFrame с зашифрованными значениями (изменяется на месте, см. выше).
+        aes_key: 32-байтовый AES-ключ для дешифрования.
+        workers: Количество процессов для дешифрования (по умолчанию — количество ядер, 1 — последовательно).
+        parallel_min_rows: Минимальное количество строк для включения параллельного режима.
+        columns: Дешифруемые столбцы (по умолчанию — все); остальные остаются зашифрованными.
+
+    Returns:
+        DataFrame с расшифрованными данными.
+    """
+    workers = workers or os.cpu_count() or 1
+    use_pool = workers > 1 and len(df) >= parallel_min_rows
+    keep_rows = np.zeros(len(df), dtype=bool)
+
+    with crypto.crypto_pool(aes_key, workers) if use_pool else nullcontext() as executor:
+        for position, col in enumerate(df.columns):
+            values = df.iloc[:, position].to_numpy(dtype=object, copy=True)
+            if columns is not None and col not in columns:
+                targets = []
+            else:
+                targets = [i for i, value in enumerate(values) if _is_encrypted_value(value)]
+            if targets:
+                try:
+                    decrypted_values = crypto.decrypt_values([values[i] for i in targets], aes_key, executor)
+                except Exception as e:
+                    write_log(f"Предупреждение: Ошибка дешифрования для столбца [{col}]: {e}",
+                              MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+                    raise ValueError(f"Ошибка дешифрования для столбца [{col}]: {e}")
+                for i, decrypted_value in zip(targets, decrypted_values):
+                    values[i] = decrypted_value
+                df.isetitem(position, values)
+            keep_rows |= np.fromiter((bool(value) for value in values), dtype=bool, count=len(values))
+
+    if not keep_rows.all():
+        df = df[keep_rows].reset_index(drop=True)
+    return df
+
+
+def _plain_values(values) -> list[str]:
+    """Значения столбца строками для шифрования: None/NaN — пустая ячейка (иначе str() дал бы 'nan')."""
+    return [value if isinstance(value, str) else "" if value is None or value != value else str(value)
+            for value in values]
+
+
+def encrypt_dataframe(df: pd.DataFrame, aes_key: bytes, executor=None) -> pd.DataFrame:
+    """
+    Шифрует DataFrame постолбцово, без преобразования в список словарей.
+    Значения приводятся к строке, пустые значения остаются пустыми, строки без
+    единого зашифрованного значения отбрасываются (как в func_EncryptArray_NEW).
+
+    Args:
+        df: DataFrame с данными для шифрования (не изменяется).
+        aes_key: 32-байтовый AES-ключ для шифрования.
+        executor: Пул процессов crypto.crypto_pool (None — шифрование в текущем процессе).
+
+    Returns:
+        Новый DataFrame с зашифрованными значениями.
+    """
+    keep_rows = np.zeros(len(df), dtype=bool)
+    encrypted_columns = {}
+
+    for position, col in enumerate(df.columns):
+        values = np.full(len(df), "", dtype=object)
+        plain_values = _plain_values(df.iloc[:, position])
+        targets = [i for i, plain_value in enumerate(plain_values) if plain_value]
+        if targets:
+            try:
+                encrypted_values = crypto.encrypt_values([plain_values[i] for i in targets], aes_key, executor)
+            except Exception as e:
+                write_log(f"Предупреждение: Ошибка шифрования для столбца [{col}]: {e}",
+                          MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+                raise ValueError(f"Ошибка шифрования для столбца [{col}]: {e}")
+            for i, encrypted_value in zip(targets, encrypted_values):
+                values[i] = encrypted_value
+            keep_rows[targets] = True
+        encrypted_columns[col] = values
+        del plain_values
+
+    df_encrypted = pd.DataFrame(encrypted_columns, columns=df.columns, copy=False)
+    if not keep_rows.all():
+        df_encrypted = df_encrypted[keep_rows].reset_index(drop=True)
+    return df_encrypted
 
-def read_encrypted_csv(file_path: str, aes_key: bytes) -> pd.DataFrame:
+
+def read_encrypted_csv(file_path: str, aes_key: bytes, workers: int | None = None,
+                       parallel_min_rows: int = crypto.PARALLEL_MIN_ROWS,
+                       columns: list[str] | None = None) -> pd.DataFrame:
     """
     Читает зашифрованный CSV-файл, дешифрует его и возвращает DataFrame.
+    Дешифрование выполняется постолбцово (decrypt_dataframe), большие файлы — в пуле процессов.
+    Файлы в формате v2 (table_container) распознаются по сигнатуре и читаются без CSV.
 
     Args:
         file_path: Путь к зашифрованному CSV-файлу.
         aes_key: 32-байтовый AES-ключ для дешифрования.
+        workers: Количество процессов для дешифрования (по умолчанию — количество ядер, 1 — последовательно).
+        parallel_min_rows: Минимальное количество строк для включения параллельного режима.
+        columns: Читаемые и дешифруемые столбцы (по умолчанию — все).
 
     Returns:
         DataFrame с расшифрованными данными.
@@ -33,18 +186,16 @@ def read_encrypted_csv(file_path: str, aes_key: bytes) -> pd.DataFrame:
 
         write_log(f"[data_handler] Чтение зашифрованного CSV-файла: '{file_path}'...",
                   MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
-        # 1. Читаем CSV в DataFrame
-        df_encrypted = pd.read_csv(file_path, encoding='utf-8', skiprows=1)
-
-        # 2. Преобразуем DataFrame в список словарей
-        data_csv_list = df_encrypted.to_dict('records')
-
-        # 3. Дешифруем массив
-        write_log("[data_handler] Дешифрование данных...",MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
-        data_decrypted_list = crypto.func_DecryptArray_NEW(data_csv_list, aes_key)
+        if table_container.is_table_file(file_path):
+            # Формат v2: сегменты столбцов дешифруются целиком
+            df_decrypted = table_container.read_table(file_path, aes_key, columns)
+        else:
+            # 1. Читаем CSV в DataFrame
+            df_encrypted = pd.read_csv(file_path, encoding='utf-8', skiprows=1, usecols=columns)
 
-        # 4. Преобразуем обратно в DataFrame
-        df_decrypted = pd.DataFrame(data_decrypted_list)
+            # 2. Дешифруем постолбцово
+            write_log("[data_handler] Дешифрование данных...",MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+            df_decrypted = decrypt_dataframe(df_encrypted, aes_key, workers, parallel_min_rows)
         df_arm_clean = df_decrypted.dropna(how="all")
         if df_arm_clean.empty:
             raise ValueError("[data_handler] CSV не содержит строк с реальными данными: все строки пустые или полностью NULL.")
@@ -66,34 +217,360 @@ def read_encrypted_csv(file_path: str, aes_key: bytes) -> pd.DataFrame:
         )
         sys.exit(1)
 
-def write_encrypted_csv(df: pd.DataFrame, file_path: str, aes_key: bytes):
+class LazyDecryptedRow(Mapping):
+    """
+    Строка зашифрованного CSV, часть столбцов которой дешифруется при первом обращении.
+    Расшифрованное значение запоминается, повторное обращение не дешифрует его снова.
+    """
+
+    __slots__ = ("_values", "_lazy_columns", "_decrypted", "_aes_key")
+
+    def __init__(self, values: dict, lazy_columns: frozenset, aes_key: bytes):
+        self._values = values
+        self._lazy_columns = lazy_columns
+        self._decrypted = {}
+        self._aes_key = aes_key
+
+    def __getitem__(self, col):
+        value = self._values[col]
+        if col not in self._lazy_columns:
+            return value
+        if col not in self._decrypted:
+            if _is_encrypted_value(value):
+                value = crypto.get_codec(self._aes_key).decrypt_text(value)
+            self._decrypted[col] = value
+        return self._decrypted[col]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return f"LazyDecryptedRow({list(self._values)}, отложено: {sorted(self._lazy_columns - self._decrypted.keys())})"
+
+
+def _iter_csv_chunks(file_path: str, aes_key: bytes, chunk_rows: int, usecols: list[str] | None,
+                     decrypt_columns: list[str] | None) -> Iterator[pd.DataFrame]:
+    """
+    Читает зашифрованный CSV порциями (столбцы usecols) и дешифрует в каждой порции
+    столбцы decrypt_columns (None — все). Ошибки обрабатываются так же, как в read_encrypted_csv.
+    Файл формата v2 читается поблочно, и все столбцы порции выдаются уже расшифрованными.
+    """
+    try:
+        if not os.path.exists(file_path):
+            write_log(f"Файл '{file_path}' не найден.",MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST,
+                      "error",MODULE_LOG_FILE_ERROR)
+            raise FileNotFoundError(f"Файл '{file_path}' не найден.")
+
+        write_log(f"[data_handler] Потоковое чтение зашифрованного CSV-файла: '{file_path}' "
+                  f"(порция {chunk_rows} строк)...", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+        has_data = False
+        if table_container.is_table_file(file_path):
+            with table_container.TableReader(file_path, aes_key) as reader:
+                for df_chunk in reader.iter_blocks(usecols):
+                    has_data = True
+                    yield df_chunk
+        else:
+            with pd.read_csv(file_path, encoding='utf-8', skiprows=1, chunksize=chunk_rows, usecols=usecols) as reader:
+                for df_chunk in reader:
+                    # Порции небольшие, поэтому дешифруем последовательно, без пула процессов
+                    df_chunk = decrypt_dataframe(df_chunk, aes_key, workers=1, columns=decrypt_columns)
+                    if df_chunk.dropna(how="all").empty:
+                        continue
+                    has_data = True
+                    yield df_chunk
+
+        if not has_data:
+            raise ValueError("[data_handler] CSV не содержит строк с реальными данными: все строки пустые или полностью NULL.")
+
+    except Exception as e:
+        error_message = f"[data_handler] Ошибка потокового чтения/дешифрования CSV-файла '{file_path}': {e}"
+        write_log(error_message, MODULE_LOG_FILE_ALL,
+                  MODULE_LOG_FILE_LAST,"error", MODULE_LOG_FILE_ERROR)
+        show_popup_notification(
+            "MODULE_FILE",
+            error_message,
+            "critical",  # ← бесконечное уведомление
+            0
+        )
+        sys.exit(1)
+
+def iter_encrypted_csv(file_path: str, aes_key: bytes, chunk_rows: int = READ_CHUNK_ROWS,
+                       columns: list[str] | None = None) -> Iterator[pd.DataFrame]:
+    """
+    Читает зашифрованный CSV-файл порциями по chunk_rows строк и выдаёт расшифрованные
+    порции DataFrame. Пиковая память пропорциональна размеру порции, а не файла;
+    чтение можно прекратить в любой момент, просто перестав итерировать.
+
+    Args:
+        file_path: Путь к зашифрованному CSV-файлу.
+        aes_key: 32-байтовый AES-ключ для дешифрования.
+        chunk_rows: Количество строк в одной порции.
+        columns: Читаемые и дешифруемые столбцы (по умолчанию — все).
+
+    Yields:
+        DataFrame с расшифрованными строками очередной порции.
+    """
+    yield from _iter_csv_chunks(file_path, aes_key, chunk_rows, columns, None)
+
+def iter_encrypted_rows(file_path: str, aes_key: bytes, columns: list[str] | None = None,
+                        chunk_rows: int = READ_CHUNK_ROWS) -> Iterator[LazyDecryptedRow]:
+    """
+    Ленивый режим чтения: выдаёт строки зашифрованного CSV-файла, в которых столбцы columns
+    дешифрованы сразу (постолбцово для всей порции), а остальные — при первом обращении.
+
+    Args:
+        file_path: Путь к зашифрованному CSV-файлу.
+        aes_key: 32-байтовый AES-ключ для дешифрования.
+        columns: Столбцы, дешифруемые сразу (по умолчанию — ни одного).
+        chunk_rows: Количество строк в одной порции.
+
+    Yields:
+        LazyDecryptedRow для каждой строки файла.
+    """
+    eager_columns = list(columns or [])
+    # В формате v2 порции уже расшифрованы целиком, отложенных столбцов нет
+    is_table = table_container.is_table_file(file_path)
+    for df_chunk in _iter_csv_chunks(file_path, aes_key, chunk_rows, None, eager_columns):
+        lazy_columns = frozenset() if is_table else frozenset(col for col in df_chunk.columns
+                                                              if col not in eager_columns)
+        for record in df_chunk.to_dict('records'):
+            yield LazyDecryptedRow(record, lazy_columns, aes_key)
+
+def find_encrypted_csv_rows(file_path: str, aes_key: bytes, column: str, value: str,
+                            chunk_rows: int = READ_CHUNK_ROWS, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Ищет в зашифрованном CSV-файле строки, у которых column == value.
+    Если рядом с файлом есть актуальный слепой индекс по column (см. blind_index),
+    читаются и дешифруются только строки, указанные индексом. Иначе файл читается порциями; в каждой порции дешифруется только столбец column,
+    остальные столбцы дешифруются лишь у найденных строк. Чтение прекращается
+    на первой порции, содержащей совпадения.
+
+    Args:
+        file_path: Путь к зашифрованному CSV-файлу.
+        aes_key: 32-байтовый AES-ключ для дешифрования.
+        column: Имя столбца для поиска (например, 'IPaddress').
+        value: Искомое расшифрованное значение.
+        chunk_rows: Количество строк в одной порции.
+        columns: Возвращаемые столбцы помимо column (по умолчанию — все).
+
+    Returns:
+        DataFrame с найденными строками (пустой, если совпадений нет).
+    """
+    usecols = None if columns is None else list(dict.fromkeys([column, *columns]))
+
+    if table_container.is_table_file(file_path):
+        return _find_in_table(file_path, aes_key, column, value, usecols)
+
+    # Слепой индекс (если есть и актуален) позволяет прочитать только нужные строки
+    df_indexed = _find_by_blind_index(file_path, aes_key, column, value, usecols)
+    if df_indexed is not None:
+        return df_indexed
+
+    df_matched = pd.DataFrame()
+    with closing(_iter_csv_chunks(file_path, aes_key, chunk_rows, usecols, [column])) as chunks:
+        for df_chunk in chunks:
+            df_matched = df_chunk[df_chunk[column] == value].reset_index(drop=True)
+            if not df_matched.empty:
+                other_columns = [col for col in df_matched.columns if col != column]
+                return decrypt_dataframe(df_matched, aes_key, workers=1, columns=other_columns)
+    return df_matched
+
+def _find_in_table(file_path: str, aes_key: bytes, column: str, value: str,
+                   usecols: list[str] | None) -> pd.DataFrame:
+    """
+    Поиск строк в файле формата v2: в каждом блоке дешифруется только столбец column,
+    остальные столбцы — лишь в блоках с совпадениями.
+    """
+    try:
+        with table_container.TableReader(file_path, aes_key) as reader:
+            df_matched = reader.find_rows(column, value, usecols)
+        write_log(f"[data_handler] Поиск в контейнере '{file_path}': найдено строк {len(df_matched)}.",
+                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+        return df_matched
+
+    except Exception as e:
+        error_message = f"[data_handler] Ошибка поиска в зашифрованном файле '{file_path}': {e}"
+        write_log(error_message, MODULE_LOG_FILE_ALL,
+                  MODULE_LOG_FILE_LAST,"error", MODULE_LOG_FILE_ERROR)
+        show_popup_notification(
+            "MODULE_FILE",
+            error_message,
+            "critical",  # ← бесконечное уведомление
+            0
+        )
+        sys.exit(1)
+
+def _find_by_blind_index(file_path: str, aes_key: bytes, column: str, value: str,
+                         usecols: list[str] | None) -> pd.DataFrame | None:
+    """
+    Поиск строк через слепой индекс. Возвращает None, если индекс отсутствует,
+    устарел или не подтвердился дешифрованием, — тогда нужен полный просмотр файла.
+    """
+    try:
+        found = blind_index.lookup_blind_index(file_path, column, value, aes_key)
+        if found is None:
+            return None
+        header_offset, offsets = found
+
+        # Читаем строку заголовка и строки по смещениям из индекса
+        lines = _read_lines_at(file_path, [header_offset, *offsets])
+        df_rows = pd.read_csv(io.BytesIO(b"".join(lines)), encoding='utf-8', usecols=usecols)
+        if not offsets:
+            write_log(f"[data_handler] Слепой индекс: значение не найдено в '{file_path}'.",
+                      MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+            return df_rows
+
+        df_rows = decrypt_dataframe(df_rows, aes_key, workers=1, columns=[column])
+        df_matched = df_rows[df_rows[column] == value].reset_index(drop=True)
+        if df_matched.empty:
+            write_log(f"[data_handler] Слепой индекс '{file_path}' не подтвердился, выполняется полный просмотр.",
+                      MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+            return None
+
+        write_log(f"[data_handler] Слепой индекс: прочитано строк {len(offsets)} из '{file_path}'.",
+                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+        other_columns = [col for col in df_matched.columns if col != column]
+        return decrypt_dataframe(df_matched, aes_key, workers=1, columns=other_columns)
+
+    except Exception as e:
+        write_log(f"[data_handler] Ошибка поиска по слепому индексу '{file_path}': {e}. "
+                  f"Выполняется полный просмотр.", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST,
+                  "error", MODULE_LOG_FILE_ERROR)
+        return None
+
+def _read_lines_at(file_path: str, offsets: list[int]) -> list[bytes]:
+    """Читает строки файла, начинающиеся по смещениям offsets."""
+    lines = []
+    with open(file_path, 'rb') as f:
+        for offset in offsets:
+            f.seek(offset)
+            line = f.readline()
+            lines.append(line if line.endswith(b"\n") else line + b"\n")
+    return lines
+
+def _existing_preamble(file_path: str) -> str:
+    """
+    Служебная первая строка существующего зашифрованного CSV (без перевода строки) или
+    CSV_PREAMBLE, если файла нет, это контейнер v2 или первая строка не служебная ('#...').
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            first_line = f.readline(4096)
+    except OSError:
+        return CSV_PREAMBLE
+    preamble = first_line.rstrip(b"\r\n").decode('utf-8-sig', 'replace')
+    if first_line.startswith(table_container.MAGIC) or not preamble.startswith("#"):
+        return CSV_PREAMBLE
+    return preamble
+
+def _create_temp_file(target_dir: str, prefix: str) -> tuple[int, str]:
+    """
+    Создаёт временный файл в папке target_dir с правами 0666 с учётом umask (как у обычного
+    нового файла; tempfile.mkstemp создал бы файл с правами 0600).
+
+    Returns:
+        Дескриптор, открытый на запись, и путь к файлу.
+    """
+    while True:
+        tmp_path = os.path.join(target_dir, f"{prefix}{os.getpid()}.{os.urandom(6).hex()}.tmp")
+        try:
+            return os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0),
+                           0o666), tmp_path
+        except FileExistsError:
+            continue
+
+def _index_column_values(df_chunk: pd.DataFrame, df_encrypted: pd.DataFrame, index_column: str) -> list[str]:
+    """
+    Открытые значения столбца слепого индекса для строк порции, записанных в файл
+    (encrypt_dataframe отбрасывает строки без единого непустого значения).
+    """
+    index_values = _plain_values(df_chunk[index_column])
+    if len(df_encrypted) == len(df_chunk):
+        return index_values
+    keep_rows = np.zeros(len(df_chunk), dtype=bool)
+    for position in range(df_chunk.shape[1]):
+        keep_rows |= np.fromiter((bool(value) for value in _plain_values(df_chunk.iloc[:, position])),
+                                 dtype=bool, count=len(df_chunk))
+    return [value for value, keep in zip(index_values, keep_rows) if keep]
+
+def write_encrypted_csv(df: pd.DataFrame, file_path: str, aes_key: bytes, index_column: str | None = None,
+                        workers: int | None = None, parallel_min_rows: int = crypto.PARALLEL_MIN_ROWS,
+                        chunk_rows: int = WRITE_CHUNK_ROWS, format_version: int = DEFAULT_FORMAT_VERSION):
     """
     Шифрует данные из DataFrame и записывает их в зашифрованный CSV-файл.
+    Данные шифруются и пишутся порциями по chunk_rows строк во временный файл в той же
+    папке, который после fsync атомарно заменяет file_path: при сбое на середине записи
+    прежний файл остаётся целым. Большие таблицы шифруются в пуле процессов.
+    При format_version=2 файл записывается компактным контейнером table_container
+    (шифрование по сегментам столбцов, сжатие, произвольный доступ к строкам).
 
     Args:
         df: DataFrame с данными для шифрования.
         file_path: Путь, куда сохранить зашифрованный CSV-файл.
         aes_key: 32-байтовый AES-ключ для шифрования.
+        index_column: Столбец, по которому рядом с файлом строится слепой индекс
+            (например, 'IPaddress'); None — индекс не строится, старый удаляется.
+        workers: Количество процессов для шифрования (по умолчанию — количество ядер, 1 — последовательно).
+        parallel_min_rows: Минимальное количество строк для включения параллельного режима.
+        chunk_rows: Количество строк в одной порции записи.
+        format_version: 1 — поячеечный CSV (слепой индекс поддерживается), 2 — контейнер v2.
     """
+    tmp_path = None
     try:
-        # 1. Преобразуем DataFrame в список словарей
-        data_csv_list = df.to_dict('records')
-
-        # 2. Шифруем массив
-        write_log("[data_handler] Шифрование данных...", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
-        data_encrypted_list = crypto.func_EncryptArray_NEW(data_csv_list, aes_key)
+        workers = workers or os.cpu_count() or 1
+        use_pool = workers > 1 and len(df) >= parallel_min_rows
+        target_dir = os.path.dirname(os.path.abspath(file_path))
+        if format_version not in (1, table_container.FORMAT_VERSION):
+            raise ValueError(f"Неизвестная версия формата: {format_version}.")
+        tmp_fd, tmp_path = _create_temp_file(target_dir, os.path.basename(file_path) + ".")
+        index_values = []
+        if format_version == table_container.FORMAT_VERSION:
+            # Слепой индекс строится только для CSV; в контейнере v2 поиск идёт по сегментам столбца
+            index_column = None
 
-        # 3. Преобразуем обратно в DataFrame
-        df_encrypted = pd.DataFrame(data_encrypted_list)
+        # 1. Шифруем порциями и пишем во временный файл
+        write_log(f"[data_handler] Шифрование и запись зашифрованного файла (формат v{format_version}): "
+                  f"'{file_path}' (строк: {len(df)}, порция: {chunk_rows}, "
+                  f"процессов: {workers if use_pool else 1})...", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+        with os.fdopen(tmp_fd, 'wb') as f:
+            if format_version == table_container.FORMAT_VERSION:
+                table_container.write_table(df, f, aes_key)
+            else:
+                with crypto.crypto_pool(aes_key, workers) if use_pool else nullcontext() as executor:
+                    text = io.TextIOWrapper(f, encoding='utf-8', newline='')
+                    text.write(_existing_preamble(file_path) + "\n")
+                    for start in range(0, max(len(df), 1), chunk_rows):
+                        df_chunk = df.iloc[start:start + chunk_rows]
+                        df_encrypted = encrypt_dataframe(df_chunk, aes_key, executor)
+                        df_encrypted.to_csv(text, index=False, header=(start == 0))
+                        if index_column:
+                            index_values.extend(_index_column_values(df_chunk, df_encrypted, index_column))
+                    text.flush()
+                    text.detach()
+            f.flush()
+            os.fsync(f.fileno())
 
-        # 4. Записываем в CSV
-        write_log(f"[data_handler] Запись зашифрованного CSV-файла: '{file_path}'...",
-                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
-        df_encrypted.to_csv(file_path, index=False, encoding='utf-8')
+        # 2. Атомарно заменяем целевой файл (с сохранением прав прежнего файла; новый — с правами по umask)
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, tmp_path)
+        os.replace(tmp_path, file_path)
+        tmp_path = None
+        fsync_dir(target_dir)
         write_log(f"[data_handler] Файл '{file_path}' успешно зашифрован и записан.",
                   MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
 
+        # 3. Слепой индекс по столбцу поиска
+        if index_column:
+            blind_index.build_blind_index(file_path, index_column, index_values, aes_key)
+        else:
+            blind_index.remove_blind_index(file_path)
+
     except Exception as e:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
         error_message = f"[data_handler] Ошибка шифрования/записи CSV-файла '{file_path}': {e}"
         write_log(error_message, MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST,"error", MODULE_LOG_FILE_ERROR)
         show_popup_notification(
@@ -102,4 +579,235 @@ def write_encrypted_csv(df: pd.DataFrame, file_path: str, aes_key: bytes):
             "critical",  # ← бесконечное уведомление
             0
         )
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+def convert_encrypted_table(src_path: str, dst_path: str, aes_key: bytes, format_version: int,
+                            index_column: str | None = None) -> dict:
+    """
+    Конвертирует зашифрованный файл между форматами: поячеечный CSV (v1) <-> контейнер (v2).
+    Исходный формат определяется по сигнатуре; src_path и dst_path могут совпадать
+    (запись атомарная, исходный файл заменяется только после успешной записи).
+
+    Args:
+        src_path: Путь к исходному зашифрованному файлу (v1 или v2).
+        dst_path: Путь к результирующему файлу.
+        aes_key: 32-байтовый AES-ключ.
+        format_version: Формат результата: 1 или 2.
+        index_column: Столбец слепого индекса для результата в формате v1.
+
+    Returns:
+        Словарь: rows, src_bytes, dst_bytes.
+    """
+    src_bytes = os.path.getsize(src_path) if os.path.exists(src_path) else 0
+    df = read_encrypted_csv(src_path, aes_key)
+    write_encrypted_csv(df, dst_path, aes_key, index_column=index_column, format_version=format_version)
+    result = {"rows": len(df), "src_bytes": src_bytes, "dst_bytes": os.path.getsize(dst_path)}
+    write_log(f"[data_handler] Файл '{src_path}' сконвертирован в формат v{format_version}: '{dst_path}' "
+              f"(строк: {result['rows']}, размер: {result['src_bytes']} -> {result['dst_bytes']} байт).",
+              MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+    return result
+
+
+# --- ЧТЕНИЕ ЗАПИСЯМИ (БЭКЕНДЫ PANDAS И CSV) ---
+def _frame_to_records(df: pd.DataFrame) -> list[dict]:
+    """Строки DataFrame как список словарей; пропуски (NaN) — None."""
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+def _csv_rows(f, usecols: list[str] | None) -> tuple[list[str], Iterator[list]]:
+    """
+    Разбирает зашифрованный CSV модулем csv: пропускает служебную первую строку (как skiprows=1),
+    возвращает имена столбцов usecols (в порядке файла) и итератор строк. Пустые строки
+    файла пропускаются, пустые ячейки — None (как NaN в pandas).
+    """
+    f.readline()
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("CSV не содержит строки заголовка.")
+    if usecols is not None:
+        missing = [col for col in usecols if col not in header]
+        if missing:
+            raise ValueError(f"Столбцы отсутствуют в CSV: {missing}.")
+    positions = [i for i, col in enumerate(header) if usecols is None or col in usecols]
+
+    def rows():
+        for row in reader:
+            if row:
+                yield [row[i] if i < len(row) and row[i] != "" else None for i in positions]
+
+    return [header[i] for i in positions], rows()
+
+def _decrypt_rows(names: list[str], rows: list[list], aes_key: bytes, columns: list[str] | None = None) -> list[list]:
+    """
+    Дешифрует в строках rows столбцы columns (None — все) постолбцово и отбрасывает строки,
+    все значения которых расшифровались в пустые (те же правила, что в decrypt_dataframe).
+    """
+    for position, col in enumerate(names):
+        if columns is not None and col not in columns:
+            continue
+        targets = [i for i, row in enumerate(rows) if _is_encrypted_value(row[position])]
+        if not targets:
+            continue
+        try:
+            decrypted_values = crypto.decrypt_values([rows[i][position] for i in targets], aes_key)
+        except Exception as e:
+            write_log(f"Предупреждение: Ошибка дешифрования для столбца [{col}]: {e}",
+                      MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+            raise ValueError(f"Ошибка дешифрования для столбца [{col}]: {e}")
+        for i, decrypted_value in zip(targets, decrypted_values):
+            rows[i][position] = decrypted_value
+    return [row for row in rows if any(value != "" for value in row)]
+
+def _has_values(rows: list[list]) -> bool:
+    """Есть строка хотя бы с одним непустым значением (аналог not dropna(how='all').empty)."""
+    return any(value is not None for row in rows for value in row)
+
+def _check_csv_file(file_path: str):
+    """Проверки файла перед чтением бэкендом csv."""
+    if not os.path.exists(file_path):
+        write_log(f"Файл '{file_path}' не найден.", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST,
+                  "error", MODULE_LOG_FILE_ERROR)
+        raise FileNotFoundError(f"Файл '{file_path}' не найден.")
+    if table_container.is_table_file(file_path):
+        raise ValueError("Файл формата v2 (table_container) читается только бэкендом pandas.")
+
+def read_encrypted_records(file_path: str, aes_key: bytes, columns: list[str] | None = None) -> list[dict]:
+    """
+    Читает и дешифрует зашифрованный CSV-файл и возвращает строки списком словарей
+    (как func_DecryptArray_NEW; пустые ячейки — None). Бэкенд выбирается настройкой
+    CSV_BACKEND: pandas (read_encrypted_csv) или модуль csv без pandas; результат одинаков.
+
+    Args:
+        file_path: Путь к зашифрованному CSV-файлу.
+        aes_key: 32-байтовый AES-ключ для дешифрования.
+        columns: Читаемые и дешифруемые столбцы (по умолчанию — все).
+
+    Returns:
+        Список словарей {столбец: значение}.
+    """
+    if csv_backend() == "pandas":
+        return _frame_to_records(read_encrypted_csv(file_path, aes_key, columns=columns))
+
+    try:
+        _check_csv_file(file_path)
+        write_log(f"[data_handler] Чтение зашифрованного CSV-файла (бэкенд csv): '{file_path}'...",
+                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            names, rows = _csv_rows(f, columns)
+            rows = _decrypt_rows(names, list(rows), aes_key)
+        if not _has_values(rows):
+            raise ValueError("[data_handler] CSV не содержит строк с реальными данными: все строки пустые или полностью NULL.")
+
+        write_log(f"[data_handler] Файл '{file_path}' успешно прочитан и расшифрован. "
+                  f"Количество строк: {len(rows)}.", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+        return [dict(zip(names, row)) for row in rows]
+
+    except Exception as e:
+        error_message = f"[data_handler] Ошибка чтения/дешифрования CSV-файла '{file_path}': {e}"
+        write_log(error_message, MODULE_LOG_FILE_ALL,
+                  MODULE_LOG_FILE_LAST,"error", MODULE_LOG_FILE_ERROR)
+        show_popup_notification(
+            "MODULE_FILE",
+            error_message,
+            "critical",  # ← бесконечное уведомление
+            0
+        )
+        sys.exit(1)
+
+def find_encrypted_csv_records(file_path: str, aes_key: bytes, column: str, value: str,
+                               chunk_rows: int = READ_CHUNK_ROWS, columns: list[str] | None = None) -> list[dict]:
+    """
+    Ищет в зашифрованном CSV-файле строки, у которых column == value, и возвращает их
+    списком словарей (пустые ячейки — None). Бэкенд выбирается настройкой CSV_BACKEND:
+    pandas (find_encrypted_csv_rows) или модуль csv без pandas с тем же порядком работы —
+    слепой индекс, иначе просмотр порциями с дешифрованием только столбца column
+    до первой порции с совпадениями.
+
+    Args:
+        file_path: Путь к зашифрованному CSV-файлу.
+        aes_key: 32-байтовый AES-ключ для дешифрования.
+        column: Имя столбца для поиска (например, 'IPaddress').
+        value: Искомое расшифрованное значение.
+        chunk_rows: Количество строк в одной порции.
+        columns: Возвращаемые столбцы помимо column (по умолчанию — все).
+
+    Returns:
+        Список словарей с найденными строками (пустой, если совпадений нет).
+    """
+    if csv_backend() == "pandas":
+        return _frame_to_records(find_encrypted_csv_rows(file_path, aes_key, column, value, chunk_rows, columns))
+
+    usecols = None if columns is None else list(dict.fromkeys([column, *columns]))
+    try:
+        _check_csv_file(file_path)
+        found = _find_records_by_blind_index(file_path, aes_key, column, value, usecols)
+        if found is not None:
+            return found
+
+        write_log(f"[data_handler] Потоковое чтение зашифрованного CSV-файла (бэкенд csv): '{file_path}' "
+                  f"(порция {chunk_rows} строк)...", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+        has_data = False
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            names, rows = _csv_rows(f, usecols)
+            position = names.index(column)
+            other_columns = [col for col in names if col != column]
+            while chunk := list(itertools.islice(rows, chunk_rows)):
+                chunk = _decrypt_rows(names, chunk, aes_key, [column])
+                if not _has_values(chunk):
+                    continue
+                has_data = True
+                matched = [row for row in chunk if row[position] == value]
+                if matched:
+                    return [dict(zip(names, row)) for row in _decrypt_rows(names, matched, aes_key, other_columns)]
+        if not has_data:
+            raise ValueError("[data_handler] CSV не содержит строк с реальными данными: все строки пустые или полностью NULL.")
+        return []
+
+    except Exception as e:
+        error_message = f"[data_handler] Ошибка потокового чтения/дешифрования CSV-файла '{file_path}': {e}"
+        write_log(error_message, MODULE_LOG_FILE_ALL,
+                  MODULE_LOG_FILE_LAST,"error", MODULE_LOG_FILE_ERROR)
+        show_popup_notification(
+            "MODULE_FILE",
+            error_message,
+            "critical",  # ← бесконечное уведомление
+            0
+        )
+        sys.exit(1)
+
+def _find_records_by_blind_index(file_path: str, aes_key: bytes, column: str, value: str,
+                                 usecols: list[str] | None) -> list[dict] | None:
+    """Поиск строк через слепой индекс для бэкенда csv (правила те же, что в _find_by_blind_index)."""
+    try:
+        found = blind_index.lookup_blind_index(file_path, column, value, aes_key)
+        if found is None:
+            return None
+        header_offset, offsets = found
+
+        lines = _read_lines_at(file_path, [header_offset, *offsets])
+        # Перед заголовком подставляется пустая строка вместо служебной (её пропускает _csv_rows)
+        names, rows = _csv_rows(io.StringIO("\n" + b"".join(lines).decode('utf-8'), newline=''), usecols)
+        rows = list(rows)
+        if not offsets:
+            write_log(f"[data_handler] Слепой индекс: значение не найдено в '{file_path}'.",
+                      MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+            return []
+
+        position = names.index(column)
+        matched = [row for row in _decrypt_rows(names, rows, aes_key, [column]) if row[position] == value]
+        if not matched:
+            write_log(f"[data_handler] Слепой индекс '{file_path}' не подтвердился, выполняется полный просмотр.",
+                      MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+            return None
+
+        write_log(f"[data_handler] Слепой индекс: прочитано строк {len(offsets)} из '{file_path}'.",
+                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+        other_columns = [col for col in names if col != column]
+        return [dict(zip(names, row)) for row in _decrypt_rows(names, matched, aes_key, other_columns)]
+
+    except Exception as e:
+        write_log(f"[data_handler] Ошибка поиска по слепому индексу '{file_path}': {e}. "
+                  f"Выполняется полный просмотр.", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST,
+                  "error", MODULE_LOG_FILE_ERROR)
+        return None
+# --- /ЧТЕНИЕ ЗАПИСЯМИ (БЭКЕНДЫ PANDAS И CSV) ---
@@ -0,0 +1,198 @@
+"""
+Модуль поблочной дельта-передачи больших файлов (по принципу rsync).
+На стороне публикации для каждого большого файла общей папки рядом пишется файл-спутник
+'<имя>.elorgeds-blocks' со списком хешей BLAKE2b его блоков. Клиент сравнивает их с блоками своей
+локальной копии и читает из общей папки только изменившиеся блоки.
+
+Запуск на стороне публикации (после изменения файлов, например по расписанию):
+    python -m modules.delta_sync <путь к общей папке>
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+from settings import MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_ERROR
+from .main_functions import write_log
+
+# --- НАСТРОЙКИ ---
+# Суффикс файла-спутника с хешами блоков (зарезервирован: файлы общей папки с ним не синхронизируются)
+SIDECAR_SUFFIX = ".elorgeds-blocks"
+# Суффикс файлов-спутников прежнего формата имени (удаляются при публикации, если это действительно спутники)
+LEGACY_SIDECAR_SUFFIX = ".blocks"
+# Версия формата файла-спутника
+SIDECAR_VERSION = 1
+# Размер блока
+DELTA_BLOCK_BYTES = 1024 * 1024
+# Минимальный размер файла для дельта-передачи (меньшие файлы копируются целиком)
+DELTA_MIN_BYTES = 4 * 1024 * 1024
+# Длина хеша блока BLAKE2b (байт)
+BLOCK_DIGEST_BYTES = 16
+# Суффикс временного файла
+TMP_SUFFIX = ".delta.tmp"
+# --- /НАСТРОЙКИ ---
+
+
+def is_sidecar(path: str) -> bool:
+    """Путь — файл-спутник с хешами блоков."""
+    return path.endswith(SIDECAR_SUFFIX)
+
+
+def sidecar_path(path: str) -> str:
+    """Путь к файлу-спутнику файла path."""
+    return path + SIDECAR_SUFFIX
+
+
+def _block_hash(data) -> str:
+    return hashlib.blake2b(data, digest_size=BLOCK_DIGEST_BYTES).hexdigest()
+
+
+def block_hashes(path: str, block_bytes: int = DELTA_BLOCK_BYTES) -> list[str]:
+    """Хеши BLAKE2b всех блоков файла path."""
+    with open(path, 'rb') as f:
+        return [_block_hash(block) for block in iter(lambda: f.read(block_bytes), b"")]
+
+
+def read_sidecar(path: str) -> dict | None:
+    """Читает файл-спутник; None — отсутствует, не читается или не является файлом-спутником."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            body = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (isinstance(body, dict) and body.get("version") == SIDECAR_VERSION
+            and isinstance(body.get("hashes"), list) and isinstance(body.get("block_bytes"), int)
+            and isinstance(body.get("size"), int) and isinstance(body.get("mtime_ns"), int)):
+        return body
+    return None
+
+
+# --- ПУБЛИКАЦИЯ ---
+def write_sidecar(path: str, block_bytes: int = DELTA_BLOCK_BYTES):
+    """Вычисляет хеши блоков файла path и атомарно записывает файл-спутник."""
+    stat = os.stat(path)
+    body = {
+        "version": SIDECAR_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "block_bytes": block_bytes,
+        "hashes": block_hashes(path, block_bytes),
+    }
+    tmp_path = sidecar_path(path) + TMP_SUFFIX
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(body, f, separators=(',', ':'))
+    os.replace(tmp_path, sidecar_path(path))
+
+
+def publish_sidecars(share_root: str, min_bytes: int = DELTA_MIN_BYTES) -> dict:
+    """
+    Создаёт или обновляет файлы-спутники для всех файлов общей папки размером от min_bytes
+    и удаляет спутники файлов, которых больше нет (или которые стали меньше порога), а также
+    спутники прежнего формата имени ('<имя>.blocks'). Удаляются только файлы, которые читаются
+    как файлы-спутники (read_sidecar), прочие файлы с такими суффиксами не затрагиваются.
+
+    Returns:
+        Словарь: written, skipped, removed.
+    """
+    stats = {"written": 0, "skipped": 0, "removed": 0}
+    for dir_path, _, file_names in os.walk(share_root):
+        names = set(file_names)
+        for name in file_names:
+            path = os.path.join(dir_path, name)
+            if is_sidecar(name):
+                target = name[:-len(SIDECAR_SUFFIX)]
+                if ((target not in names or os.path.getsize(os.path.join(dir_path, target)) < min_bytes)
+                        and read_sidecar(path) is not None):
+                    os.remove(path)
+                    stats["removed"] += 1
+                continue
+            if name.endswith(LEGACY_SIDECAR_SUFFIX) and read_sidecar(path) is not None:
+                os.remove(path)
+                stats["removed"] += 1
+                continue
+            stat = os.stat(path)
+            if stat.st_size < min_bytes:
+                continue
+            sidecar = read_sidecar(sidecar_path(path))
+            if sidecar and sidecar["size"] == stat.st_size and sidecar["mtime_ns"] == stat.st_mtime_ns:
+                stats["skipped"] += 1
+                continue
+            write_sidecar(path)
+            stats["written"] += 1
+    write_log(f"[delta_sync] Файлы-спутники в '{share_root}': записано {stats['written']}, "
+              f"без изменений {stats['skipped']}, удалено {stats['removed']}.",
+              MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+    return stats
+# --- /ПУБЛИКАЦИЯ ---
+
+
+# --- ПОЛУЧЕНИЕ ---
+def delta_copy(src_path: str, dst_path: str, size: int, mtime_ns: int) -> int | None:
+    """
+    Обновляет локальную копию dst_path файла src_path, читая из src_path только блоки,
+    хеши которых не совпали с хешами из файла-спутника. Каждый прочитанный блок проверяется
+    по файлу-спутнику, поэтому результат совпадает с опубликованным файлом побайтно.
+
+    Args:
+        src_path: Файл в общей папке (рядом должен лежать файл-спутник).
+        dst_path: Существующая локальная копия предыдущей версии файла.
+        size: Размер src_path по данным обхода общей папки.
+        mtime_ns: Время изменения src_path по данным обхода общей папки.
+
+    Returns:
+        Количество байт, прочитанных из общей папки, или None, если дельта-передача
+        невозможна (нет актуального файла-спутника) и файл нужно скопировать целиком.
+    """
+    sidecar = read_sidecar(sidecar_path(src_path))
+    if not sidecar or sidecar["size"] != size or sidecar["mtime_ns"] != mtime_ns:
+        return None
+
+    block_bytes = sidecar["block_bytes"]
+    tmp_path = dst_path + TMP_SUFFIX
+    transferred = 0
+    try:
+        shutil.copyfile(dst_path, tmp_path)
+        with open(tmp_path, 'r+b') as out, open(src_path, 'rb') as src:
+            for i, expected in enumerate(sidecar["hashes"]):
+                out.seek(i * block_bytes)
+                if _block_hash(out.read(block_bytes)) == expected:
+                    continue
+                src.seek(i * block_bytes)
+                data = src.read(block_bytes)
+                if _block_hash(data) != expected:
+                    raise ValueError(f"[delta_sync] Блок {i} файла '{src_path}' не совпадает с файлом-спутником "
+                                     f"(файл изменился во время передачи).")
+                out.seek(i * block_bytes)
+                out.write(data)
+                transferred += len(data)
+            out.truncate(size)
+        shutil.copystat(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    write_log(f"[delta_sync]   -> Дельта-передача '{src_path}': прочитано {transferred} из {size} байт.",
+              MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "debug")
+    return transferred
+# --- /ПОЛУЧЕНИЕ ---
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Создание файлов-спутников для дельта-передачи ElOrgEDS.")
+    parser.add_argument("share_root", help="путь к общей папке")
+    parser.add_argument("--min-bytes", type=int, default=DELTA_MIN_BYTES,
+                        help="минимальный размер файла (по умолчанию %(default)s)")
+    args = parser.parse_args()
+    try:
+        print(publish_sidecars(args.share_root, args.min_bytes))
+    except Exception as e:
+        write_log(f"[delta_sync] Ошибка создания файлов-спутников в '{args.share_root}': {e}",
+                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+        raise
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Модуль поколений локальной копии общей папки.
+Папка SHARED_DIR — символическая ссылка на текущее поколение. Каждая синхронизация собирается
+в новом поколении (неизменённые файлы переносятся жёсткими ссылками из текущего, поэтому
+сборка не требует ни копирования, ни места на диске) и становится текущим атомарной заменой
+ссылки только после успешного завершения. Несколько прошлых поколений хранятся для отката;
+сбой синхронизации удаляет лишь незавершённое поколение.
+
+Все записи в поколение должны идти через временный файл и os.replace (как в incremental_sync,
+delta_sync и area_bundle): запись «на месте» изменила бы и файл прошлого поколения.
+"""
+
+import os
+import re
+import shutil
+import time
+from datetime import datetime
+
+from settings import MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_ERROR
+from .main_functions import write_log
+
+# --- НАСТРОЙКИ ---
+# Суффикс папки поколений рядом с SHARED_DIR ('<SHARED_DIR>.generations')
+GENERATIONS_SUFFIX = ".generations"
+# Префикс имени поколения
+GENERATION_PREFIX = "gen-"
+# Суффикс незавершённого поколения
+STAGING_SUFFIX = ".staging"
+# Сколько прошлых поколений хранить для отката (помимо текущего)
+GENERATIONS_KEEP = 2
+# Незавершённое поколение старше этого возраста (с) удаляется, даже если его процесс ещё жив
+STAGING_MAX_AGE_SEC = 24 * 3600
+# --- /НАСТРОЙКИ ---
+
+
+def generations_root(shared_dir: str) -> str:
+    """Папка поколений для SHARED_DIR."""
+    return os.path.abspath(shared_dir).rstrip(os.sep) + GENERATIONS_SUFFIX
+
+
+def current_generation(shared_dir: str) -> str | None:
+    """Путь к текущему поколению (None — поколений ещё нет)."""
+    if os.path.islink(shared_dir):
+        target = os.path.realpath(shared_dir)
+        return target if os.path.isdir(target) else None
+    return None
+
+
+def list_generations(shared_dir: str) -> list[str]:
+    """Завершённые поколения, от новых к старым."""
+    root = generations_root(shared_dir)
+    if not os.path.isdir(root):
+        return []
+    names = [name for name in os.listdir(root)
+             if name.startswith(GENERATION_PREFIX) and not name.endswith(STAGING_SUFFIX)]
+    return [os.path.join(root, name) for name in sorted(names, reverse=True)]
+
+
+def _switch(shared_dir: str, target: str):
+    """Атомарно направляет ссылку SHARED_DIR на поколение target."""
+    tmp_link = f"{shared_dir}.link-{os.getpid()}"
+    if os.path.lexists(tmp_link):
+        os.remove(tmp_link)
+    os.symlink(target, tmp_link, target_is_directory=True)
+    os.replace(tmp_link, shared_dir)
+
+
+def _migrate_legacy(shared_dir: str):
+    """Обычная папка SHARED_DIR (до перехода на поколения) становится первым поколением."""
+    if os.path.isdir(shared_dir) and not os.path.islink(shared_dir):
+        root = generations_root(shared_dir)
+        os.makedirs(root, exist_ok=True)
+        target = os.path.join(root, f"{GENERATION_PREFIX}{datetime.now():%Y%m%d-%H%M%S-%f}")
+        os.replace(shared_dir, target)
+        _switch(shared_dir, target)
+        write_log(f"[generations] Папка '{shared_dir}' перенесена в поколение '{target}'.",
+                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+
+
+def _pid_alive(pid: int) -> bool:
+    """Процесс pid существует."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _is_abandoned(staging: str) -> bool:
+    """
+    Незавершённое поколение брошено: процесс-владелец (PID в имени) завершился или поколение
+    старше STAGING_MAX_AGE_SEC. Поколение параллельно идущей синхронизации не трогается.
+    """
+    match = re.search(r"-p(\d+)" + re.escape(STAGING_SUFFIX) + "$", staging)
+    if match and int(match.group(1)) != os.getpid() and _pid_alive(int(match.group(1))):
+        try:
+            return time.time() - os.path.getmtime(staging) > STAGING_MAX_AGE_SEC
+        except OSError:
+            return False
+    return True
+
+
+def _link_tree(src_root: str, dst_root: str) -> int:
+    """Воспроизводит дерево src_root в dst_root жёсткими ссылками (копированием, если ссылки недоступны)."""
+    files = 0
+    for dir_path, dir_names, file_names in os.walk(src_root):
+        rel_dir = os.path.relpath(dir_path, src_root)
+        target_dir = dst_root if rel_dir == os.curdir else os.path.join(dst_root, rel_dir)
+        os.makedirs(target_dir, exist_ok=True)
+        for name in file_names:
+            src_path = os.path.join(dir_path, name)
+            dst_path = os.path.join(target_dir, name)
+            try:
+                os.link(src_path, dst_path)
+            except OSError:
+                shutil.copy2(src_path, dst_path)
+            files += 1
+    return files
+
+
+def stage_generation(shared_dir: str) -> str:
+    """
+    Создаёт незавершённое поколение: копию текущего из жёстких ссылок (или пустую папку,
+    если поколений ещё нет). Синхронизация выполняется в возвращённую папку.
+    В имени поколения записывается PID процесса: брошенные поколения завершившихся
+    процессов удаляются, а поколение параллельной синхронизации остаётся нетронутым.
+    """
+    _migrate_legacy(shared_dir)
+    root = generations_root(shared_dir)
+    os.makedirs(root, exist_ok=True)
+    # Незавершённые поколения, оставшиеся после аварийного завершения, больше не нужны
+    # (поколение другой идущей синхронизации, например второй точки входа, сохраняется)
+    for name in os.listdir(root):
+        if name.endswith(STAGING_SUFFIX) and _is_abandoned(os.path.join(root, name)):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+    staging = os.path.join(root, f"{GENERATION_PREFIX}{datetime.now():%Y%m%d-%H%M%S-%f}-p{os.getpid()}"
+                                 f"{STAGING_SUFFIX}")
+    current = current_generation(shared_dir)
+    if current:
+        files = _link_tree(current, staging)
+    else:
+        os.makedirs(staging)
+        files = 0
+    write_log(f"[generations] Подготовлено поколение '{staging}' (перенесено файлов: {files}).",
+              MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+    return staging
+
+
+def commit_generation(shared_dir: str, staging: str, keep: int = GENERATIONS_KEEP) -> str:
+    """
+    Делает поколение staging текущим (атомарная замена ссылки SHARED_DIR) и удаляет
+    поколения старше keep прошлых.
+
+    Returns:
+        Путь к новому текущему поколению.
+    """
+    target = staging[:-len(STAGING_SUFFIX)]
+    os.replace(staging, target)
+    _switch(shared_dir, target)
+    for old in list_generations(shared_dir)[keep + 1:]:
+        if old != target:
+            shutil.rmtree(old, ignore_errors=True)
+    write_log(f"[generations] Текущее поколение: '{target}'.", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+    return target
+
+
+def discard_generation(staging: str | None):
+    """Удаляет незавершённое поколение; текущее (последнее удачное) не затрагивается."""
+    if staging and os.path.exists(staging):
+        shutil.rmtree(staging, ignore_errors=True)
+        write_log(f"[generations] Незавершённое поколение '{staging}' удалено, "
+                  f"используется последнее удачное.", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+
+
+def rollback(shared_dir: str, steps: int = 1) -> str:
+    """
+    Откатывает SHARED_DIR на steps поколений назад (мгновенно: меняется только ссылка).
+
+    Returns:
+        Путь к поколению, ставшему текущим.
+    """
+    generations = list_generations(shared_dir)
+    current = current_generation(shared_dir)
+    position = generations.index(current) if current in generations else 0
+    if position + steps >= len(generations):
+        error_msg = f"Нет поколения для отката на {steps} шаг(а) (доступно: {len(generations)})."
+        write_log(f"[generations] {error_msg}", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST,
+                  "error", MODULE_LOG_FILE_ERROR)
+        raise RuntimeError(error_msg)
+    target = generations[position + steps]
+    _switch(shared_dir, target)
+    write_log(f"[generations] Откат: текущее поколение '{target}'.", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+    return target
+
+
+def remove_all(shared_dir: str):
+    """Удаляет ссылку SHARED_DIR и все поколения (например, при отзыве доступа)."""
+    if os.path.islink(shared_dir):
+        os.remove(shared_dir)
+    elif os.path.isdir(shared_dir):
+        shutil.rmtree(shared_dir)
+    shutil.rmtree(generations_root(shared_dir), ignore_errors=True)
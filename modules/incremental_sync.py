@@ -0,0 +1,287 @@
+"""
+Модуль инкрементальной синхронизации папки с сетевой папкой.
+Вместо очистки и полного копирования сравнивает содержимое сетевой папки с манифестом
+прошлой синхронизации (относительный путь, размер, время изменения, необязательный SHA-256)
+и копирует только новые и изменённые файлы, удаляя только исчезнувшие.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from settings import MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_ERROR
+from . import delta_sync
+from .main_functions import fsync_dir, write_log
+
+# --- НАСТРОЙКИ ---
+# Имя файла манифеста (хранится в корне локальной папки и не синхронизируется)
+MANIFEST_FILE_NAME = ".sync_manifest.json"
+# Версия формата манифеста
+MANIFEST_VERSION = 1
+# Сравнивать содержимое по SHA-256 (читает каждый файл сетевой папки; по умолчанию — только размер и время)
+SYNC_USE_HASH = False
+# Размер блока чтения при копировании и хешировании
+COPY_CHUNK_BYTES = 1024 * 1024
+# Суффикс временного файла при копировании
+TMP_SUFFIX = ".sync.tmp"
+# Количество одновременно копируемых файлов (потоков); на SMB с большой задержкой
+# время уходит на обмен по каждому файлу, а не на передачу данных
+SYNC_COPY_WORKERS = 8
+# Сколько ошибок копирования перечислять в итоговом сообщении
+MAX_REPORTED_ERRORS = 5
+# Обновлять изменённые большие файлы поблочно, если в общей папке есть файл-спутник (см. delta_sync)
+SYNC_USE_DELTA = True
+# --- /НАСТРОЙКИ ---
+
+# Фильтр элементов дерева: (относительный путь через '/', это папка) -> bool
+PathFilter = Callable[[str, bool], bool]
+
+
+def manifest_path(dst_root: str) -> str:
+    """Путь к манифесту локальной папки dst_root."""
+    return os.path.join(dst_root, MANIFEST_FILE_NAME)
+
+
+def scan_tree(root: str, include: PathFilter | None = None) -> tuple[dict[str, tuple[int, int]], set[str]]:
+    """
+    Рекурсивно обходит папку root (только метаданные, без чтения файлов).
+    Элементы, отклонённые фильтром include, пропускаются; в отклонённые папки обход не заходит.
+
+    Returns:
+        ({относительный путь файла: (размер, mtime в наносекундах)}, {относительные пути папок}).
+        Пути — через '/', независимо от ОС.
+    """
+    files = {}
+    dirs = set()
+    pending = [""]
+    while pending:
+        rel_dir = pending.pop()
+        with os.scandir(os.path.join(root, rel_dir) if rel_dir else root) as entries:
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if include is not None and not include(rel_path, True):
+                        continue
+                    dirs.add(rel_path)
+                    pending.append(rel_path)
+                elif entry.is_file():
+                    if include is not None and not include(rel_path, False):
+                        continue
+                    stat = entry.stat()
+                    files[rel_path] = (stat.st_size, stat.st_mtime_ns)
+    return files, dirs
+
+
+def load_manifest(path: str) -> dict[str, dict]:
+    """Читает манифест; при отсутствии или повреждении возвращает пустой (будет полная синхронизация)."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            body = json.load(f)
+        if body.get("version") != MANIFEST_VERSION:
+            return {}
+        return body["files"]
+    except Exception as e:
+        write_log(f"[incremental_sync] Манифест '{path}' не прочитан ({e}), выполняется полная синхронизация.",
+                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+        return {}
+
+
+def save_manifest(path: str, files: dict[str, dict]):
+    """
+    Атомарно записывает манифест (через временный файл, fsync и os.replace): после сбоя
+    питания остаётся прежний или новый манифест целиком, а не пустой файл.
+    """
+    tmp_path = path + TMP_SUFFIX
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, f, ensure_ascii=False, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    fsync_dir(os.path.dirname(os.path.abspath(path)))
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 содержимого файла (hex)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def copy_file(src_path: str, dst_path: str, use_hash: bool = False) -> str | None:
+    """
+    Копирует файл через временный файл рядом с dst_path (прерванное копирование не оставляет
+    усечённый файл под настоящим именем) с сохранением времени изменения.
+
+    Returns:
+        SHA-256 скопированного содержимого (если use_hash), иначе None.
+    """
+    tmp_path = dst_path + TMP_SUFFIX
+    digest = hashlib.sha256() if use_hash else None
+    try:
+        with open(src_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            for block in iter(lambda: src.read(COPY_CHUNK_BYTES), b""):
+                dst.write(block)
+                if digest is not None:
+                    digest.update(block)
+        shutil.copystat(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return digest.hexdigest() if digest is not None else None
+
+
+def _is_unchanged(entry: dict | None, size: int, mtime_ns: int, src_path: str, dst_path: str,
+                  use_hash: bool) -> bool:
+    """Файл не изменился с прошлой синхронизации и его локальная копия на месте."""
+    if not entry or entry["size"] != size or entry["mtime_ns"] != mtime_ns:
+        return False
+    try:
+        if os.path.getsize(dst_path) != size:
+            return False
+    except OSError:
+        return False
+    if use_hash:
+        return entry.get("sha256") == file_sha256(src_path)
+    return True
+
+
+def _sync_file(rel_path: str, size: int, mtime_ns: int, entry: dict | None, src_root: str, dst_root: str,
+               use_hash: bool, use_delta: bool) -> tuple[dict, int | None]:
+    """
+    Синхронизирует один файл (выполняется в потоке пула). Изменённый файл с файлом-спутником
+    в общей папке и локальной копией прошлой версии обновляется поблочно (delta_sync).
+
+    Returns:
+        (запись манифеста, количество прочитанных из общей папки байт или None, если файл
+        пропущен как неизменённый).
+    """
+    src_path = os.path.join(src_root, rel_path)
+    dst_path = os.path.join(dst_root, rel_path)
+    if _is_unchanged(entry, size, mtime_ns, src_path, dst_path, use_hash):
+        return entry, None
+    transferred = None
+    if use_delta and os.path.isfile(dst_path):
+        transferred = delta_sync.delta_copy(src_path, dst_path, size, mtime_ns)
+    if transferred is None:
+        sha256 = copy_file(src_path, dst_path, use_hash)
+        transferred = size
+    else:
+        sha256 = file_sha256(dst_path) if use_hash else None
+    write_log(f"[incremental_sync]   -> Скопирован файл: '{rel_path}' ({transferred} из {size} байт)",
+              MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "debug")
+    return {"size": size, "mtime_ns": mtime_ns, "sha256": sha256}, transferred
+
+
+def sync_tree(src_root: str, dst_root: str, include: PathFilter | None = None, scope: PathFilter | None = None,
+              use_hash: bool = SYNC_USE_HASH, incremental: bool = True, workers: int = SYNC_COPY_WORKERS,
+              use_delta: bool = SYNC_USE_DELTA) -> dict:
+    """
+    Инкрементально синхронизирует локальную папку dst_root с папкой src_root.
+    Копируются только новые и изменённые файлы (по манифесту прошлой синхронизации),
+    удаляются только файлы и папки, которых больше нет в src_root.
+
+    Файлы копируются параллельно в пуле из workers потоков; ошибки копирования отдельных
+    файлов не прерывают синхронизацию остальных и сообщаются одним исключением в конце.
+
+    Можно синхронизировать часть дерева: include отбирает элементы src_root, которые нужны
+    локально, а scope — локальные элементы, которыми управляет этот вызов. Элементы в scope,
+    не отобранные include, удаляются; элементы вне scope (и их записи в манифесте) не трогаются.
+
+    Args:
+        src_root: Исходная (сетевая) папка.
+        dst_root: Локальная папка.
+        include: Фильтр копируемых элементов src_root (по умолчанию — все).
+        scope: Фильтр управляемых локальных элементов (по умолчанию совпадает с include).
+        use_hash: Дополнительно сравнивать содержимое по SHA-256.
+        incremental: False — манифест не учитывается, все отобранные файлы копируются заново.
+        workers: Количество потоков копирования (1 — последовательно).
+        use_delta: Обновлять изменённые большие файлы поблочно по файлам-спутникам delta_sync
+            (сами файлы-спутники не копируются).
+
+    Returns:
+        Словарь со статистикой: copied, skipped, deleted, bytes_copied (прочитано из src_root),
+        bytes_total (полный размер скопированных файлов), transfer_ratio, seconds.
+    """
+    start = time.perf_counter()
+    os.makedirs(dst_root, exist_ok=True)
+    path = manifest_path(dst_root)
+    manifest = load_manifest(path)
+    src_files, src_dirs = scan_tree(src_root, include)
+    # Файлы-спутники delta_sync служат только для передачи и локально не нужны
+    src_files = {rel_path: meta for rel_path, meta in src_files.items() if not delta_sync.is_sidecar(rel_path)}
+    scope = scope or include or (lambda rel_path, is_dir: True)
+
+    stats = {"copied": 0, "skipped": 0, "deleted": 0, "bytes_copied": 0, "bytes_total": 0}
+    # Записи вне области синхронизации переносятся в новый манифест без изменений
+    new_manifest = {rel_path: entry for rel_path, entry in manifest.items() if not scope(rel_path, False)}
+    if not incremental:
+        manifest = {}
+    try:
+        # 1. Папки (в том числе пустые) создаются заранее
+        for rel_dir in sorted(src_dirs):
+            os.makedirs(os.path.join(dst_root, rel_dir), exist_ok=True)
+
+        # 2. Новые и изменённые файлы (параллельно; ошибки собираются, а не прерывают обход)
+        errors = []
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="sync") as executor:
+            futures = {executor.submit(_sync_file, rel_path, size, mtime_ns, manifest.get(rel_path),
+                                       src_root, dst_root, use_hash, use_delta): rel_path
+                       for rel_path, (size, mtime_ns) in src_files.items()}
+            for future, rel_path in futures.items():
+                try:
+                    entry, transferred = future.result()
+                except Exception as e:
+                    errors.append((rel_path, e))
+                    continue
+                new_manifest[rel_path] = entry
+                if transferred is None:
+                    stats["skipped"] += 1
+                else:
+                    stats["copied"] += 1
+                    stats["bytes_copied"] += transferred
+                    stats["bytes_total"] += entry["size"]
+
+        # 3. Файлы и папки, исчезнувшие из исходной папки
+        dst_files, dst_dirs = scan_tree(dst_root)
+        for rel_path in dst_files:
+            if rel_path not in src_files and rel_path != MANIFEST_FILE_NAME and scope(rel_path, False):
+                os.remove(os.path.join(dst_root, rel_path))
+                stats["deleted"] += 1
+                write_log(f"[incremental_sync]   -> Удалён файл: '{rel_path}'",
+                          MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "debug")
+        # Вложенные папки удаляются раньше родительских
+        for rel_dir in sorted(dst_dirs - src_dirs, key=len, reverse=True):
+            if not scope(rel_dir, True):
+                continue
+            shutil.rmtree(os.path.join(dst_root, rel_dir), ignore_errors=True)
+
+        if errors:
+            details = "; ".join(f"'{rel_path}': {e}" for rel_path, e in errors[:MAX_REPORTED_ERRORS])
+            raise RuntimeError(f"Не скопировано файлов: {len(errors)} из {len(src_files)}. {details}")
+    except BaseException:
+        # Манифест сохраняется и при ошибке: уже скопированные файлы не будут копироваться повторно,
+        # а записи необработанных файлов остаются прежними (их проверит следующая синхронизация)
+        for rel_path, entry in manifest.items():
+            new_manifest.setdefault(rel_path, entry)
+        raise
+    finally:
+        save_manifest(path, new_manifest)
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["transfer_ratio"] = stats["bytes_copied"] / stats["bytes_total"] if stats["bytes_total"] else 0.0
+    write_log(f"[incremental_sync] Синхронизация '{src_root}' -> '{dst_root}' завершена за "
+              f"{stats['seconds']:.2f} с (потоков: {workers}): скопировано {stats['copied']}, пропущено {stats['skipped']}, "
+              f"удалено {stats['deleted']}, передано {stats['bytes_copied'] / 2 ** 20:.1f} МБ из "
+              f"{stats['bytes_total'] / 2 ** 20:.1f} МБ ({stats['transfer_ratio']:.0%}).",
+              MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+    return stats
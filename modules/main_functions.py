@@ -1,4 +1,5 @@
 # ./modules/main_functions.py
+import atexit
 import csv
 import fcntl
 import os
@@ -15,6 +16,8 @@ from settings import SHARED_NETWORK_PATH, SERVER_PATH, CREDENTIALS, USER, MODULE
 
 # --- ФУНКЦИЯ ПОДГОТОВКИ ЛОГИРОВАНИЯ ---
 def update_log(logfile_all: str = "", logfile_last: str = "", logfile_error: str= ""):
+    # Записи, ещё не переданные в файлы, относятся к прошлому запуску и пишутся до очистки
+    flush_log()
     if os.path.exists(logfile_last):
         with open(logfile_last, "w", encoding="utf-8") as f:
             f.write("") # Очищаем файл
@@ -35,27 +38,177 @@ def update_log(logfile_all: str = "", logfile_last: str = "", logfile_error: str
 # --- \ФУНКЦИЯ ПОДГОТОВКИ ЛОГИРОВАНИЯ ---
 
 # --- ФУНКЦИЯ ЛОГИРОВАНИЯ ---
+# Записывать отладочные сообщения (mode="debug"), например построчный журнал копирования файлов
+LOG_DEBUG = False
+# Записывать лог в фоновом потоке пакетами (False — каждая запись сразу открывает и дописывает файлы)
+LOG_ASYNC = True
+# Количество записей в очереди, при котором пакет пишется не дожидаясь интервала
+LOG_BATCH_SIZE = 500
+# Наибольшая задержка записи в файлы, сек
+LOG_FLUSH_INTERVAL_SEC = 0.5
+
+
+def _notify_log_error(e: Exception):
+    """Сообщает об ошибке записи лога (не дожидаясь notify-send)."""
+    try:
+        subprocess.Popen([
+            "notify-send", "-u", "critical", "-t", "300", "ГЛАВНЫЕ ФУНКЦИИ", f"{e}"
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except Exception:
+        pass
+
+
+def _log_paths(logfile_all: str, logfile_last: str, mode: str, logfile_error: str) -> tuple[str, ...]:
+    """Файлы, в которые идёт запись (в порядке записи)."""
+    if mode == "error":
+        return logfile_last, logfile_all, logfile_error
+    return logfile_last, logfile_all
+
+
+def _write_log_sync(log_entry: str, paths: tuple[str, ...]):
+    """Синхронная запись: каждый существующий файл из paths открывается, дописывается и закрывается."""
+    try:
+        for path in paths:
+            if os.path.exists(path):
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(log_entry + "\n")
+    except Exception as e:
+        _notify_log_error(e)
+
+
+class _LogWriter:
+    """
+    Фоновая запись лога: write_log ставит запись в очередь, поток пишет накопленные записи
+    пакетами (при LOG_BATCH_SIZE записях или раз в LOG_FLUSH_INTERVAL_SEC), держа файлы открытыми.
+    Как и при синхронной записи, запись попадает только в существующие файлы: перед каждым
+    пакетом файлы проверяются, удалённый закрывается, заменённый (другой inode) открывается заново.
+    """
+
+    def __init__(self):
+        self._pending: list[tuple[str, tuple[str, ...]]] = []
+        self._condition = threading.Condition()
+        # Запись пакета в файлы (поток и flush не пишут одновременно, порядок записей сохраняется)
+        self._write_lock = threading.Lock()
+        self._files: dict[str, tuple] = {}
+        self._closed = False
+        self.pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="write_log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, log_entry: str, paths: tuple[str, ...]) -> bool:
+        """Ставит запись в очередь; False — запись остановлена (при завершении программы)."""
+        with self._condition:
+            if self._closed:
+                return False
+            self._pending.append((log_entry, paths))
+            if len(self._pending) >= LOG_BATCH_SIZE:
+                self._condition.notify()
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._closed or len(self._pending) >= LOG_BATCH_SIZE,
+                                         timeout=LOG_FLUSH_INTERVAL_SEC)
+                if self._closed:
+                    return
+            self.flush()
+
+    def _file(self, path: str):
+        """Открытый файл лога path или None, если файла нет."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stat = None
+        handle = self._files.get(path)
+        if handle and (stat is None or (handle[1], handle[2]) != (stat.st_dev, stat.st_ino)):
+            handle[0].close()
+            del self._files[path]
+            handle = None
+        if stat is None:
+            return None
+        if handle is None:
+            f = open(path, "a", encoding="utf-8")
+            handle = self._files[path] = (f, stat.st_dev, stat.st_ino)
+        return handle[0]
+
+    def flush(self):
+        """Записывает все накопленные записи в файлы."""
+        with self._write_lock:
+            with self._condition:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            lines: dict[str, list[str]] = {}
+            for log_entry, paths in batch:
+                for path in paths:
+                    lines.setdefault(path, []).append(log_entry + "\n")
+            for path, entries in lines.items():
+                try:
+                    f = self._file(path)
+                    if f is not None:
+                        f.write("".join(entries))
+                        f.flush()
+                except Exception as e:
+                    _notify_log_error(e)
+
+    def close(self):
+        """Дописывает очередь, останавливает поток и закрывает файлы (вызывается при выходе)."""
+        if self.pid != os.getpid():
+            # Копия в процессе, созданном fork: очередь принадлежит родителю и будет записана им
+            return
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self.flush()
+        with self._write_lock:
+            for handle in self._files.values():
+                handle[0].close()
+            self._files.clear()
+
+
+_log_writer: _LogWriter | None = None
+_log_writer_lock = threading.Lock()
+
+
+def _get_log_writer() -> _LogWriter | None:
+    """
+    Фоновая запись лога текущего процесса. В дочерних процессах (например, пула crypto_pool)
+    её нет: они завершаются без обработчиков atexit, и очередь была бы потеряна.
+    """
+    global _log_writer
+    if _log_writer is None:
+        import multiprocessing
+        if multiprocessing.parent_process() is not None:
+            return None
+        with _log_writer_lock:
+            if _log_writer is None:
+                _log_writer = _LogWriter()
+    return _log_writer if _log_writer.pid == os.getpid() else None
+
+
+def flush_log():
+    """Дописывает в файлы все записи, поставленные в очередь write_log."""
+    if _log_writer is not None and _log_writer.pid == os.getpid():
+        _log_writer.flush()
+
+
 def write_log(message: str, logfile_all: str = "", logfile_last: str = "",
               mode: str = "normal", logfile_error: str= ""):
 
-    """Записывает сообщение в лог-файл и на консоль."""
+    """Записывает сообщение в лог-файлы (при LOG_ASYNC — через очередь фонового потока)."""
+    if mode == "debug" and not LOG_DEBUG:
+        return
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     log_entry = f"[{timestamp}] {message}"
-    try:
-        if os.path.exists(logfile_last):
-            with open(logfile_last, "a", encoding="utf-8") as f:
-                f.write(log_entry + "\n")
-        if os.path.exists(logfile_all):
-            with open(logfile_all, "a", encoding="utf-8") as f:
-                f.write(log_entry + "\n")
-        if mode == "error":
-            if os.path.exists(logfile_error):
-                with open(logfile_error, "a", encoding="utf-8") as f:
-                    f.write(log_entry + "\n")
-    except Exception as e:
-        subprocess.run([
-            "notify-send", "-u", "cricical", "-t", 300, "ГЛАВНЫЕ ФУНКЦИИ", f"{e}"
-        ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    paths = _log_paths(logfile_all, logfile_last, mode, logfile_error)
+    if LOG_ASYNC:
+        writer = _get_log_writer()
+        if writer is not None and writer.put(log_entry, paths):
+            return
+    _write_log_sync(log_entry, paths)
 
 
 # --- /ФУНКЦИЯ ЛОГИРОВАНИЯ ---
@@ -107,6 +260,21 @@ def clear_folder_files(folder_path):
 
 # --- /ФУНКЦИЯ ОЧИСТКИ ПАПКИ ---
 
+# --- ФУНКЦИЯ СБРОСА ПАПКИ НА ДИСК ---
+def fsync_dir(dir_path: str):
+    """Сбрасывает на диск запись каталога (для надёжности переименования), если ОС это поддерживает."""
+    try:
+        dir_fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+# --- /ФУНКЦИЯ СБРОСА ПАПКИ НА ДИСК ---
+
 # --- ФУНКЦИИ ДЛЯ МОНТИРОВАНИЯ СЕТЕВОЙ ПАПКИ ---
 def is_mounted(mount_point):
     """Проверяет, смонтирована ли точка."""
@@ -1,241 +1,122 @@
 # ./modules/notifications.py
+"""
+Всплывающие уведомления пользователю.
+Окна показывает отдельный долгоживущий процесс-уведомитель (modules.notifier) со своим циклом
+событий Qt: show_popup_notification передаёт ему сообщение строкой JSON через канал stdin и сразу
+возвращает управление, поэтому показ уведомления не задерживает работу программы, а PyQt6
+не загружается в процессе программы. После завершения программы уведомитель дожидается
+закрытия открытых окон и выходит.
+"""
+
+import atexit
+import json
 import os
 import subprocess
 import sys
-from contextlib import redirect_stderr
-
-from PyQt6.QtCore import QTimer, Qt
-from PyQt6.QtGui import QFont
-from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QPushButton, QScrollArea, QFrame, QProgressBar
-)
+import threading
 
 from settings import MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_ERROR
 from .main_functions import write_log
 
+# --- НАСТРОЙКИ ---
+# Корень проекта (рабочая папка процесса-уведомителя)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# --- /НАСТРОЙКИ ---
+
 
-class TimedNotification(QWidget):
-    def __init__(self, title: str, message: str, timeout: int = 10, button_text=None,
-                 button_action=None, color_bg: str = "#90EE90", color_timer: str = "#006400"):
-        super().__init__()
-        self.button_action = button_action
-        self.remaining = timeout if timeout > 0 else None
-        self.total_timeout = max(1, timeout)
-
-        # Флаги окна
-        self.setWindowFlags(
-            Qt.WindowType.Popup |
-            Qt.WindowType.WindowStaysOnTopHint |
-            Qt.WindowType.FramelessWindowHint
-        )
-        self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground, False)
-
-        # Фиксированная ширина, динамическая высота
-        self.setFixedWidth(350)
-        self.setMinimumHeight(120)
-        self.setMaximumHeight(400)
-
-        self.setStyleSheet(f"""
-            QWidget {{
-                background-color: {color_bg};
-                border-radius: 8px;
-            }}
-        """)
-
-        main_layout = QVBoxLayout()
-        main_layout.setContentsMargins(10, 10, 10, 10)
-        main_layout.setSpacing(6)
-
-        # --- 1. Крестик в правом верхнем углу ---
-        top_bar_layout = QHBoxLayout()
-        top_bar_layout.addStretch()  # растягиваемое пространство слева
-        close_btn = QPushButton("×")
-        close_btn.setFixedSize(20, 20)
-        close_btn.setFont(QFont("Sans", 12, QFont.Weight.Bold))
-        close_btn.setStyleSheet("""
-            QPushButton {
-                background-color: transparent;
-                color: #191970;
-                border: none;
-                border-radius: 10px;
-                padding: 0 0 0 0;
-            }
-            QPushButton:hover {
-                color: #ADD8E6;
-                background-color: #800000;
-            }
-        """)
-        close_btn.clicked.connect(self.close)
-        top_bar_layout.addWidget(close_btn)
-        main_layout.addLayout(top_bar_layout)
-
-        # --- 2. Текст таймера ---
-        self.countdown_label = QLabel("")
-        self.countdown_label.setFont(QFont("Sans", 8, QFont.Weight.Bold))
-        self.countdown_label.setStyleSheet(f"color: {color_timer}")
-        self.countdown_label.setAlignment(Qt.AlignmentFlag.AlignRight)
-        main_layout.addWidget(self.countdown_label)
-
-        # --- 3. Заголовок ---
-        title_label = QLabel(title)
-        title_label.setFont(QFont("Sans", 10, QFont.Weight.Bold))
-        title_label.setStyleSheet("color: #191970;")
-        title_label.setWordWrap(True)
-        title_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
-        title_label.setMaximumWidth(self.width() - 20)  # ширина окна - отступы
-        main_layout.addWidget(title_label)
-
-        # --- 4. Прокручиваемый текст сообщения ---
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setFrameShape(QFrame.Shape.NoFrame)
-        scroll_area.setStyleSheet("background-color: transparent; border: none;")
-
-        text_label = QLabel(message)
-        text_label.setFont(QFont("Sans", 10))
-        text_label.setWordWrap(True)
-        text_label.setTextFormat(Qt.TextFormat.PlainText)
-        text_label.setStyleSheet("color: #000000; padding: 0 0 0 0;")
-        text_label.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
-        text_label.setMaximumWidth(self.width() - 20)
-        scroll_area.setWidget(text_label)
-        main_layout.addWidget(scroll_area)
-
-        # --- 5. Кнопка действия (опционально) ---
-        if button_text:
-            btn = QPushButton(button_text)
-            btn.clicked.connect(self.on_button)
-            btn.setStyleSheet("""
-                        QPushButton {
-                            background-color: #e74c3c;
-                            color: white;
-                            border: none;
-                            padding: 6px;
-                            border-radius: 4px;
-                            font-weight: bold;
-                        }
-                        QPushButton:hover {
-                            background-color: #c0392b;
-                        }
-                    """)
-            main_layout.addWidget(btn)
-
-        # --- 6. Прогресс-бар ---
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setRange(0, 100)
-        self.progress_bar.setValue(100 if self.total_timeout > 0 else 0)
-        self.progress_bar.setTextVisible(False)
-        self.progress_bar.setFixedHeight(6)
-        self.progress_bar.setStyleSheet(f"""
-            QProgressBar {{
-                background-color: {color_bg};
-            }}
-            QProgressBar::chunk {{
-                background-color: {color_timer};
-                border-radius: 3px;
-            }}
-        """)
-        main_layout.addWidget(self.progress_bar)
-
-        self.setLayout(main_layout)
-
-        # Запуск таймера
-        if self.remaining is not None:
-            self.timer = QTimer(self)
-            self.timer.timeout.connect(self.tick)
-            self.timer.start(1000)
-            self.update_countdown_label()
-
-    def showEvent(self, event):
-        super().showEvent(event)
-        self._adjust_height()
-        self._move_to_bottom_right()
-
-    def _adjust_height(self):
-        """Подстраиваем высоту под содержимое."""
-        self.layout().update()
-        self.adjustSize()
-        calculated_height = self.sizeHint().height()
-        final_height = max(self.minimumHeight(), min(calculated_height, self.maximumHeight()))
-        self.setFixedHeight(final_height)
-
-    def _move_to_bottom_right(self):
-        screen = QApplication.primaryScreen()
-        if screen:
-            geo = screen.geometry()
-            x = geo.right() - self.width() - 20
-            y = geo.bottom() - self.height() - 20
-            self.move(x, y)
-
-    def closeEvent(self, event):
-        """Гарантируем выход из цикла событий при закрытии окна."""
-        super().closeEvent(event)
-        QApplication.quit()
-
-    def update_countdown_label(self):
-        if self.remaining is not None:
-            self.countdown_label.setText(f"Cообщение автоматически закроется через {self.remaining} сек.")
-            if self.total_timeout > 0:
-                progress = int((self.remaining / self.total_timeout) * 100)
-                self.progress_bar.setValue(max(0, progress))
-        else:
-            self.countdown_label.setText("")
-            self.progress_bar.setValue(0)
-
-    def tick(self):
-        if self.remaining is not None and self.remaining > 0:
-            self.remaining -= 1
-            self.update_countdown_label()
-            if self.remaining == 0:
-                self.close()
-
-    def on_button(self):
-        if hasattr(self, 'timer'):
-            self.timer.stop()
-        self.close()
-        if self.button_action:
-            self.button_action()
+def _notify_send(title: str, message: str, urgency: str, timeout_ms: int):
+    """Запасной способ показа уведомления (без Qt)."""
+    try:
+        subprocess.run([
+            "notify-send", "-u", urgency, "-t", str(timeout_ms), title, message
+        ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except Exception as e:
+        write_log(f"Ошибка уведомления notify-send: {e}", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST,
+                  "critical", MODULE_LOG_FILE_ERROR)
 
 
 # --- ФУНКЦИЯ ПОКАЗА УВЕДОМЛЕНИЯ ---
+# Сколько последних сообщений помнить для повторной доставки, если уведомитель аварийно завершился
+NOTIFIER_RESEND_LIMIT = 50
+
+_notifier: subprocess.Popen | None = None
+# Сообщения, переданные текущему процессу-уведомителю (для повторной доставки через notify-send)
+_notifier_sent: list[dict] = []
+_notifier_lock = threading.Lock()
+
+
+def _check_notifier():
+    """
+    Если процесс-уведомитель завершился с ошибкой (например, до чтения канала), сообщения,
+    переданные ему, могли быть не показаны: они записываются в лог и показываются через notify-send.
+    """
+    global _notifier
+    if _notifier is None or _notifier.poll() is None:
+        return
+    if _notifier.returncode != 0:
+        write_log(f"Процесс-уведомитель завершился с кодом {_notifier.returncode}; переданные ему "
+                  f"уведомления ({len(_notifier_sent)}) показываются через notify-send.", MODULE_LOG_FILE_ALL,
+                  MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+        for item in _notifier_sent:
+            _notify_send(item["title"], item["message"], item["urgency"], item["timeout_ms"])
+    _notifier = None
+    _notifier_sent.clear()
+
+
+def _get_notifier() -> subprocess.Popen:
+    """Запущенный процесс-уведомитель (запускается при первом уведомлении или после его завершения)."""
+    global _notifier
+    _check_notifier()
+    if _notifier is None:
+        _notifier = subprocess.Popen([sys.executable, "-m", "modules.notifier"],
+                                     stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                     cwd=PROJECT_DIR, start_new_session=True)
+    return _notifier
+
+
+def _check_notifier_at_exit():
+    """При завершении программы проверяет, что уведомитель не упал, не показав сообщения."""
+    with _notifier_lock:
+        _check_notifier()
+
+
+atexit.register(_check_notifier_at_exit)
+
+
 def show_popup_notification(title: str, message: str, urgency: str = "normal", timeout_ms: int = 10000):
+    """
+    Передаёт уведомление процессу-уведомителю и сразу возвращает управление
+    (окно показывается параллельно с работой программы).
+    """
+    item = {"title": title, "message": message, "urgency": urgency, "timeout_ms": timeout_ms}
     try:
-        app = QApplication.instance()
-        if app is None:
-            with open(os.devnull, 'w') as fnull:
-                with redirect_stderr(fnull):
-                    app = QApplication(sys.argv)
-                    app.setQuitOnLastWindowClosed(True)
-
-        timeout_sec = timeout_ms // 1000 if timeout_ms > 0 else 10
-        if urgency == "normal":
-            notification = TimedNotification(
-                title=title,
-                message=message,
-                timeout=timeout_sec,
-            )
-            notification.show()
-        if urgency == "critical":
-            notification = TimedNotification(
-                title=title,
-                message=message,
-                timeout=300,
-                color_bg="#FFC0CB",
-                color_timer="#8B0000",
-            )
-            notification.show()
-        app.exec()
-
+        with _notifier_lock:
+            notifier = _get_notifier()
+            _notifier_sent.append(item)
+            del _notifier_sent[:-NOTIFIER_RESEND_LIMIT]
+            try:
+                notifier.stdin.write((json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8"))
+                notifier.stdin.flush()
+            except BrokenPipeError:
+                # Уведомитель уже завершился: его сообщения (включая это) доставляются через notify-send
+                if notifier.wait() == 0:
+                    _notify_send(title, message, urgency, timeout_ms)
+                _check_notifier()
+                return
+            _check_notifier()
     except Exception as e:
-        write_log(f"Ошибка PyQt6-уведомления: {e}", MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST,
-                  "critical",MODULE_LOG_FILE_ERROR)
-        try:
-            subprocess.run([
-                "notify-send", "-u", urgency, "-t", str(timeout_ms), title, message
-            ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            write_log(f"Ошибка PyQt6-уведомления: {e}", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST,
-                      "critical", MODULE_LOG_FILE_ERROR)
-        except Exception as fe:
-            write_log(f"Ошибка PyQt6-уведомления: {e}", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST,
-                      "critical", MODULE_LOG_FILE_ERROR)
\ No newline at end of file
+        write_log(f"Ошибка передачи уведомления процессу-уведомителю: {e}", MODULE_LOG_FILE_ALL,
+                  MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+        _notify_send(title, message, urgency, timeout_ms)
+# --- /ФУНКЦИЯ ПОКАЗА УВЕДОМЛЕНИЯ ---
+
+
+def __getattr__(name: str):
+    """Окна и очередь уведомлений (PyQt6) доступны отсюда, но загружаются только при обращении."""
+    if name in ("TimedNotification", "create_notification"):
+        from . import notification_window
+        return getattr(notification_window, name)
+    if name in ("NotificationQueue", "run_notifier"):
+        from . import notifier
+        return getattr(notifier, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
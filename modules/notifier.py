@@ -0,0 +1,166 @@
+# ./modules/notifier.py
+"""
+Процесс-уведомитель: показывает всплывающие уведомления, переданные show_popup_notification
+(modules.notifications) строками JSON через stdin, в собственном цикле событий Qt.
+PyQt6 загружается только в этом процессе и только в run_notifier (modules.notification_window):
+если он недоступен или Qt не запускается, сообщения показываются через notify-send.
+Запуск (выполняется автоматически):
+    python -m modules.notifier
+"""
+
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import redirect_stderr
+
+from settings import MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_ERROR
+from .main_functions import write_log
+from .notifications import _notify_send
+
+# --- НАСТРОЙКИ ---
+# Период опроса очереди сообщений (мс)
+NOTIFIER_POLL_MS = 200
+# Отступ между окнами, показанными одновременно (пиксели)
+NOTIFICATION_SPACING = 10
+# Сколько окон показывать одновременно (остальные ждут в очереди)
+MAX_VISIBLE_NOTIFICATIONS = 3
+# Повтор уведомления с теми же заголовком и текстом в течение этого времени (с) не открывает
+# новое окно, а увеличивает счётчик в уже показанном
+COALESCE_WINDOW_SEC = 60
+# --- /НАСТРОЙКИ ---
+
+
+# --- ПРОЦЕСС-УВЕДОМИТЕЛЬ ---
+class NotificationQueue:
+    """
+    Очередь уведомлений процесса-уведомителя: показывает до max_visible окон стопкой
+    в правом нижнем углу, остальные держит в очереди до закрытия показанных. Повторы
+    (те же срочность, заголовок и текст) в течение coalesce_sec секунд после первого
+    такого сообщения объединяются в одно окно (или ожидающую запись) со счётчиком.
+    """
+
+    def __init__(self, max_visible: int = MAX_VISIBLE_NOTIFICATIONS, coalesce_sec: float = COALESCE_WINDOW_SEC,
+                 factory=None, clock=time.monotonic):
+        self.max_visible = max_visible
+        self.coalesce_sec = coalesce_sec
+        # Фабрика окон (по умолчанию — notification_window.create_notification)
+        self.factory = factory
+        self.clock = clock
+        # Показанные окна: {"key", "since", "count", "window"}; ожидающие: {"key", "since", "count", "item"}
+        self.visible: list[dict] = []
+        self.pending: deque[dict] = deque()
+
+    def __len__(self):
+        return len(self.visible) + len(self.pending)
+
+    @staticmethod
+    def _key(item: dict) -> tuple:
+        return item["urgency"], item["title"], item["message"]
+
+    def submit(self, item: dict):
+        """Добавляет сообщение: объединяет с недавним таким же или ставит в очередь."""
+        key, now = self._key(item), self.clock()
+        for entry in self.visible:
+            if entry["key"] == key and now - entry["since"] <= self.coalesce_sec:
+                entry["count"] += 1
+                entry["window"].set_repeat_count(entry["count"])
+                return
+        for entry in self.pending:
+            if entry["key"] == key and now - entry["since"] <= self.coalesce_sec:
+                entry["count"] += 1
+                return
+        self.pending.append({"key": key, "since": now, "count": 1, "item": item})
+
+    def update(self):
+        """Убирает закрытые окна, сдвигает стопку и показывает ожидающие сообщения."""
+        self.visible = [entry for entry in self.visible if entry["window"].isVisible()]
+        offset = 0
+        for entry in self.visible:
+            entry["window"].set_stack_offset(offset)
+            offset += entry["window"].height() + NOTIFICATION_SPACING
+        while self.pending and len(self.visible) < self.max_visible:
+            entry = self.pending.popleft()
+            item = entry["item"]
+            if self.factory is None:
+                from .notification_window import create_notification
+                self.factory = create_notification
+            window = self.factory(item["title"], item["message"], item["urgency"], item["timeout_ms"],
+                                  quit_on_close=False, stack_offset=offset)
+            if window is None:
+                continue
+            if entry["count"] > 1:
+                window.set_repeat_count(entry["count"])
+            window.show()
+            offset += window.height() + NOTIFICATION_SPACING
+            # Окно объединяет повторы в том же окне времени, что и ожидавшая запись
+            self.visible.append({"key": entry["key"], "since": entry["since"], "count": entry["count"],
+                                 "window": window})
+
+
+def _read_messages(stream, inbox: queue.Queue):
+    """Читает сообщения (строки JSON) из канала в очередь; None в очереди — канал закрыт."""
+    try:
+        for line in stream:
+            try:
+                inbox.put(json.loads(line))
+            except ValueError:
+                continue
+    finally:
+        inbox.put(None)
+
+
+def run_notifier(stream=None):
+    """
+    Цикл процесса-уведомителя: показывает окна для сообщений из stream (по умолчанию stdin)
+    и завершается, когда канал закрыт и все окна закрыты.
+    """
+    stream = stream if stream is not None else sys.stdin.buffer
+    inbox: queue.Queue = queue.Queue()
+    threading.Thread(target=_read_messages, args=(stream, inbox), daemon=True).start()
+    try:
+        from PyQt6.QtCore import QTimer
+        from PyQt6.QtWidgets import QApplication
+        from .notification_window import create_notification
+
+        with open(os.devnull, 'w') as fnull:
+            with redirect_stderr(fnull):
+                app = QApplication(sys.argv)
+        app.setQuitOnLastWindowClosed(False)
+    except Exception as e:
+        write_log(f"Ошибка PyQt6-уведомления: {e}. Уведомления показываются через notify-send.",
+                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+        while (item := inbox.get()) is not None:
+            _notify_send(item["title"], item["message"], item["urgency"], item["timeout_ms"])
+        return
+
+    notification_queue = NotificationQueue(factory=create_notification)
+    closed = False
+
+    def poll():
+        nonlocal closed
+        while True:
+            try:
+                item = inbox.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                closed = True
+            else:
+                notification_queue.submit(item)
+        notification_queue.update()
+        if closed and not notification_queue:
+            app.quit()
+
+    timer = QTimer()
+    timer.timeout.connect(poll)
+    timer.start(NOTIFIER_POLL_MS)
+    app.exec()
+# --- /ПРОЦЕСС-УВЕДОМИТЕЛЬ ---
+
+
+if __name__ == "__main__":
+    run_notifier()
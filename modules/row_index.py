@@ -0,0 +1,148 @@
+"""
+Модуль индекса смещений строк для широких открытых CSV-файлов (DB_ConnectLEtoARM.csv).
+Индекс хранится рядом с CSV (файл '<имя>.csv.rowidx') и сопоставляет значению ключевого
+столбца (IP-адресу) смещения его строк в файле, что позволяет прочитать только строку
+заголовка и нужные строки вместо всей матрицы. Индекс пересобирается при изменении
+размера или времени изменения CSV-файла.
+"""
+
+import csv
+import io
+import json
+import os
+
+from settings import MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_ERROR
+from .main_functions import write_log
+
+# --- НАСТРОЙКИ ---
+# Расширение файла индекса
+INDEX_SUFFIX = ".rowidx"
+# Версия формата индекса
+INDEX_VERSION = 2
+# --- /НАСТРОЙКИ ---
+
+
+def index_path(csv_path: str) -> str:
+    """Путь к файлу индекса для CSV-файла csv_path."""
+    return csv_path + INDEX_SUFFIX
+
+
+def is_index_file(path: str) -> bool:
+    """Путь — файл индекса строк."""
+    return path.endswith(INDEX_SUFFIX)
+
+
+def _parse_line(line: bytes) -> list[str]:
+    """Разбирает одну строку CSV (с учётом кавычек)."""
+    return next(csv.reader([line.decode('utf-8-sig').rstrip("\r\n")]), [])
+
+
+def _key_field(line: bytes, position: int) -> str:
+    """
+    Значение ключевого столбца строки без пробелов по краям; без кавычек до него строка
+    только режется по запятым.
+    """
+    prefix = line.split(b",", position + 1)
+    if b'"' not in b",".join(prefix[:position + 1]):
+        field = prefix[position].decode('utf-8')
+    else:
+        field = _parse_line(line)[position]
+    return field.strip()
+
+
+def build_row_index(csv_path: str, key_column: str, skiprows: int = 1) -> dict:
+    """
+    Строит индекс смещений строк CSV-файла по столбцу key_column и сохраняет его рядом с файлом.
+
+    Args:
+        csv_path: Путь к CSV-файлу.
+        key_column: Ключевой столбец (например, 'IPaddress').
+        skiprows: Количество служебных строк перед заголовком.
+
+    Returns:
+        Тело индекса.
+    """
+    stat = os.stat(csv_path)
+    entries: dict[str, list[int]] = {}
+    with open(csv_path, 'rb') as f:
+        offset = 0
+        for _ in range(skiprows):
+            offset += len(f.readline())
+        header_offset = offset
+        header = f.readline()
+        offset += len(header)
+        position = _parse_line(header).index(key_column)
+        for line in f:
+            if line.strip():
+                entries.setdefault(_key_field(line, position), []).append(offset)
+            offset += len(line)
+
+    body = {
+        "version": INDEX_VERSION,
+        "key_column": key_column,
+        "skiprows": skiprows,
+        "csv_size": stat.st_size,
+        "csv_mtime_ns": stat.st_mtime_ns,
+        "header_offset": header_offset,
+        "entries": entries,
+    }
+    tmp_path = index_path(csv_path) + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(body, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, index_path(csv_path))
+    write_log(f"[row_index] Индекс строк по столбцу '{key_column}' построен: '{index_path(csv_path)}' "
+              f"(ключей: {len(entries)}).", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+    return body
+
+
+def load_row_index(csv_path: str, key_column: str, skiprows: int = 1) -> dict:
+    """Возвращает актуальный индекс CSV-файла, при отсутствии или устаревании — строит заново."""
+    path = index_path(csv_path)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                body = json.load(f)
+            stat = os.stat(csv_path)
+            if (body.get("version") == INDEX_VERSION and body.get("key_column") == key_column
+                    and body.get("skiprows") == skiprows and body["csv_size"] == stat.st_size
+                    and body["csv_mtime_ns"] == stat.st_mtime_ns):
+                return body
+        except Exception as e:
+            write_log(f"[row_index] Индекс '{path}' не прочитан ({e}), строится заново.",
+                      MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+    return build_row_index(csv_path, key_column, skiprows)
+
+
+def _read_rows(csv_path: str, key_column: str, value: str, skiprows: int) -> list[bytes]:
+    """Строка заголовка и строки со значением value по смещениям из индекса."""
+    body = load_row_index(csv_path, key_column, skiprows)
+    with open(csv_path, 'rb') as f:
+        f.seek(body["header_offset"])
+        lines = [f.readline()]
+        for offset in body["entries"].get(value, []):
+            f.seek(offset)
+            line = f.readline()
+            lines.append(line if line.endswith(b"\n") else line + b"\n")
+    return lines
+
+
+def find_records(csv_path: str, key_column: str, value: str, skiprows: int = 1) -> list[dict]:
+    """
+    Находит строки CSV-файла, у которых key_column == value, читая только строку заголовка
+    и строки по смещениям из индекса.
+
+    Args:
+        csv_path: Путь к CSV-файлу.
+        key_column: Ключевой столбец (например, 'IPaddress').
+        value: Искомое значение.
+        skiprows: Количество служебных строк перед заголовком.
+
+    Returns:
+        Найденные строки списком словарей {столбец: строка}, пустые ячейки — None
+        (пустой список, если совпадений нет).
+    """
+    lines = _read_rows(csv_path, key_column, value, skiprows)
+    reader = csv.reader(io.StringIO(b"".join(lines).decode('utf-8-sig'), newline=''))
+    header = next(reader)
+    return [{col: (row[i] if i < len(row) and row[i] != "" else None) for i, col in enumerate(header)}
+            for row in reader if row]
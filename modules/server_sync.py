@@ -5,18 +5,15 @@
 """
 
 import os
-import shutil
 import socket
 import subprocess
 from typing import List
 
-import pandas as pd
-
 import modules.exceptions
 from settings import (SHARED_NETWORK_PATH, NAME_NET_INTERFACE, MASK_NET, MODULE_LOG_FILE_ALL,
                       MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_ERROR, DATA_DIR, SHARED_DIR)
-from . import data_handler
-from .main_functions import write_log, is_network_share_accessible, clear_folder_files
+from . import area_bundle, generations, incremental_sync, row_index
+from .main_functions import write_log, is_network_share_accessible
 from .notifications import show_popup_notification
 
 # --- /ИМПОРТ НАСТРОЕК ---
@@ -26,6 +23,10 @@ from .notifications import show_popup_notification
 global_ResultSynchServer: int = 0 # 1 = успех, 0 = неудача
 global_MyAccessApp: str = "" # AreaApp из DB_InfoARM.csv
 global_INNtoIP: list = [] # INN из DB_ConnectLEtoARM.csv
+# Инкрементальная синхронизация по манифесту (False — все файлы копируются заново при каждом запуске)
+SYNC_INCREMENTAL: bool = True
+# Получать области из пакетов '.bundles' общей папки, если они опубликованы (см. area_bundle)
+SYNC_USE_BUNDLES: bool = True
 
 # --- /НАСТРОЙКИ ---
 
@@ -170,6 +171,91 @@ def split_area_app(area_app_str: str, delimiter: str = ";") -> List[str]:
             edited_parts.append(edited_part)
     return edited_parts
 
+def _is_top_level_file(rel_path: str, is_dir: bool) -> bool:
+    """Файл в корне общей папки (DB_InfoARM.csv, DB_ConnectLEtoARM.csv и т. п.)."""
+    return not is_dir and "/" not in rel_path
+
+def _is_local_top_level_file(rel_path: str, is_dir: bool) -> bool:
+    """Файл в корне локальной копии, кроме кэша матрицы доступа и индекса строк (они строятся на месте)."""
+    from .access_matrix import is_cache_file
+    return (_is_top_level_file(rel_path, is_dir) and not is_cache_file(rel_path)
+            and not row_index.is_index_file(rel_path))
+
+def _is_area_item(rel_path: str, is_dir: bool) -> bool:
+    """Папка области применения или любой элемент внутри неё."""
+    return is_dir or "/" in rel_path
+
+def _is_inn(name: str) -> bool:
+    """Имя папки — ИНН (10 цифр для юрлица, 12 — для физлица/ИП)."""
+    return name.isdigit() and len(name) in (10, 12)
+
+def area_filter(allowed_areas: set[str], inn_list: list[str]):
+    """
+    Фильтр элементов общей папки для incremental_sync.sync_tree: только папки разрешённых
+    областей, а внутри них — только папки учреждений из inn_list (если папки области
+    названы по ИНН); прочие вложенные папки и файлы копируются целиком.
+    """
+    allowed_inn = set(inn_list)
+
+    def include(rel_path: str, is_dir: bool) -> bool:
+        parts = rel_path.split("/")
+        if len(parts) == 1:
+            return is_dir and parts[0] in allowed_areas
+        if len(parts) == 2 and is_dir and _is_inn(parts[1]):
+            return parts[1] in allowed_inn
+        return True
+
+    return include
+
+def load_inn_access(db_connect_path: str, pc_ip: str) -> list[str] | None:
+    """
+    ИНН учреждений, к которым у АРМ pc_ip есть доступ по DB_ConnectLEtoARM.csv (None — IP не найден).
+    С бэкендом pandas (data_handler.CSV_BACKEND) используется матрица доступа access_matrix
+    (NumPy, кэш рядом с файлом), с бэкендом csv — индекс строк row_index без pandas и NumPy.
+    """
+    from . import data_handler
+
+    if data_handler.csv_backend() == "pandas":
+        from .access_matrix import AccessMatrix
+        access_matrix = AccessMatrix.load(db_connect_path)
+        return access_matrix.inns_for_ip(pc_ip) if pc_ip in access_matrix else None
+    records = row_index.find_records(db_connect_path, 'IPaddress', pc_ip)
+    if not records:
+        return None
+    # Берем первую найденную строку (должна быть единственная); столбцы, кроме 'IPaddress', — ИНН
+    return [col for col, access_flag in records[0].items()
+            if col != 'IPaddress' and access_flag is not None and access_flag.strip().lower() in ['true', '1', 'yes']]
+
+def sync_areas(share_root: str, dst_root: str, allowed_areas: set[str], inn_list: list[str],
+               incremental: bool = True, use_bundles: bool = True) -> dict:
+    """
+    Копирует разрешённые области (и папки учреждений из inn_list) из share_root в dst_root.
+    Области с опубликованным пакетом скачиваются одним архивом (area_bundle), остальные —
+    по файлам (incremental_sync.sync_tree); область, пакет которой не получен, тоже копируется
+    по файлам. Папки неразрешённых областей удаляются.
+
+    Returns:
+        Статистика sync_tree по областям, скопированным по файлам.
+    """
+    include = area_filter(allowed_areas, inn_list)
+    bundled_areas = {area for area in allowed_areas if use_bundles and area_bundle.has_bundle(share_root, area)}
+    for area in sorted(bundled_areas):
+        try:
+            area_bundle.sync_area_bundle(share_root, area, dst_root, include,
+                                         include_key=",".join(sorted(inn_list)), force=not incremental)
+        except Exception as e:
+            # Пакет пересобирается во время скачивания или повреждён: область копируется по файлам
+            bundled_areas.discard(area)
+            write_log(f"[server_sync] Пакет области '{area}' не получен ({e}), "
+                      f"область копируется по файлам.", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST,
+                      "error", MODULE_LOG_FILE_ERROR)
+    write_log(f"[server_sync] Области из пакетов: {sorted(bundled_areas)}.", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+    return incremental_sync.sync_tree(
+        share_root, dst_root,
+        include=lambda rel_path, is_dir: rel_path.split("/")[0] not in bundled_areas and include(rel_path, is_dir),
+        scope=lambda rel_path, is_dir: rel_path.split("/")[0] not in bundled_areas and _is_area_item(rel_path, is_dir),
+        incremental=incremental)
+
 # --- /ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ ---
 
 # --- ОСНОВНАЯ ФУНКЦИЯ СИНХРОНИЗАЦИИ ---
@@ -182,7 +268,10 @@ def func_LoadingDataThisServer(aes_key: bytes):
         aes_key: 32-байтовый общий AES-ключ.
     """
     global global_ResultSynchServer, global_MyAccessApp, global_INNtoIP
+    # data_handler (и pandas, если он установлен) загружается при синхронизации, а не при импорте модуля
+    from . import data_handler
 
+    stage_dir = None
     try:
         write_log("[server_sync] Начало синхронизации данных с сервером...",
                   MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
@@ -220,44 +309,29 @@ def func_LoadingDataThisServer(aes_key: bytes):
         write_log(f"[server_sync] Путь к полученным данным: {SHARED_DIR}",
                   MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
 
-        # 5. Очистка локальной папки shared
-        write_log(f"[server_sync] Очистка локальной папки shared: '{SHARED_DIR}'...",
-                  MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
-        if os.path.exists(SHARED_DIR):
-            clear_folder_files(SHARED_DIR)
-        else:
-            os.makedirs(SHARED_DIR, exist_ok=True)
-        write_log(f"[server_sync] Локальная папка shared очищена/создана.", "info")
+        # Синхронизация собирается в новом поколении; SHARED_DIR переключается на него
+        # только после успешного завершения
+        stage_dir = generations.stage_generation(SHARED_DIR)
 
-        # 6. Копирование данных из общей сетевой папки в локальную shared
-        write_log(f"[server_sync] Копирование данных из общей сетевой папки '{SHARED_NETWORK_PATH}'"
-                  f" в локальную '{SHARED_DIR}'...",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
+        # 5-6. Получение файлов верхнего уровня общей папки (DB_InfoARM.csv, DB_ConnectLEtoARM.csv).
+        # Папки областей копируются позже, когда известно, какие из них разрешены этому АРМ
+        write_log(f"[server_sync] Получение файлов баз данных из общей сетевой папки '{SHARED_NETWORK_PATH}'"
+                  f" в локальную '{stage_dir}'...",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
         try:
-            # Используем shutil.copytree для рекурсивного копирования
-            # Но copytree требует, чтобы целевая папка НЕ существовала
-            # Поэтому используем distutils.dir_util.copy_tree или просто копируем содержимое
-            for item in os.listdir(SHARED_NETWORK_PATH):
-                s = os.path.join(SHARED_NETWORK_PATH, item)
-                d = os.path.join(SHARED_DIR, item)
-                if os.path.isfile(s):
-                    shutil.copy2(s, d)
-                    write_log(f"[server_sync]   -> Скопирован файл: '{item}'",MODULE_LOG_FILE_ALL,
-                              MODULE_LOG_FILE_LAST)
-                elif os.path.isdir(s):
-                    if os.path.exists(d):
-                        shutil.rmtree(d)
-                    shutil.copytree(s, d)
-                    write_log(f"[server_sync]   -> Скопирована папка: '{item}'",MODULE_LOG_FILE_ALL,
-                              MODULE_LOG_FILE_LAST)
+            sync_stats = incremental_sync.sync_tree(SHARED_NETWORK_PATH, stage_dir, include=_is_top_level_file,
+                                                    scope=_is_local_top_level_file,
+                                                    incremental=SYNC_INCREMENTAL)
         except Exception as e:
             error_msg = f"Ошибка копирования данных из общей сетевой папки: {e}"
             write_log(f"[server_sync] {error_msg}",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST,
                       "error",MODULE_LOG_FILE_ERROR)
             raise RuntimeError(error_msg) from e
-        write_log(f"[server_sync] Данные успешно скопированы.",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
+        write_log(f"[server_sync] Файлы баз данных получены: скопировано {sync_stats['copied']}, "
+                  f"пропущено {sync_stats['skipped']}, удалено {sync_stats['deleted']}, "
+                  f"передано байт {sync_stats['bytes_copied']}.",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
 
         # 7. Чтение и дешифрование DB_InfoARM.csv
-        db_info_arm_path = os.path.join(SHARED_DIR, "DB_InfoARM.csv")
+        db_info_arm_path = os.path.join(stage_dir, "DB_InfoARM.csv")
         write_log(f"[server_sync] Чтение и дешифрование '{db_info_arm_path}'...",
                   MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
         if not os.path.exists(db_info_arm_path):
@@ -266,25 +340,24 @@ def func_LoadingDataThisServer(aes_key: bytes):
                       "error",MODULE_LOG_FILE_ERROR)
             raise FileNotFoundError(error_msg)
 
+        # 8. Фильтрация по IP-адресу
+        write_log(f"[server_sync] Поиск записи по IP-адресу '{pc_ip}'...",
+                  MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
         try:
-            # Используем data_handler для чтения и дешифрования CSV
-            df_arm = data_handler.read_encrypted_csv(db_info_arm_path, aes_key)
-            write_log(f"[server_sync] Файл 'DB_InfoARM.csv' успешно прочитан и расшифрован. "
-                      f"Количество записей: {len(df_arm)}.",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
+            # Читаем файл порциями и останавливаемся на порции с записью этого IP
+            # Предполагаем, что в файле есть колонка 'IPaddress'
+            # Из остальных столбцов нужен только AreaApp — прочие не читаются и не дешифруются
+            rows_filtered_by_ip = data_handler.find_encrypted_csv_records(db_info_arm_path, aes_key,
+                                                                          'IPaddress', pc_ip, columns=['AreaApp'])
+            write_log(f"[server_sync] Файл 'DB_InfoARM.csv' прочитан и расшифрован. "
+                      f"Найдено записей для IP: {len(rows_filtered_by_ip)}.",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
         except Exception as e:
             error_msg = f"Ошибка чтения/дешифрования 'DB_InfoARM.csv': {e}"
             write_log(f"[server_sync] {error_msg}",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST,
                       "error",MODULE_LOG_FILE_ERROR)
             raise RuntimeError(error_msg) from e
 
-        # 8. Фильтрация по IP-адресу
-        write_log(f"[server_sync] Фильтрация записей по IP-адресу '{pc_ip}'...",
-                  MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
-        # Предполагаем, что в DataFrame есть колонка 'IPaddress'
-        df_filtered_by_ip = df_arm[df_arm['IPaddress'] == pc_ip] # Используем == для точного совпадения
-        # df_filtered_by_ip = df_arm[df_arm['IPaddress'].str.contains(pc_ip, na=False)] # Альтернатива, если нужен частичный матч
-
-        if df_filtered_by_ip.empty:
+        if not rows_filtered_by_ip:
             error_msg = "Данный компьютер не имеет доступа (IP не найден в DB_InfoARM.csv)!"
             write_log(f"[server_sync] {error_msg}",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST,
                       "error",MODULE_LOG_FILE_ERROR)
@@ -294,18 +367,18 @@ def func_LoadingDataThisServer(aes_key: bytes):
                 "critical",
                 0 # Бесконечно
             )
-            # Удаляем папку shared
-            if os.path.exists(SHARED_DIR):
-                shutil.rmtree(SHARED_DIR)
-                write_log(f"[server_sync] Папка '{SHARED_DIR}' удалена из-за отсутствия доступа.",
-                          MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
+            # Удаляем папку shared (все поколения локальной копии)
+            generations.discard_generation(stage_dir)
+            generations.remove_all(SHARED_DIR)
+            write_log(f"[server_sync] Папка '{SHARED_DIR}' удалена из-за отсутствия доступа.",
+                      MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
             global_ResultSynchServer = 0
             return # Выходим из функции
 
         # 9. Извлечение AreaApp
-        # Предполагаем, что в DataFrame есть колонка 'AreaApp'
-        data_access_raw = df_filtered_by_ip.iloc[0]['AreaApp'] # Берем первую (и, скорее всего, единственную) запись
-        if not data_access_raw or pd.isna(data_access_raw):
+        # Предполагаем, что в файле есть колонка 'AreaApp'
+        data_access_raw = rows_filtered_by_ip[0]['AreaApp'] # Берем первую (и, скорее всего, единственную) запись
+        if not data_access_raw:
             error_msg = f"У записи компьютера с IP '{pc_ip}' отсутствует значение AreaApp!"
             write_log(f"[server_sync] {error_msg}",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST,
                       "error",MODULE_LOG_FILE_ERROR)
@@ -315,11 +388,11 @@ def func_LoadingDataThisServer(aes_key: bytes):
                 "critical",
                 0 # Бесконечно
             )
-            # Удаляем папку shared
-            if os.path.exists(SHARED_DIR):
-                shutil.rmtree(SHARED_DIR)
-                write_log(f"[server_sync] Папка '{SHARED_DIR}' удалена из-за отсутствия AreaApp.",
-                          MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
+            # Удаляем папку shared (все поколения локальной копии)
+            generations.discard_generation(stage_dir)
+            generations.remove_all(SHARED_DIR)
+            write_log(f"[server_sync] Папка '{SHARED_DIR}' удалена из-за отсутствия AreaApp.",
+                      MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
             global_ResultSynchServer = 0
             return # Выходим из функции
 
@@ -328,46 +401,22 @@ def func_LoadingDataThisServer(aes_key: bytes):
         write_log(f"[server_sync] {text_inform}",
                   MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
 
-        # 10. Анализ AreaApp и удаление ненужных папок
-        write_log(f"[server_sync] Анализ AreaApp и удаление ненужных папок...",
+        # 10. Определение разрешённых областей применения (папок общей сетевой папки)
+        write_log(f"[server_sync] Анализ AreaApp...",
                   MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
-        # Получаем список всех папок в shared
-        list_area = [d for d in os.listdir(SHARED_DIR) if os.path.isdir(os.path.join(SHARED_DIR, d))]
-        delete_area = []
-
         # Разделяем AreaApp по ;
         arr_access = split_area_app(data_access_raw, ";")
-        write_log(f"[server_sync] Разрешённые области применения: {arr_access}",
-                  MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
-
         if len(arr_access) > 1:
             # Если несколько областей
-            for area_dir in list_area:
-                if area_dir not in arr_access:
-                    delete_area.append(area_dir)
+            allowed_areas = set(arr_access)
         else:
             # Если одна область
-            single_access = edit_access(data_access_raw) # Редактируем, если нужно
-            for area_dir in list_area:
-                if area_dir != single_access:
-                    delete_area.append(area_dir)
-
-        write_log(f"[server_sync] Папки для удаления: {delete_area}",
+            allowed_areas = {edit_access(data_access_raw)} # Редактируем, если нужно
+        write_log(f"[server_sync] Разрешённые области применения: {sorted(allowed_areas)}",
                   MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
-        # Удаляем ненужные папки
-        for area_to_delete in delete_area:
-            area_path = os.path.join(SHARED_DIR, area_to_delete)
-            if os.path.exists(area_path):
-                try:
-                    shutil.rmtree(area_path)
-                    write_log(f"[server_sync]   -> Удалена папка: '{area_to_delete}'",
-                              MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
-                except Exception as e:
-                    write_log(f"[server_sync]   -> Ошибка удаления папки '{area_to_delete}': {e}",
-                              MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST,"error",MODULE_LOG_FILE_ERROR)
 
         # 11. Чтение DB_ConnectLEtoARM.csv
-        db_connect_path = os.path.join(SHARED_DIR, "DB_ConnectLEtoARM.csv")
+        db_connect_path = os.path.join(stage_dir, "DB_ConnectLEtoARM.csv")
         write_log(f"[server_sync] Чтение и дешифрование '{db_connect_path}'...",
                   MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
         if not os.path.exists(db_connect_path):
@@ -375,21 +424,21 @@ def func_LoadingDataThisServer(aes_key: bytes):
             write_log(f"[server_sync] {error_msg}",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST,
                       "error",MODULE_LOG_FILE_ERROR)
             raise FileNotFoundError(error_msg)
+
+        # 12-13. Поиск строки по IP-адресу и извлечение INN: столбцы ИНН, где у этого IP установлен
+        # флаг доступа. Файл не читается целиком: используется матрица доступа или индекс строк,
+        # которые строятся один раз при изменении файла и хранятся рядом с ним
         try:
-            # Читаем CSV в DataFrame
-            df_conn_le_to_arm = pd.read_csv(db_connect_path, encoding='utf-8', skiprows=1)
-            write_log(f"[server_sync] Файл '{db_connect_path}' успешно прочитан."
-                      f" Количество записей: {len(df_conn_le_to_arm)}.", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+            inn_access = load_inn_access(db_connect_path, pc_ip)
+            write_log(f"[server_sync] Файл '{db_connect_path}' прочитан "
+                      f"(бэкенд {data_handler.csv_backend()}).", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
         except Exception as e:
             error_msg = f"Ошибка чтения 'DB_ConnectLEtoARM.csv': {e}"
             write_log(f"[server_sync] {error_msg}",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST,
                       "error",MODULE_LOG_FILE_ERROR)
             raise RuntimeError(error_msg) from e
 
-        # 12. Фильтрация по IP-адресу
-        # Предполагаем, что в DataFrame есть колонка 'IPaddress'
-        sel_conn_le_to_arm = df_conn_le_to_arm[df_conn_le_to_arm['IPaddress'] == pc_ip] # Используем == для точного совпадения
-        if sel_conn_le_to_arm.empty:
+        if inn_access is None:
             error_msg = f"[server_sync] Для IP-адреса '{pc_ip}' не найдены записи в '{db_connect_path}'."
             write_log(error_msg,MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST,"error",MODULE_LOG_FILE_ERROR)
             show_popup_notification(
@@ -398,30 +447,16 @@ def func_LoadingDataThisServer(aes_key: bytes):
                 "critical",
                 0
             )
-            # Удаляем папку shared
-            if os.path.exists(SHARED_DIR):
-                shutil.rmtree(SHARED_DIR)
-                write_log(f"[server_sync] Папка '{SHARED_DIR}' удалена из-за отсутствия доступа.",
-                          MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+            # Удаляем папку shared (все поколения локальной копии)
+            generations.discard_generation(stage_dir)
+            generations.remove_all(SHARED_DIR)
+            write_log(f"[server_sync] Папка '{SHARED_DIR}' удалена из-за отсутствия доступа.",
+                      MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
             global_ResultSynchServer = 0
             return
 
-        write_log(f"[server_sync] Найдены записи для IP-адреса '{pc_ip}'. "
-                  f"Количество: {len(sel_conn_le_to_arm)}.",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
-
-        # 13. Извлечение INN из записей
-        # Получаем список всех столбцов, кроме 'IPaddress'
-        inn_columns = [col for col in sel_conn_le_to_arm.columns if col != 'IPaddress']
-        # Берем первую найденную строку (должна быть единственная)
-        matched_row = sel_conn_le_to_arm.iloc[0]
-        # Извлекаем список ИНН, к которым у этого IP есть доступ (где значение True)
-        global_INNtoIP = []
-        for col in inn_columns:
-            # Получаем значение из найденной строки для текущего столбца ИНН
-            access_flag = matched_row[col]
-            # Проверяем, является ли значение True (или "True" в строковом виде)
-            if str(access_flag).lower() in ['true', '1', 'yes']:
-                global_INNtoIP.append(col)  # Добавляем имя столбца (который является ИНН) в список
+        write_log(f"[server_sync] Найдена запись для IP-адреса '{pc_ip}'.",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
+        global_INNtoIP = inn_access
         if len(global_INNtoIP) > 0:
             write_log(f"[server_sync] Сформирован список учреждений с доступом. "
                       f"Количество: {len(global_INNtoIP)}.",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
@@ -435,15 +470,34 @@ def func_LoadingDataThisServer(aes_key: bytes):
                 "critical",
                 0
             )
-            # Удаляем папку shared
-            if os.path.exists(SHARED_DIR):
-                shutil.rmtree(SHARED_DIR)
-                write_log(f"[server_sync] Папка '{SHARED_DIR}' удалена из-за отсутствия доступа.",
-                          MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+            # Удаляем папку shared (все поколения локальной копии)
+            generations.discard_generation(stage_dir)
+            generations.remove_all(SHARED_DIR)
+            write_log(f"[server_sync] Папка '{SHARED_DIR}' удалена из-за отсутствия доступа.",
+                      MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
             global_ResultSynchServer = 0
             return
 
-        # 14. Установка флага успеха
+        # 14. Копирование только разрешённых областей (и папок учреждений из global_INNtoIP).
+        # Папки остальных областей не копируются, а оставшиеся от прошлых запусков удаляются.
+        # Области с опубликованным пакетом скачиваются одним архивом, остальные — по файлам
+        write_log(f"[server_sync] Копирование разрешённых областей {sorted(allowed_areas)} из общей сетевой "
+                  f"папки '{SHARED_NETWORK_PATH}'...", MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
+        try:
+            sync_stats = sync_areas(SHARED_NETWORK_PATH, stage_dir, allowed_areas, global_INNtoIP,
+                                    incremental=SYNC_INCREMENTAL, use_bundles=SYNC_USE_BUNDLES)
+        except Exception as e:
+            error_msg = f"Ошибка копирования папок областей из общей сетевой папки: {e}"
+            write_log(f"[server_sync] {error_msg}",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST,
+                      "error",MODULE_LOG_FILE_ERROR)
+            raise RuntimeError(error_msg) from e
+        write_log(f"[server_sync] Папки областей синхронизированы: скопировано {sync_stats['copied']}, "
+                  f"пропущено {sync_stats['skipped']}, удалено {sync_stats['deleted']}, "
+                  f"передано байт {sync_stats['bytes_copied']} из {sync_stats['bytes_total']} "
+                  f"({sync_stats['transfer_ratio']:.0%}).",MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
+
+        # 15. Переключение SHARED_DIR на новое поколение и установка флага успеха
+        generations.commit_generation(SHARED_DIR, stage_dir)
         global_ResultSynchServer = 1
         write_log("[server_sync] Синхронизация данных с сервером успешно завершена.",
                   MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
@@ -458,11 +512,9 @@ def func_LoadingDataThisServer(aes_key: bytes):
             "critical",
             0 # Бесконечно
         )
-        # Удаляем папку shared при критической ошибке
-        if os.path.exists(SHARED_DIR):
-            shutil.rmtree(SHARED_DIR)
-            write_log(f"[server_sync] Папка '{SHARED_DIR}' удалена из-за критической ошибки.",
-                      MODULE_LOG_FILE_ALL,MODULE_LOG_FILE_LAST)
+        # Удаляется только незавершённое поколение: последняя удачная копия в SHARED_DIR
+        # остаётся доступной (сбой сети не должен оставлять пользователя без данных)
+        generations.discard_generation(stage_dir)
         global_ResultSynchServer = 0
         raise # Пробрасываем исключение дальше
 
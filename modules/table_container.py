@@ -0,0 +1,326 @@
+"""
+Модуль компактного зашифрованного табличного контейнера (формат v2).
+Вместо поячеечного Base64(IV + AES-256-CBC) таблица делится на блоки строк, и каждый
+столбец блока шифруется одним сегментом (с необязательным сжатием перед шифрованием).
+Оглавление (столбцы, смещения сегментов, подписи) хранится в конце файла и позволяет
+читать отдельные столбцы и строки, не дешифруя остальную таблицу.
+
+Структура файла:
+    MAGIC | сегмент 0.0 | сегмент 0.1 | ... | оглавление (JSON) | длина оглавления (8 байт) | MAGIC
+Сегмент: IV + Ciphertext от [длины значений (uint32 на строку) | байты значений UTF-8].
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import os
+import struct
+import zlib
+from typing import Iterator
+
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    # Установка без pandas (бэкенд csv в data_handler): доступна только проверка is_table_file
+    np = pd = None
+
+from settings import MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, MODULE_LOG_FILE_ERROR
+from . import crypto
+from .main_functions import write_log
+
+# --- НАСТРОЙКИ ---
+# Сигнатура в начале и в конце файла
+MAGIC = b"ELTBL2\r\n"
+# Версия формата контейнера
+FORMAT_VERSION = 2
+# Количество строк в одном блоке (единица произвольного доступа)
+BLOCK_ROWS = 4096
+# Сжатие сегментов перед шифрованием: "zlib" или "none"
+COMPRESSION = "zlib"
+# Уровень сжатия zlib
+COMPRESSION_LEVEL = 6
+# Контекст выработки ключа подписи из общего AES-ключа
+MAC_KEY_CONTEXT = b"ElOrgEDS table container v2"
+# Длина подписи сегмента (байт)
+MAC_LENGTH_BYTES = 16
+# --- /НАСТРОЙКИ ---
+
+# Длина значения, обозначающая пустую ячейку (NULL)
+_MISSING = 0xFFFFFFFF
+_FOOTER = struct.Struct("<Q")
+
+
+def _mac_key(aes_key: bytes) -> bytes:
+    """Отдельный ключ HMAC для контейнера, выработанный из общего AES-ключа."""
+    return hmac.new(aes_key, MAC_KEY_CONTEXT, hashlib.sha256).digest()
+
+
+def _segment_mac(mac_key: bytes, block: int, column: int, data) -> str:
+    """Подпись сегмента (привязана к номеру блока и столбца, чтобы сегменты нельзя было переставить)."""
+    digest = hmac.new(mac_key, struct.pack("<II", block, column), hashlib.sha256)
+    digest.update(data)
+    return digest.digest()[:MAC_LENGTH_BYTES].hex()
+
+
+def _sign(mac_key: bytes, body: dict) -> str:
+    """HMAC-SHA256 канонического JSON-представления оглавления (hex)."""
+    payload = json.dumps(body, sort_keys=True, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return hmac.new(mac_key, payload, hashlib.sha256).hexdigest()
+
+
+def _is_missing(value) -> bool:
+    """Значение — пустая ячейка: None/NaN или пустая строка (в CSV v1 они неразличимы и читаются как NaN)."""
+    return value is None or value == "" or (isinstance(value, float) and value != value)
+
+
+def _pack_column(values) -> bytes:
+    """Сериализует значения столбца: таблица длин (uint32 на строку) и байты значений UTF-8."""
+    encoded = [None if _is_missing(value) else (value if isinstance(value, str) else str(value)).encode('utf-8')
+               for value in values]
+    lengths = np.fromiter((_MISSING if value is None else len(value) for value in encoded),
+                          dtype='<u4', count=len(encoded))
+    return lengths.tobytes() + b"".join(value for value in encoded if value)
+
+
+def _column_offsets(payload, rows: int) -> tuple[np.ndarray, np.ndarray]:
+    """Таблица смещений значений сегмента: (длины, начала значений)."""
+    lengths = np.frombuffer(payload, dtype='<u4', count=rows)
+    sizes = np.where(lengths == _MISSING, 0, lengths).astype(np.int64)
+    starts = np.cumsum(sizes) - sizes + 4 * rows
+    return lengths, starts
+
+
+def _unpack_column(payload, rows: int, positions=None) -> list:
+    """Восстанавливает значения столбца (все или только строки positions); пустые ячейки — NaN."""
+    lengths, starts = _column_offsets(payload, rows)
+    if positions is None:
+        positions = range(rows)
+    values = []
+    for i in positions:
+        length = int(lengths[i])
+        if length == _MISSING:
+            values.append(np.nan)
+        else:
+            start = int(starts[i])
+            values.append(str(payload[start:start + length], 'utf-8'))
+    return values
+
+
+def is_table_file(file_path: str) -> bool:
+    """Файл является контейнером формата v2 (по сигнатуре в начале файла)."""
+    try:
+        with open(file_path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def write_table(df: pd.DataFrame, f, aes_key: bytes, block_rows: int = BLOCK_ROWS,
+                compression: str = COMPRESSION) -> dict:
+    """
+    Шифрует DataFrame и записывает его в открытый двоичный файл f в формате v2.
+    Строки без единого непустого значения отбрасываются (как в encrypt_dataframe).
+
+    Args:
+        df: DataFrame с данными для шифрования (не изменяется).
+        f: Двоичный файл, открытый на запись (запись начинается с текущей позиции).
+        aes_key: 32-байтовый AES-ключ для шифрования.
+        block_rows: Количество строк в одном блоке.
+        compression: Сжатие сегментов перед шифрованием: "zlib" или "none".
+
+    Returns:
+        Словарь со статистикой: rows, blocks, bytes.
+    """
+    if compression not in ("zlib", "none"):
+        raise ValueError(f"[table_container] Неизвестный метод сжатия: '{compression}'.")
+    codec = crypto.get_codec(aes_key)
+    mac_key = _mac_key(aes_key)
+
+    # Строки без единого непустого значения не записываются
+    keep_rows = ~(df.isna() | (df == "")).all(axis=1).to_numpy()
+    if not keep_rows.all():
+        df = df[keep_rows]
+
+    offset = f.write(MAGIC)
+    blocks = []
+    for block, start in enumerate(range(0, len(df), block_rows)):
+        df_block = df.iloc[start:start + block_rows]
+        segments = []
+        for column in range(len(df.columns)):
+            payload = _pack_column(df_block.iloc[:, column].tolist())
+            if compression == "zlib":
+                payload = zlib.compress(payload, COMPRESSION_LEVEL)
+            encrypted = codec.encrypt_bytes(payload)
+            f.write(encrypted)
+            segments.append([offset, len(encrypted), _segment_mac(mac_key, block, column, encrypted)])
+            offset += len(encrypted)
+        blocks.append({"rows": len(df_block), "segments": segments})
+
+    body = {
+        "version": FORMAT_VERSION,
+        "columns": [str(col) for col in df.columns],
+        "rows": len(df),
+        "block_rows": block_rows,
+        "compression": compression,
+        "blocks": blocks,
+    }
+    body["mac"] = _sign(mac_key, body)
+    footer = json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    f.write(footer)
+    f.write(_FOOTER.pack(len(footer)))
+    f.write(MAGIC)
+    return {"rows": len(df), "blocks": len(blocks), "bytes": offset + len(footer) + _FOOTER.size + len(MAGIC)}
+
+
+class TableReader:
+    """
+    Читатель контейнера v2: проверяет оглавление при открытии и дешифрует
+    сегменты по запросу (отдельные столбцы отдельных блоков).
+    """
+
+    def __init__(self, file_path: str, aes_key: bytes):
+        self.file_path = file_path
+        self._codec = crypto.get_codec(aes_key)
+        self._mac_key = _mac_key(aes_key)
+        self._f = open(file_path, 'rb')
+        try:
+            self._read_footer()
+        except Exception:
+            self._f.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self._f.close()
+
+    def _read_footer(self):
+        """Читает и проверяет оглавление в конце файла."""
+        f = self._f
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"[table_container] Файл '{self.file_path}' не является контейнером v2.")
+        tail_size = _FOOTER.size + len(MAGIC)
+        f.seek(-tail_size, os.SEEK_END)
+        tail = f.read(tail_size)
+        if tail[_FOOTER.size:] != MAGIC:
+            raise ValueError(f"[table_container] Файл '{self.file_path}' повреждён: нет сигнатуры в конце файла.")
+        footer_size = _FOOTER.unpack(tail[:_FOOTER.size])[0]
+        f.seek(-(tail_size + footer_size), os.SEEK_END)
+        body = json.loads(f.read(footer_size).decode('utf-8'))
+
+        mac = body.pop("mac", "")
+        if not hmac.compare_digest(mac, _sign(self._mac_key, body)):
+            raise ValueError(f"[table_container] Оглавление '{self.file_path}' не прошло проверку подписи "
+                             f"(повреждение или неверный ключ).")
+        if body.get("version") != FORMAT_VERSION:
+            raise ValueError(f"[table_container] Неподдерживаемая версия контейнера: {body.get('version')}.")
+        self.columns: list[str] = body["columns"]
+        self.rows: int = body["rows"]
+        self.block_rows: int = body["block_rows"]
+        self._compression: str = body["compression"]
+        self._blocks: list[dict] = body["blocks"]
+
+    def _column_position(self, col: str) -> int:
+        try:
+            return self.columns.index(col)
+        except ValueError:
+            raise KeyError(f"[table_container] Столбец '{col}' отсутствует в '{self.file_path}'.") from None
+
+    def _segment(self, block: int, column: int) -> bytes:
+        """Читает, проверяет и дешифрует сегмент столбца column блока block."""
+        offset, length, mac = self._blocks[block]["segments"][column]
+        self._f.seek(offset)
+        encrypted = self._f.read(length)
+        if not hmac.compare_digest(mac, _segment_mac(self._mac_key, block, column, encrypted)):
+            raise ValueError(f"[table_container] Сегмент {block}.{column} файла '{self.file_path}' "
+                             f"не прошёл проверку подписи.")
+        payload = self._codec.decrypt_bytes(encrypted)
+        if self._compression == "zlib":
+            payload = zlib.decompress(payload)
+        return payload
+
+    def read_block(self, block: int, columns: list[str] | None = None, positions=None) -> pd.DataFrame:
+        """Дешифрует блок block (столбцы columns, строки блока positions — по умолчанию все)."""
+        columns = self.columns if columns is None else columns
+        rows = self._blocks[block]["rows"]
+        data = {col: _unpack_column(self._segment(block, self._column_position(col)), rows, positions)
+                for col in columns}
+        return pd.DataFrame(data, columns=columns, dtype=object)
+
+    def iter_blocks(self, columns: list[str] | None = None) -> Iterator[pd.DataFrame]:
+        """Выдаёт расшифрованные блоки по порядку."""
+        for block in range(len(self._blocks)):
+            yield self.read_block(block, columns)
+
+    def read_rows(self, row_numbers: list[int], columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Произвольный доступ: дешифрует только блоки, содержащие строки row_numbers
+        (нумерация с 0, в порядке файла), и возвращает эти строки в запрошенном порядке.
+        """
+        by_block: dict[int, list[int]] = {}
+        for row in row_numbers:
+            if not 0 <= row < self.rows:
+                raise IndexError(f"[table_container] Строка {row} вне диапазона 0..{self.rows - 1}.")
+            by_block.setdefault(row // self.block_rows, []).append(row % self.block_rows)
+        parts = []
+        lookup = {}
+        position = 0
+        for block, positions in by_block.items():
+            unique = sorted(set(positions))
+            parts.append(self.read_block(block, columns, unique))
+            for i in unique:
+                lookup[block * self.block_rows + i] = position
+                position += 1
+        if not parts:
+            return pd.DataFrame(columns=self.columns if columns is None else columns, dtype=object)
+        df = pd.concat(parts, ignore_index=True)
+        # Возвращаем строки в порядке запроса
+        return df.iloc[[lookup[row] for row in row_numbers]].reset_index(drop=True)
+
+    def find_rows(self, column: str, value: str, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Ищет строки, у которых column == value: в каждом блоке дешифруется только столбец
+        column, остальные столбцы дешифруются лишь в блоках с совпадениями.
+        """
+        columns = self.columns if columns is None else columns
+        position = self._column_position(column)
+        parts = []
+        for block in range(len(self._blocks)):
+            values = _unpack_column(self._segment(block, position), self._blocks[block]["rows"])
+            matched = [i for i, cell in enumerate(values) if cell == value]
+            if matched:
+                parts.append(self.read_block(block, columns, matched))
+        if not parts:
+            return pd.DataFrame(columns=columns, dtype=object)
+        return pd.concat(parts, ignore_index=True)
+
+
+def read_table(file_path: str, aes_key: bytes, columns: list[str] | None = None) -> pd.DataFrame:
+    """Читает и дешифрует контейнер v2 целиком (столбцы columns, по умолчанию все)."""
+    with TableReader(file_path, aes_key) as reader:
+        blocks = list(reader.iter_blocks(columns))
+        write_log(f"[table_container] Прочитан контейнер '{file_path}': строк {reader.rows}, "
+                  f"блоков {len(blocks)}.", MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST)
+        if not blocks:
+            return pd.DataFrame(columns=reader.columns if columns is None else columns, dtype=object)
+    return pd.concat(blocks, ignore_index=True)
+
+
+def describe_table(file_path: str, aes_key: bytes) -> dict:
+    """Сведения о контейнере v2 (столбцы, строки, блоки, сжатие) без дешифрования данных."""
+    try:
+        with TableReader(file_path, aes_key) as reader:
+            return {"columns": reader.columns, "rows": reader.rows, "blocks": len(reader._blocks),
+                    "block_rows": reader.block_rows, "compression": reader._compression,
+                    "bytes": os.path.getsize(file_path)}
+    except Exception as e:
+        write_log(f"[table_container] Ошибка чтения оглавления '{file_path}': {e}",
+                  MODULE_LOG_FILE_ALL, MODULE_LOG_FILE_LAST, "error", MODULE_LOG_FILE_ERROR)
+        raise RuntimeError(f"Ошибка чтения оглавления контейнера '{file_path}': {e}") from e
@@ -0,0 +1,45 @@
+"""
+Общая подготовка тестов.
+Модуль settings (настройки рабочего места) в репозитории не хранится: если он не найден,
+для тестов создаётся settings.py во временной папке с путями внутри неё. Папка добавляется
+в sys.path и в PYTHONPATH, чтобы settings находили и дочерние интерпретаторы.
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+try:
+    import settings  # noqa: F401
+except ImportError:
+    _settings_dir = tempfile.mkdtemp(prefix="elorgeds-tests-")
+    _logs_dir = os.path.join(_settings_dir, "logs")
+    _data_dir = os.path.join(_settings_dir, "data")
+    os.makedirs(_logs_dir)
+    os.makedirs(_data_dir)
+    _values = {
+        "SCRIPT_DIR": ROOT_DIR,
+        "DATA_DIR": _data_dir,
+        "LOGS_DIR": _logs_dir,
+        "SHARED_DIR": os.path.join(_data_dir, "shared"),
+        "SHARED_NETWORK_PATH": os.path.join(_settings_dir, "share"),
+        "SERVER_PATH": "//server/share",
+        "CREDENTIALS": os.path.join(_settings_dir, "credentials"),
+        "USER": "user",
+        "NAME_NET_INTERFACE": "eth0",
+        "MASK_NET": "10.",
+        "API_URL": "https://localhost/api",
+        "API_TOKEN": "",
+        "SSL": False,
+        "LOCK_FILE_SILENT": os.path.join(_settings_dir, "silent.lock"),
+    }
+    for _prefix in ("MODULE", "SILENT"):
+        for _kind in ("ALL", "LAST", "ERROR"):
+            _values[f"{_prefix}_LOG_FILE_{_kind}"] = os.path.join(_logs_dir, f"{_prefix.lower()}_{_kind.lower()}.log")
+    with open(os.path.join(_settings_dir, "settings.py"), "w", encoding="utf-8") as _f:
+        _f.writelines(f"{name} = {value!r}\n" for name, value in _values.items())
+    sys.path.insert(0, _settings_dir)
+    os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [_settings_dir, os.environ.get("PYTHONPATH")]))
@@ -0,0 +1,98 @@
+"""Матрица доступа IP x ИНН: разбор CSV, запросы, сравнение снимков и кэш .npz."""
+
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from modules import access_matrix
+from modules.access_matrix import AccessMatrix
+
+INNS = [f"77{j:08d}" for j in range(10)]
+
+
+def _write_csv(path, rows, mtime_ns=None):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("preamble\n")
+        f.write(",".join(["IPaddress"] + INNS) + "\n")
+        for ip, flags in rows:
+            f.write(",".join([ip] + flags) + "\n")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _flags(granted, irregular=False):
+    values = []
+    for j in range(len(INNS)):
+        if irregular:
+            values.append([" true", "False ", "", "YES", "1", "0", "no", "True", "tRuE", "x"][j])
+        else:
+            values.append("True" if j in granted else "False")
+    return values
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = str(tmp_path / "DB_ConnectLEtoARM.csv")
+    _write_csv(path, [("10.0.0.1", _flags({0, 9})), ("10.0.0.2", _flags({9})),
+                      ("10.0.0.3", _flags(set(), irregular=True)), ("10.0.0.4", ["True"])])
+    return path
+
+
+def test_queries(csv_path):
+    matrix = AccessMatrix.from_csv(csv_path)
+
+    assert matrix.shape == (4, 10)
+    assert matrix.row("10.0.0.1").tolist() == [j in {0, 9} for j in range(10)]
+    assert matrix.column(INNS[9]).tolist() == [True, True, False, False]
+    assert matrix.inns_for_ip("10.0.0.1") == [INNS[0], INNS[9]]
+    assert matrix.inns_for_ip("10.0.0.3") == [INNS[0], INNS[3], INNS[4], INNS[7], INNS[8]]
+    # Короткая строка: недостающие ячейки — нет доступа
+    assert matrix.inns_for_ip("10.0.0.4") == [INNS[0]]
+    assert matrix.inns_for_ip("10.9.9.9") == []
+    assert matrix.ips_for_inn(INNS[0]) == ["10.0.0.1", "10.0.0.3", "10.0.0.4"]
+    assert matrix.ips_for_inn("0000000000") == []
+
+
+def test_blocks_match_single_block(csv_path, monkeypatch):
+    expected = AccessMatrix.from_csv(csv_path).bits
+    monkeypatch.setattr(access_matrix, "PARSE_BLOCK_ROWS", 1)
+    assert np.array_equal(AccessMatrix.from_csv(csv_path).bits, expected)
+
+
+def test_diff(tmp_path, csv_path):
+    old_path = str(tmp_path / "old.csv")
+    _write_csv(old_path, [("10.0.0.1", _flags({0, 1})), ("10.0.0.5", _flags({2}))])
+
+    changes = AccessMatrix.from_csv(csv_path).diff(AccessMatrix.from_csv(old_path))
+
+    assert ("10.0.0.1", INNS[9]) in changes["granted"]
+    assert ("10.0.0.1", INNS[0]) not in changes["granted"]
+    assert sorted(changes["revoked"]) == [("10.0.0.1", INNS[1]), ("10.0.0.5", INNS[2])]
+
+
+def test_cache_invalidated_on_csv_change(tmp_path):
+    path = str(tmp_path / "DB_ConnectLEtoARM.csv")
+    _write_csv(path, [("10.0.0.1", _flags({0}))], mtime_ns=1_000_000_000)
+    assert AccessMatrix.load(path).inns_for_ip("10.0.0.1") == [INNS[0]]
+    assert os.path.exists(access_matrix.cache_path(path))
+    # Кэш актуален — повторно CSV не разбирается
+    assert AccessMatrix.load_npz(access_matrix.cache_path(path))[1]["csv_mtime_ns"] == 1_000_000_000
+
+    # Тот же размер, другое время изменения
+    _write_csv(path, [("10.0.0.1", _flags({1}))], mtime_ns=2_000_000_000)
+    assert AccessMatrix.load(path).inns_for_ip("10.0.0.1") == [INNS[1]]
+    # Другой размер
+    _write_csv(path, [("10.0.0.1", _flags({1})), ("10.0.0.2", _flags({2}))], mtime_ns=2_000_000_000)
+    assert AccessMatrix.load(path).ips_for_inn(INNS[2]) == ["10.0.0.2"]
+
+
+def test_cache_reused_when_csv_unchanged(csv_path, monkeypatch):
+    expected = AccessMatrix.load(csv_path).bits
+
+    def fail(*args, **kwargs):
+        raise AssertionError("матрица разобрана заново без изменения CSV")
+
+    monkeypatch.setattr(AccessMatrix, "from_csv", fail)
+    assert np.array_equal(AccessMatrix.load(csv_path).bits, expected)
@@ -0,0 +1,117 @@
+"""Пакеты областей: упаковка и распаковка, откат к копированию по файлам и проверка элементов архива."""
+
+import io
+import os
+import tarfile
+
+import pytest
+
+from modules import area_bundle, server_sync
+
+INN1, INN2 = "7700000001", "7700000002"
+FILES = {
+    f"area1/{INN1}/doc.txt": "документ 1",
+    f"area1/{INN2}/doc.txt": "документ 2",
+    "area1/common/readme.txt": "общее",
+    "area2/x.txt": "x",
+}
+
+
+def _read(root, rel_path):
+    with open(os.path.join(root, rel_path), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def share(tmp_path):
+    root = str(tmp_path / "share")
+    for rel_path, text in FILES.items():
+        path = os.path.join(root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+    return root
+
+
+def _local_files(root):
+    return {os.path.relpath(os.path.join(dir_path, name), root).replace(os.sep, "/")
+            for dir_path, _, names in os.walk(root) for name in names}
+
+
+def test_round_trip(share, tmp_path):
+    assert area_bundle.pack_share(share) == {"area1": True, "area2": True}
+    assert area_bundle.pack_share(share) == {"area1": False, "area2": False}
+    dst = str(tmp_path / "local")
+    os.makedirs(dst)
+
+    include = server_sync.area_filter({"area1"}, [INN1])
+    result = area_bundle.sync_area_bundle(share, "area1", dst, include, include_key=INN1)
+
+    assert result["downloaded"] and result["files"] == 2
+    assert _local_files(dst) == {f"area1/{INN1}/doc.txt", "area1/common/readme.txt",
+                                 f"area1/{area_bundle.STATE_FILE_NAME}"}
+    assert _read(dst, f"area1/{INN1}/doc.txt") == FILES[f"area1/{INN1}/doc.txt"]
+    assert (os.path.getmtime(os.path.join(dst, f"area1/{INN1}/doc.txt"))
+            == pytest.approx(os.path.getmtime(os.path.join(share, f"area1/{INN1}/doc.txt")), abs=1e-3))
+    # Пакет не изменился — скачивание пропускается; изменился фильтр — распаковка заново
+    assert not area_bundle.sync_area_bundle(share, "area1", dst, include, include_key=INN1)["downloaded"]
+    assert area_bundle.sync_area_bundle(share, "area1", dst, None, include_key="")["files"] == 3
+
+
+def test_checksum_mismatch_falls_back_to_files(share, tmp_path):
+    area_bundle.pack_share(share)
+    with open(area_bundle.bundle_path(share, "area1"), "ab") as f:
+        f.write(b"garbage")
+    dst = str(tmp_path / "local")
+    os.makedirs(dst)
+
+    with pytest.raises(ValueError):
+        area_bundle.sync_area_bundle(share, "area1", dst)
+    assert os.listdir(dst) == []
+
+    stats = server_sync.sync_areas(share, dst, {"area1", "area2"}, [INN1, INN2])
+
+    # area1 скопирована по файлам, area2 — из пакета
+    assert stats["copied"] == 3
+    assert {path for path in _local_files(dst) if path.startswith("area")
+            and not path.endswith(area_bundle.STATE_FILE_NAME)} == set(FILES)
+    assert os.path.exists(os.path.join(dst, "area2", area_bundle.STATE_FILE_NAME))
+    assert not os.path.exists(os.path.join(dst, "area1", area_bundle.STATE_FILE_NAME))
+
+
+def _member(name, kind=tarfile.REGTYPE, linkname=""):
+    member = tarfile.TarInfo(name)
+    member.type = kind
+    member.linkname = linkname
+    return member
+
+
+@pytest.mark.parametrize("member, safe", [
+    (_member("inn/doc.txt"), True),
+    (_member("inn", tarfile.DIRTYPE), True),
+    (_member("../outside.txt"), False),
+    (_member("inn/../../outside.txt"), False),
+    (_member("inn\\..\\..\\outside.txt"), False),
+    (_member("/etc/passwd"), False),
+    (_member("\\windows\\file.txt"), False),
+    (_member("link", tarfile.SYMTYPE, "/etc/passwd"), False),
+    (_member("hardlink", tarfile.LNKTYPE, "inn/doc.txt"), False),
+])
+def test_safe_member(member, safe):
+    assert area_bundle._safe_member(member) is safe
+
+
+def test_extract_rejects_unsafe_archive(tmp_path):
+    archive = str(tmp_path / "bad.tar.gz")
+    with tarfile.open(archive, mode="w:gz") as tar:
+        data = b"data"
+        member = tarfile.TarInfo("inn/ok.txt")
+        member.size = len(data)
+        tar.addfile(member, io.BytesIO(data))
+        tar.addfile(_member("inn/link", tarfile.SYMTYPE, "../../outside"))
+    target = str(tmp_path / "target")
+    os.makedirs(target)
+
+    with pytest.raises(ValueError, match="Недопустимый элемент"):
+        area_bundle._extract(archive, target, "area1", None)
+    assert not os.path.lexists(os.path.join(target, "inn", "link"))
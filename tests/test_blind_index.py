@@ -0,0 +1,117 @@
+"""Слепой индекс: использование актуального индекса и полный просмотр при устаревшем или подменённом."""
+
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from modules import blind_index, data_handler
+
+ROWS = 30
+
+
+@pytest.fixture(autouse=True)
+def no_popup(monkeypatch):
+    monkeypatch.setattr(data_handler, "show_popup_notification", lambda *args, **kwargs: None)
+
+
+@pytest.fixture
+def key():
+    return os.urandom(32)
+
+
+@pytest.fixture
+def csv_path(tmp_path, key):
+    df = pd.DataFrame({"IPaddress": [f"10.0.0.{i}" for i in range(ROWS)],
+                       "Name": [f"АРМ {i}" for i in range(ROWS)]})
+    path = str(tmp_path / "DB_InfoARM.csv")
+    data_handler.write_encrypted_csv(df, path, key, index_column="IPaddress", workers=1)
+    return path
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    """Считает полные просмотры файла (поиск без индекса)."""
+    calls = []
+    real_iter = data_handler._iter_csv_chunks
+
+    def counting_iter(*args, **kwargs):
+        calls.append(args[0])
+        return real_iter(*args, **kwargs)
+
+    monkeypatch.setattr(data_handler, "_iter_csv_chunks", counting_iter)
+    return calls
+
+
+def _find(path, key, value="10.0.0.7"):
+    return data_handler.find_encrypted_csv_rows(path, key, "IPaddress", value, chunk_rows=8).to_dict("records")
+
+
+EXPECTED = [{"IPaddress": "10.0.0.7", "Name": "АРМ 7"}]
+
+
+def test_fresh_index_used(csv_path, key, scans):
+    header_offset, offsets = blind_index.lookup_blind_index(csv_path, "IPaddress", "10.0.0.7", key)
+    assert len(offsets) == 1
+    assert blind_index.lookup_blind_index(csv_path, "IPaddress", "10.9.9.9", key)[1] == []
+    assert _find(csv_path, key) == EXPECTED
+    assert scans == []
+
+
+def test_mtime_change_ignores_index(csv_path, key, scans):
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert blind_index.lookup_blind_index(csv_path, "IPaddress", "10.0.0.7", key) is None
+    assert _find(csv_path, key) == EXPECTED
+    assert scans == [csv_path]
+
+
+def test_size_change_ignores_index(csv_path, key, scans):
+    stat = os.stat(csv_path)
+    with open(csv_path, "ab") as f:
+        f.write(b"\n")
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert blind_index.lookup_blind_index(csv_path, "IPaddress", "10.0.0.7", key) is None
+    assert _find(csv_path, key) == EXPECTED
+    assert scans == [csv_path]
+
+
+def test_key_change_ignores_index(csv_path, key):
+    other_key = os.urandom(32)
+    assert blind_index.lookup_blind_index(csv_path, "IPaddress", "10.0.0.7", other_key) is None
+
+
+def test_rewrite_rebuilds_or_removes_index(csv_path, key):
+    df = pd.DataFrame({"IPaddress": ["10.0.0.7", "10.0.0.8"], "Name": ["новый", "другой"]})
+    data_handler.write_encrypted_csv(df, csv_path, key, index_column="IPaddress", workers=1)
+    assert len(blind_index.lookup_blind_index(csv_path, "IPaddress", "10.0.0.7", key)[1]) == 1
+    assert _find(csv_path, key) == [{"IPaddress": "10.0.0.7", "Name": "новый"}]
+
+    data_handler.write_encrypted_csv(df, csv_path, key, workers=1)
+    assert not os.path.exists(blind_index.index_path(csv_path))
+
+
+@pytest.mark.parametrize("tamper", ["offsets", "mac", "no-mac"])
+def test_tampered_index_falls_back_to_scan(csv_path, key, scans, tamper, monkeypatch):
+    path = blind_index.index_path(csv_path)
+    with open(path, encoding="utf-8") as f:
+        body = json.load(f)
+    if tamper == "offsets":
+        # Все значения указывают на одну и ту же строку, подпись прежняя
+        first = next(iter(body["entries"].values()))
+        body["entries"] = {token: first for token in body["entries"]}
+    elif tamper == "mac":
+        body["mac"] = "0" * 64
+    else:
+        del body["mac"]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(body, f)
+
+    assert blind_index.lookup_blind_index(csv_path, "IPaddress", "10.0.0.7", key) is None
+    assert _find(csv_path, key) == EXPECTED
+    assert scans == [csv_path]
+    monkeypatch.setattr(data_handler, "CSV_BACKEND", "csv")
+    assert data_handler.find_encrypted_csv_records(csv_path, key, "IPaddress", "10.0.0.7") == EXPECTED
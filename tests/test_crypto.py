@@ -0,0 +1,98 @@
+"""
+Проверка кодека AES-256-CBC на известных ответах: формат Base64(IV + Ciphertext) с PKCS7,
+как у PowerShell func_EncryptText_NEW/func_DecryptText_NEW.
+"""
+
+import binascii
+
+import pytest
+
+from modules import crypto
+
+# NIST SP 800-38A, F.2.5 (CBC-AES256.Encrypt)
+NIST_KEY = bytes.fromhex("603deb1015ca71be2b73aef0857d77811f352c073b6108d72d9810a30914dff4")
+NIST_IV = bytes.fromhex("000102030405060708090a0b0c0d0e0f")
+NIST_PLAINTEXT = bytes.fromhex(
+    "6bc1bee22e409f96e93d7e117393172a" "ae2d8a571e03ac9c9eb76fac45af8e51"
+    "30c81c46a35ce411e5fbc1191a0a52ef" "f69f2445df4f9b17ad2b417be66c3710")
+NIST_CIPHERTEXT = bytes.fromhex(
+    "f58c4c04d6e5f1ba779eabfb5f7bfbd6" "9cfc4e967edb808d679f777bc6702c7d"
+    "39f23369a9d9bacfa530e26304231461" "b2eb05e2c39be9fcda6c19078c6a9d1b")
+
+# Значения в формате PowerShell: ключ bytes(range(32)), IV bytes(range(16, 32))
+FORMAT_KEY = bytes(range(32))
+FORMAT_IV = bytes(range(16, 32))
+FORMAT_VALUES = {
+    "Тест 192.168.0.1": "EBESExQVFhcYGRobHB0eH7KhTGogQ+eqnZ4aOiHbpi4kQVHGD/Ub8bQzymQ+C0t9",
+    "7700000000": "EBESExQVFhcYGRobHB0eH2jL0M3iFGw9fGjBLcK40SQ=",
+    "": "EBESExQVFhcYGRobHB0eH1puBFcI+3GW8C5VPQLDppI=",
+}
+
+
+@pytest.fixture
+def fixed_iv(monkeypatch):
+    """Подменяет случайный IV кодека фиксированным (для каждого значения)."""
+    def use(iv: bytes):
+        monkeypatch.setattr(crypto.os, "urandom", lambda n: iv * (n // len(iv)))
+    return use
+
+
+def test_nist_vector(fixed_iv):
+    fixed_iv(NIST_IV)
+    codec = crypto.AesCbcCodec(NIST_KEY)
+    encrypted = bytes(codec.encrypt_bytes(NIST_PLAINTEXT))
+    # После шифротекста NIST идёт блок PKCS7 padding
+    assert encrypted[:16 + len(NIST_CIPHERTEXT)] == NIST_IV + NIST_CIPHERTEXT
+    assert len(encrypted) == 16 + len(NIST_CIPHERTEXT) + 16
+    assert bytes(codec.decrypt_bytes(encrypted)) == NIST_PLAINTEXT
+
+
+@pytest.mark.parametrize("plaintext, encrypted_b64", FORMAT_VALUES.items())
+def test_format_values(fixed_iv, plaintext, encrypted_b64):
+    fixed_iv(FORMAT_IV)
+    codec = crypto.AesCbcCodec(FORMAT_KEY)
+    assert codec.encrypt_text(plaintext) == encrypted_b64
+    assert codec.encrypt_many([plaintext]) == [encrypted_b64]
+    assert codec.decrypt_text(encrypted_b64) == plaintext
+    assert codec.decrypt_many([encrypted_b64]) == [plaintext]
+
+
+def test_many_matches_single_values(fixed_iv):
+    fixed_iv(FORMAT_IV)
+    codec = crypto.AesCbcCodec(FORMAT_KEY)
+    plaintexts = list(FORMAT_VALUES)
+    assert codec.encrypt_many(plaintexts) == [codec.encrypt_text(value) for value in plaintexts]
+    assert codec.decrypt_many(list(FORMAT_VALUES.values())) == plaintexts
+
+
+def test_rejects_bad_padding():
+    codec = crypto.AesCbcCodec(FORMAT_KEY)
+    other = crypto.AesCbcCodec(bytes(32))
+    with pytest.raises(ValueError):
+        other.decrypt_many([codec.encrypt_text("7700000000")])
+
+
+@pytest.mark.parametrize("size", [0, 15, 16, 100, crypto.ZERO_COPY_MIN_BYTES + 5, 3 * 2 ** 20 + 7])
+def test_bytes_api_interoperates_with_text_functions(size):
+    key = bytes(range(32))
+    plaintext = ("Тест-" * (size // 8 + 1)).encode("utf-8")[:size].decode("utf-8", "ignore")
+    data = plaintext.encode("utf-8")
+
+    # encrypt_bytes -> func_DecryptText_NEW
+    encrypted = crypto.get_codec(key).encrypt_bytes(data)
+    assert crypto.func_DecryptText_NEW(binascii.b2a_base64(encrypted, newline=False).decode("ascii"), key) == plaintext
+
+    # func_EncryptText_NEW -> decrypt_into (буфер с запасом) и decrypt_bytes
+    raw = binascii.a2b_base64(crypto.func_EncryptText_NEW(plaintext, key))
+    out = bytearray(len(raw) + 64)
+    written = crypto.get_codec(key).decrypt_into(memoryview(raw), out)
+    assert bytes(out[:written]) == data
+    assert bytes(crypto.get_codec(key).decrypt_bytes(raw)) == data
+
+
+def test_bytes_api_matches_text_format(fixed_iv):
+    fixed_iv(FORMAT_IV)
+    codec = crypto.AesCbcCodec(FORMAT_KEY)
+    for plaintext, encrypted_b64 in FORMAT_VALUES.items():
+        assert binascii.b2a_base64(codec.encrypt_bytes(plaintext.encode("utf-8")), newline=False).decode() == encrypted_b64
+    assert crypto.func_EncryptText_NEW("7700000000", FORMAT_KEY) == FORMAT_VALUES["7700000000"]
@@ -0,0 +1,84 @@
+"""Бэкенды чтения записями (CSV_BACKEND = 'pandas' и 'csv') дают одинаковый результат."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from modules import blind_index, data_handler, server_sync
+
+BACKENDS = ("pandas", "csv")
+
+
+@pytest.fixture(autouse=True)
+def no_popup(monkeypatch):
+    monkeypatch.setattr(data_handler, "show_popup_notification", lambda *args, **kwargs: None)
+
+
+@pytest.fixture
+def key():
+    return os.urandom(32)
+
+
+@pytest.fixture(params=[True, False], ids=["with-idx", "without-idx"])
+def encrypted_path(request, tmp_path, key):
+    df = pd.DataFrame({
+        "IPaddress": [f"10.0.0.{i % 7}" for i in range(40)],
+        "Name": [f"АРМ, №{i}" if i % 5 else "" for i in range(40)],
+        "Comment": ["" if i % 3 else f'"{i}"' for i in range(40)],
+    })
+    path = str(tmp_path / "DB_InfoARM.csv")
+    data_handler.write_encrypted_csv(df, path, key, index_column="IPaddress" if request.param else None, workers=1)
+    assert os.path.exists(blind_index.index_path(path)) == request.param
+    return path
+
+
+def _by_backend(monkeypatch, func):
+    results = {}
+    for backend in BACKENDS:
+        monkeypatch.setattr(data_handler, "CSV_BACKEND", backend)
+        results[backend] = func()
+    return results
+
+
+def test_read_records(encrypted_path, key, monkeypatch):
+    results = _by_backend(monkeypatch, lambda: data_handler.read_encrypted_records(encrypted_path, key))
+    assert len(results["csv"]) == 40
+    assert results["pandas"] == results["csv"]
+
+    results = _by_backend(monkeypatch, lambda: data_handler.read_encrypted_records(encrypted_path, key, ["Name"]))
+    assert results["pandas"] == results["csv"]
+
+
+@pytest.mark.parametrize("value, columns", [("10.0.0.3", None), ("10.0.0.0", ["Comment"]), ("10.9.9.9", None)])
+def test_find_records(encrypted_path, key, monkeypatch, value, columns):
+    results = _by_backend(monkeypatch, lambda: data_handler.find_encrypted_csv_records(
+        encrypted_path, key, "IPaddress", value, chunk_rows=8, columns=columns))
+    assert results["pandas"] == results["csv"]
+    assert all(record["IPaddress"] == value for record in results["csv"])
+    assert bool(results["csv"]) == (value != "10.9.9.9")
+
+
+def test_wrong_key_fails_in_both_backends(encrypted_path, monkeypatch):
+    wrong_key = os.urandom(32)
+    for backend in BACKENDS:
+        monkeypatch.setattr(data_handler, "CSV_BACKEND", backend)
+        with pytest.raises(SystemExit):
+            data_handler.read_encrypted_records(encrypted_path, wrong_key)
+        with pytest.raises(SystemExit):
+            data_handler.find_encrypted_csv_records(encrypted_path, wrong_key, "IPaddress", "10.0.0.3")
+
+
+def test_load_inn_access(tmp_path, monkeypatch):
+    path = str(tmp_path / "DB_ConnectLEtoARM.csv")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(data_handler.CSV_PREAMBLE + "\n")
+        f.write("IPaddress,7700000001,7700000002,7700000003\n")
+        f.write("10.0.0.1,True,False, true\n")
+        f.write("10.0.0.2,False,,1\n")
+        f.write("10.0.0.3,False,False\n")
+
+    for ip, expected in (("10.0.0.1", ["7700000001", "7700000003"]), ("10.0.0.2", ["7700000003"]),
+                         ("10.0.0.3", []), ("10.0.0.9", None)):
+        results = _by_backend(monkeypatch, lambda: server_sync.load_inn_access(path, ip))
+        assert results == {"pandas": expected, "csv": expected}
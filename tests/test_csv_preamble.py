@@ -0,0 +1,104 @@
+"""Служебная первая строка зашифрованного CSV и ранний выход потокового чтения."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from modules import data_handler, table_container
+
+ROWS = 60
+
+
+@pytest.fixture(autouse=True)
+def no_popup(monkeypatch):
+    monkeypatch.setattr(data_handler, "show_popup_notification", lambda *args, **kwargs: None)
+
+
+@pytest.fixture
+def key():
+    return os.urandom(32)
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"IPaddress": [f"10.0.0.{i}" for i in range(ROWS)],
+                         "Name": [f"АРМ {i}" for i in range(ROWS)]})
+
+
+def _first_line(path):
+    with open(path, "rb") as f:
+        return f.readline()
+
+
+def test_new_file_gets_default_preamble(tmp_path, key, df):
+    path = str(tmp_path / "DB_InfoARM.csv")
+    data_handler.write_encrypted_csv(df, path, key, workers=1)
+    assert _first_line(path) == (data_handler.CSV_PREAMBLE + "\n").encode()
+
+
+@pytest.mark.parametrize("existing, expected", [
+    (b"#TYPE Selected.System.Management.Automation.PSCustomObject\r\n",
+     b"#TYPE Selected.System.Management.Automation.PSCustomObject\n"),
+    (b"\xef\xbb\xbf#TYPE System.Object\n", b"#TYPE System.Object\n"),
+    (b"IPaddress,Name\n", (data_handler.CSV_PREAMBLE + "\n").encode()),
+    (table_container.MAGIC, (data_handler.CSV_PREAMBLE + "\n").encode()),
+])
+def test_rewrite_keeps_existing_preamble(tmp_path, key, df, existing, expected):
+    path = str(tmp_path / "DB_InfoARM.csv")
+    with open(path, "wb") as f:
+        f.write(existing + b"rest\n")
+
+    data_handler.write_encrypted_csv(df, path, key, workers=1)
+
+    assert _first_line(path) == expected
+    assert data_handler.read_encrypted_csv(path, key, workers=1)["IPaddress"].tolist() == df["IPaddress"].tolist()
+
+
+@pytest.fixture
+def encrypted_path(tmp_path, key, df):
+    path = str(tmp_path / "DB_InfoARM.csv")
+    data_handler.write_encrypted_csv(df, path, key, workers=1)
+    return path
+
+
+@pytest.fixture
+def decrypted_chunks(monkeypatch):
+    """Считает порции, прошедшие дешифрование."""
+    sizes = []
+    real_decrypt = data_handler.decrypt_dataframe
+
+    def counting_decrypt(df_chunk, *args, **kwargs):
+        sizes.append(len(df_chunk))
+        return real_decrypt(df_chunk, *args, **kwargs)
+
+    monkeypatch.setattr(data_handler, "decrypt_dataframe", counting_decrypt)
+    return sizes
+
+
+def test_iter_matches_full_read_and_stops_early(encrypted_path, key, decrypted_chunks):
+    full = data_handler.read_encrypted_csv(encrypted_path, key, workers=1)
+    decrypted_chunks.clear()
+
+    chunks = list(data_handler.iter_encrypted_csv(encrypted_path, key, chunk_rows=16))
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), full)
+    assert [len(chunk) for chunk in chunks] == [16, 16, 16, 12]
+
+    decrypted_chunks.clear()
+    iterator = data_handler.iter_encrypted_csv(encrypted_path, key, chunk_rows=16)
+    first = next(iterator)
+    iterator.close()
+    pd.testing.assert_frame_equal(first, full.iloc[:16])
+    assert decrypted_chunks == [16]
+
+
+def test_find_matches_full_read_and_stops_early(encrypted_path, key, decrypted_chunks):
+    full = data_handler.read_encrypted_csv(encrypted_path, key, workers=1)
+    decrypted_chunks.clear()
+
+    found = data_handler.find_encrypted_csv_rows(encrypted_path, key, "IPaddress", "10.0.0.20", chunk_rows=16)
+
+    pd.testing.assert_frame_equal(found, full[full["IPaddress"] == "10.0.0.20"].reset_index(drop=True))
+    # Порции 0 и 1 (столбец поиска), затем только найденная строка (остальные столбцы)
+    assert decrypted_chunks == [16, 16, 1]
+    assert data_handler.find_encrypted_csv_rows(encrypted_path, key, "IPaddress", "10.9.9.9", chunk_rows=16).empty
@@ -0,0 +1,50 @@
+"""Пиковая память постолбцового дешифрования DataFrame (decrypt_dataframe), по данным tracemalloc."""
+
+import os
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+from modules import crypto, data_handler
+
+ROWS = 5_000
+COLUMNS = 20
+# Допустимый пиковый прирост памяти относительно размера расшифрованной таблицы
+PEAK_TO_RESULT_MAX = 1.6
+
+
+def _peak(func):
+    tracemalloc.start()
+    try:
+        result = func()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.fixture
+def encrypted_table(monkeypatch):
+    # Кэш дешифрования хранит расшифрованные значения и исказил бы замер самой функции
+    monkeypatch.setattr(crypto.decrypt_cache, "max_items", 0)
+    key = os.urandom(32)
+    df = pd.DataFrame([{f"Col{j}": f"value-{i}-{j}" for j in range(COLUMNS)} for i in range(ROWS)])
+    return data_handler.encrypt_dataframe(df, key), key
+
+
+def test_decrypt_dataframe_peak_memory(encrypted_table):
+    df_encrypted, key = encrypted_table
+    df_input = df_encrypted.copy()
+    df_decrypted, peak = _peak(lambda: data_handler.decrypt_dataframe(df_input, key, workers=1))
+    result_bytes = df_decrypted.memory_usage(deep=True).sum()
+    assert peak <= PEAK_TO_RESULT_MAX * result_bytes, (
+        f"Пиковый прирост памяти {peak / 2 ** 20:.1f} МиБ превышает "
+        f"{PEAK_TO_RESULT_MAX} x размер результата ({result_bytes / 2 ** 20:.1f} МиБ)")
+
+
+def test_decrypt_dataframe_below_records_path(encrypted_table):
+    df_encrypted, key = encrypted_table
+    _, records_peak = _peak(lambda: pd.DataFrame(crypto.func_DecryptArray_NEW(df_encrypted.to_dict('records'), key)))
+    df_input = df_encrypted.copy()
+    _, columns_peak = _peak(lambda: data_handler.decrypt_dataframe(df_input, key, workers=1))
+    assert columns_peak < records_peak
@@ -0,0 +1,74 @@
+"""Кэш дешифрования: вытеснение по размеру, смена ключа и отсутствие учётных данных в кэше."""
+
+import os
+
+import pytest
+
+from modules import cba_handler, crypto
+
+
+@pytest.fixture
+def key():
+    return os.urandom(32)
+
+
+@pytest.fixture
+def cache():
+    return crypto.DecryptCache(max_items=4)
+
+
+def _encrypt(values, key):
+    return crypto.get_codec(key).encrypt_many(values)
+
+
+def test_evicts_least_recently_used(cache, key):
+    encrypted = _encrypt([f"value-{i}" for i in range(6)], key)
+
+    assert cache.decrypt_many(encrypted[:4], key) == [f"value-{i}" for i in range(4)]
+    # value-0 использовано снова и становится самым свежим
+    cache.decrypt_many(encrypted[:1], key)
+    cache.decrypt_many(encrypted[4:6], key)
+
+    assert len(cache) == 4
+    assert list(cache._entries) == [encrypted[3], encrypted[0], encrypted[4], encrypted[5]]
+    assert cache.stats() == {"hits": 1, "misses": 6, "size": 4, "max_items": 4}
+    # Вытесненное значение дешифруется заново (промах), результат прежний
+    assert cache.decrypt_many([encrypted[1]], key) == ["value-1"]
+    assert cache.misses == 7
+
+
+def test_entries_keyed_by_ciphertext_only(cache, key):
+    encrypted = _encrypt(["a", "b"], key)
+    cache.decrypt_many(encrypted, key)
+    assert cache.decrypt_many(encrypted, key) == ["a", "b"]
+
+    assert list(cache._entries.items()) == [(encrypted[0], "a"), (encrypted[1], "b")]
+    assert cache.stats()["hits"] == 2
+
+
+def test_key_change_clears_cache(cache, key):
+    other_key = os.urandom(32)
+    cache.decrypt_many(_encrypt(["a"], key), key)
+
+    assert cache.decrypt_many(_encrypt(["b"], other_key), other_key) == ["b"]
+    assert list(cache._entries.values()) == ["b"]
+
+
+def test_disabled_cache(key):
+    cache = crypto.DecryptCache(max_items=0)
+    assert cache.decrypt_many(_encrypt(["a"], key), key) == ["a"]
+    assert len(cache) == 0
+
+
+def test_credentials_never_cached(tmp_path, key, monkeypatch):
+    monkeypatch.setattr(crypto, "decrypt_cache", crypto.DecryptCache())
+    path = str(tmp_path / "user.cba")
+    password = "Секретный пароль 123"
+    cba_handler.write_encrypted_cba(password, path, key)
+
+    assert cba_handler.read_encrypted_cba(path, key) == password
+    assert crypto.decrypt_values(_encrypt(["ячейка"], key), key) == ["ячейка"]
+
+    assert password not in crypto.decrypt_cache._entries.values()
+    assert list(crypto.decrypt_cache._entries.values()) == ["ячейка"]
+    assert crypto.decrypt_cache.stats()["misses"] == 1
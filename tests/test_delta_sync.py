@@ -0,0 +1,89 @@
+"""Поблочная дельта-передача: чтение только изменённых блоков и откат к полному копированию."""
+
+import os
+
+import pytest
+
+from modules import delta_sync
+
+BLOCK = 1024
+BLOCKS = 8
+
+
+def _write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.fixture
+def files(tmp_path):
+    old = os.urandom(BLOCK * BLOCKS - 100)
+    src, dst = str(tmp_path / "src.bin"), str(tmp_path / "dst.bin")
+    _write(dst, old)
+    return src, dst, old
+
+
+def _publish(src, data):
+    _write(src, data)
+    delta_sync.write_sidecar(src, block_bytes=BLOCK)
+    stat = os.stat(src)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def test_only_changed_block_transferred(files):
+    src, dst, old = files
+    new = bytearray(old)
+    new[3 * BLOCK + 10:3 * BLOCK + 20] = os.urandom(10)
+    size, mtime_ns = _publish(src, bytes(new))
+
+    assert delta_sync.delta_copy(src, dst, size, mtime_ns) == BLOCK
+    assert _read(dst) == bytes(new)
+    assert os.stat(dst).st_mtime_ns == mtime_ns
+    # Повтор: все блоки совпадают
+    assert delta_sync.delta_copy(src, dst, size, mtime_ns) == 0
+
+
+# Читаются только блоки, хеш которых изменился: последний блок старой версии и новые
+# (при росте) или укороченный последний блок (при уменьшении)
+@pytest.mark.parametrize("new_size, expected", [(BLOCK * BLOCKS + 500, BLOCK + 500), (BLOCK * 2 + 7, 7)])
+def test_resized_file(files, new_size, expected):
+    src, dst, old = files
+    new = (old + os.urandom(BLOCK * 2))[:new_size]
+    size, mtime_ns = _publish(src, new)
+
+    transferred = delta_sync.delta_copy(src, dst, size, mtime_ns)
+
+    assert _read(dst) == new
+    assert transferred == expected
+
+
+def test_mismatched_sidecar_falls_back(files):
+    src, dst, old = files
+    size, mtime_ns = _publish(src, old[::-1])
+
+    assert delta_sync.delta_copy(src, dst, size + 1, mtime_ns) is None
+    assert delta_sync.delta_copy(src, dst, size, mtime_ns + 1) is None
+    with open(delta_sync.sidecar_path(src), "w", encoding="utf-8") as f:
+        f.write('{"version": 1, "hashes": "broken"}')
+    assert delta_sync.delta_copy(src, dst, size, mtime_ns) is None
+    os.remove(delta_sync.sidecar_path(src))
+    assert delta_sync.delta_copy(src, dst, size, mtime_ns) is None
+    assert _read(dst) == old
+
+
+def test_source_changed_during_transfer(files):
+    src, dst, old = files
+    size, mtime_ns = _publish(src, old[::-1])
+    # Содержимое изменилось после публикации файла-спутника (размер и время прежние)
+    _write(src, os.urandom(size))
+    os.utime(src, ns=(mtime_ns, mtime_ns))
+
+    with pytest.raises(ValueError):
+        delta_sync.delta_copy(src, dst, size, mtime_ns)
+    assert _read(dst) == old
+    assert not os.path.exists(dst + delta_sync.TMP_SUFFIX)
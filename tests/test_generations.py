@@ -0,0 +1,99 @@
+"""Поколения локальной копии: жёсткие ссылки, хранение, откат и незавершённые поколения."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from modules import generations
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _sync(shared_dir, files):
+    staging = generations.stage_generation(shared_dir)
+    for rel_path, text in files.items():
+        _write(os.path.join(staging, rel_path), text)
+    return generations.commit_generation(shared_dir, staging)
+
+
+@pytest.fixture
+def shared_dir(tmp_path):
+    return str(tmp_path / "shared")
+
+
+def test_unchanged_files_are_hardlinked(shared_dir):
+    first = _sync(shared_dir, {"a.csv": "1", "sub/b.csv": "2"})
+    second = _sync(shared_dir, {"a.csv": "changed"})
+
+    assert os.stat(os.path.join(first, "sub", "b.csv")).st_ino == os.stat(os.path.join(second, "sub", "b.csv")).st_ino
+    assert _read(os.path.join(first, "a.csv")) == "1"
+    assert _read(os.path.join(shared_dir, "a.csv")) == "changed"
+    assert generations.current_generation(shared_dir) == second
+
+
+def test_keep_prunes_old_generations(shared_dir):
+    committed = [_sync(shared_dir, {"a.csv": str(number)}) for number in range(5)]
+
+    assert generations.list_generations(shared_dir) == committed[:-4:-1]
+    assert _read(os.path.join(shared_dir, "a.csv")) == "4"
+
+
+def test_rollback(shared_dir):
+    committed = [_sync(shared_dir, {"a.csv": str(number)}) for number in range(3)]
+
+    assert generations.rollback(shared_dir) == committed[1]
+    assert _read(os.path.join(shared_dir, "a.csv")) == "1"
+    assert generations.rollback(shared_dir) == committed[0]
+    with pytest.raises(RuntimeError):
+        generations.rollback(shared_dir)
+
+
+def test_discard_after_failed_sync_keeps_current(shared_dir):
+    current = _sync(shared_dir, {"a.csv": "good"})
+    staging = generations.stage_generation(shared_dir)
+    _write(os.path.join(staging, "a.csv"), "partial")
+
+    generations.discard_generation(staging)
+
+    assert not os.path.exists(staging)
+    assert generations.current_generation(shared_dir) == current
+    assert _read(os.path.join(shared_dir, "a.csv")) == "good"
+    assert generations.list_generations(shared_dir) == [current]
+
+
+def test_concurrent_staging_is_kept(shared_dir):
+    _sync(shared_dir, {"a.csv": "1"})
+    root = generations.generations_root(shared_dir)
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    live = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        abandoned = os.path.join(root, f"gen-20000101-000000-000000-p{dead.pid}{generations.STAGING_SUFFIX}")
+        running = os.path.join(root, f"gen-20000101-000000-000001-p{live.pid}{generations.STAGING_SUFFIX}")
+        legacy = os.path.join(root, f"gen-20000101-000000-000002{generations.STAGING_SUFFIX}")
+        for path in (abandoned, running, legacy):
+            os.makedirs(path)
+
+        staging = generations.stage_generation(shared_dir)
+
+        assert os.path.isdir(running)
+        assert not os.path.exists(abandoned)
+        assert not os.path.exists(legacy)
+        generations.commit_generation(shared_dir, staging)
+        assert os.path.isdir(running)
+    finally:
+        live.kill()
+        live.wait()
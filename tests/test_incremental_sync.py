@@ -0,0 +1,94 @@
+"""Инкрементальная синхронизация дерева: пропуск неизменённых файлов, удаления и ошибки."""
+
+import json
+import os
+
+import pytest
+
+from modules import incremental_sync
+
+
+def _write(root, rel_path, text):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _read(root, rel_path):
+    with open(os.path.join(root, rel_path), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def trees(tmp_path):
+    src, dst = str(tmp_path / "src"), str(tmp_path / "dst")
+    for rel_path in ("a.txt", "area1/7700000001/doc.txt", "area1/7700000002/doc.txt", "area2/x.txt"):
+        _write(src, rel_path, rel_path)
+    return src, dst
+
+
+def test_unchanged_files_skipped(trees):
+    src, dst = trees
+    first = incremental_sync.sync_tree(src, dst, workers=2)
+    assert (first["copied"], first["skipped"]) == (4, 0)
+
+    second = incremental_sync.sync_tree(src, dst, workers=2)
+    assert (second["copied"], second["skipped"], second["deleted"]) == (0, 4, 0)
+
+    _write(src, "area2/x.txt", "changed content")
+    third = incremental_sync.sync_tree(src, dst, workers=2)
+    assert (third["copied"], third["skipped"]) == (1, 3)
+    assert _read(dst, "area2/x.txt") == "changed content"
+
+    # Без манифеста (incremental=False) копируется всё
+    assert incremental_sync.sync_tree(src, dst, incremental=False)["copied"] == 4
+
+
+def test_deletions_limited_to_scope(trees):
+    src, dst = trees
+    incremental_sync.sync_tree(src, dst)
+    os.remove(os.path.join(src, "a.txt"))
+    os.remove(os.path.join(src, "area2/x.txt"))
+
+    def area1(rel_path, is_dir):
+        return rel_path.split("/")[0] == "area1"
+
+    def without_inn2(rel_path, is_dir):
+        return area1(rel_path, is_dir) and "7700000002" not in rel_path
+
+    stats = incremental_sync.sync_tree(src, dst, include=without_inn2, scope=area1)
+
+    # Внутри scope: не отобранное include удалено
+    assert not os.path.exists(os.path.join(dst, "area1/7700000002"))
+    assert os.path.exists(os.path.join(dst, "area1/7700000001/doc.txt"))
+    # Вне scope: исчезнувшие в источнике файлы не тронуты, записи манифеста сохранены
+    assert os.path.exists(os.path.join(dst, "a.txt"))
+    assert os.path.exists(os.path.join(dst, "area2/x.txt"))
+    assert stats["deleted"] == 1
+    manifest = incremental_sync.load_manifest(incremental_sync.manifest_path(dst))
+    assert {"a.txt", "area2/x.txt", "area1/7700000001/doc.txt"} <= set(manifest)
+    assert "area1/7700000002/doc.txt" not in manifest
+
+
+def test_errors_aggregated(trees, monkeypatch):
+    src, dst = trees
+    real_copy = incremental_sync.copy_file
+
+    def failing_copy(src_path, dst_path, use_hash=False):
+        if "area1" in src_path:
+            raise OSError(f"нет доступа: {src_path}")
+        return real_copy(src_path, dst_path, use_hash)
+
+    monkeypatch.setattr(incremental_sync, "copy_file", failing_copy)
+    with pytest.raises(RuntimeError, match="Не скопировано файлов: 2 из 4") as excinfo:
+        incremental_sync.sync_tree(src, dst, workers=4)
+    assert "7700000001" in str(excinfo.value) and "7700000002" in str(excinfo.value)
+
+    # Удачно скопированные файлы записаны в манифест и повторно не копируются
+    with open(incremental_sync.manifest_path(dst), encoding="utf-8") as f:
+        assert set(json.load(f)["files"]) == {"a.txt", "area2/x.txt"}
+    assert not any(name.endswith(incremental_sync.TMP_SUFFIX) for name in os.listdir(dst))
+    monkeypatch.setattr(incremental_sync, "copy_file", real_copy)
+    stats = incremental_sync.sync_tree(src, dst)
+    assert (stats["copied"], stats["skipped"]) == (2, 2)
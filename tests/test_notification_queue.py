@@ -0,0 +1,112 @@
+"""Очередь уведомлений: предел показанных окон, продвижение очереди и объединение повторов."""
+
+from modules.notifier import NotificationQueue
+
+
+class FakeWindow:
+    def __init__(self, title, message, urgency, timeout_ms, quit_on_close=True, stack_offset=0):
+        self.message = message
+        self.stack_offset = stack_offset
+        self.repeat_count = 1
+        self.visible = False
+
+    def show(self):
+        self.visible = True
+
+    def close(self):
+        self.visible = False
+
+    def isVisible(self):
+        return self.visible
+
+    def height(self):
+        return 100
+
+    def set_stack_offset(self, offset):
+        self.stack_offset = offset
+
+    def set_repeat_count(self, count):
+        self.repeat_count = count
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _item(message, urgency="normal"):
+    return {"title": "Заголовок", "message": message, "urgency": urgency, "timeout_ms": 10000}
+
+
+def _queue(clock, max_visible=2):
+    return NotificationQueue(max_visible=max_visible, coalesce_sec=60, factory=FakeWindow, clock=clock)
+
+
+def _messages(entries):
+    return [entry["window"].message if "window" in entry else entry["item"]["message"] for entry in entries]
+
+
+def test_cap_and_promotion():
+    clock = FakeClock()
+    notifications = _queue(clock)
+    for message in ("a", "b", "c"):
+        notifications.submit(_item(message))
+    notifications.update()
+    assert _messages(notifications.visible) == ["a", "b"]
+    assert _messages(notifications.pending) == ["c"]
+    assert [entry["window"].stack_offset for entry in notifications.visible] == [0, 110]
+
+    notifications.visible[0]["window"].close()
+    notifications.update()
+    assert _messages(notifications.visible) == ["b", "c"]
+    assert not notifications.pending
+    # Окно 'b' опустилось на место закрытого, 'c' встало над ним
+    assert [entry["window"].stack_offset for entry in notifications.visible] == [0, 110]
+
+
+def test_coalesce_visible_inside_and_outside_window():
+    clock = FakeClock()
+    notifications = _queue(clock)
+    notifications.submit(_item("a"))
+    notifications.update()
+    clock.now += 30
+    notifications.submit(_item("a"))
+    assert notifications.visible[0]["count"] == 2
+    assert notifications.visible[0]["window"].repeat_count == 2
+    assert not notifications.pending
+
+    clock.now += 31
+    notifications.submit(_item("a"))
+    assert notifications.visible[0]["count"] == 2
+    assert _messages(notifications.pending) == ["a"]
+
+
+def test_coalesce_pending_inside_and_outside_window():
+    clock = FakeClock()
+    notifications = _queue(clock, max_visible=1)
+    notifications.submit(_item("busy"))
+    notifications.update()
+    notifications.submit(_item("a"))
+    clock.now += 59
+    notifications.submit(_item("a"))
+    assert [entry["count"] for entry in notifications.pending] == [2]
+
+    clock.now += 2
+    notifications.submit(_item("a"))
+    assert [entry["count"] for entry in notifications.pending] == [2, 1]
+
+    notifications.visible[0]["window"].close()
+    notifications.update()
+    assert notifications.visible[0]["window"].repeat_count == 2
+
+
+def test_different_urgency_is_not_coalesced():
+    clock = FakeClock()
+    notifications = _queue(clock)
+    notifications.submit(_item("a"))
+    notifications.submit(_item("a", "critical"))
+    notifications.update()
+    assert len(notifications.visible) == 2
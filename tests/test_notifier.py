@@ -0,0 +1,45 @@
+"""Процесс-уведомитель без Qt: сообщения показываются через notify-send."""
+
+import io
+import json
+import sys
+
+from modules import notifier
+
+
+def test_run_notifier_without_qt_uses_notify_send(monkeypatch):
+    for name in ("PyQt6", "PyQt6.QtCore", "PyQt6.QtGui", "PyQt6.QtWidgets"):
+        monkeypatch.setitem(sys.modules, name, None)
+    monkeypatch.delitem(sys.modules, "modules.notification_window", raising=False)
+    sent = []
+    monkeypatch.setattr(notifier, "_notify_send", lambda *args: sent.append(args))
+    items = [{"title": "Ошибка", "message": "Нет доступа", "urgency": "critical", "timeout_ms": 0},
+             {"title": "Синхронизация", "message": "Готово", "urgency": "normal", "timeout_ms": 5000}]
+    stream = io.BytesIO(b"".join((json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8") for item in items)
+                        + b"not json\n")
+
+    notifier.run_notifier(stream)
+
+    assert sent == [("Ошибка", "Нет доступа", "critical", 0), ("Синхронизация", "Готово", "normal", 5000)]
+
+
+def test_crashed_notifier_messages_are_redelivered(monkeypatch):
+    from modules import notifications
+
+    real_popen = notifications.subprocess.Popen
+    # Уведомитель, падающий до чтения канала (как при ошибке импорта)
+    monkeypatch.setattr(notifications.subprocess, "Popen",
+                        lambda args, **kwargs: real_popen([sys.executable, "-c", "import sys; sys.exit(3)"], **kwargs))
+    monkeypatch.setattr(notifications, "_notifier", None)
+    monkeypatch.setattr(notifications, "_notifier_sent", [])
+    sent = []
+    monkeypatch.setattr(notifications, "_notify_send", lambda *args: sent.append(args))
+
+    notifications.show_popup_notification("Ошибка", "Первое", "critical", 0)
+    notifications._notifier.wait()
+    notifications.show_popup_notification("Ошибка", "Второе", "critical", 0)
+    notifications._notifier.wait()
+    notifications._check_notifier()
+
+    assert [args[1] for args in sent] == ["Первое", "Второе"]
+    assert notifications._notifier is None
@@ -0,0 +1,63 @@
+"""Индекс смещений строк открытого CSV: поиск, ключи в кавычках и пересборка при изменении файла."""
+
+import json
+import os
+
+from modules import row_index
+
+HEADER = "IPaddress,1001,1002\n"
+
+
+def _write_csv(path, rows, mtime_ns=None):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("preamble\n" + HEADER + "".join(rows))
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_find_records_and_key_stripping(tmp_path):
+    path = str(tmp_path / "DB_ConnectLEtoARM.csv")
+    _write_csv(path, ["10.0.0.1 ,1,\n", '" 10.0.0.2",,1\n', "10.0.0.1,,1\n"])
+
+    assert row_index.find_records(path, "IPaddress", "10.0.0.1") == [
+        {"IPaddress": "10.0.0.1 ", "1001": "1", "1002": None},
+        {"IPaddress": "10.0.0.1", "1001": None, "1002": "1"},
+    ]
+    assert row_index.find_records(path, "IPaddress", "10.0.0.2") == [
+        {"IPaddress": " 10.0.0.2", "1001": None, "1002": "1"}]
+    assert row_index.find_records(path, "IPaddress", "10.0.0.9") == []
+
+
+def test_index_rebuilt_after_csv_change(tmp_path):
+    path = str(tmp_path / "DB_ConnectLEtoARM.csv")
+    _write_csv(path, ["10.0.0.1,1,\n", "10.0.0.2,,1\n"], mtime_ns=1_000_000_000)
+    first = row_index.load_row_index(path, "IPaddress")
+    assert os.path.exists(row_index.index_path(path))
+
+    # Тот же размер, другое время изменения: смещения прежние, но содержимое другое
+    _write_csv(path, ["10.0.0.2,1,\n", "10.0.0.1,,1\n"], mtime_ns=2_000_000_000)
+    rebuilt = row_index.load_row_index(path, "IPaddress")
+    assert rebuilt["csv_mtime_ns"] == 2_000_000_000
+    assert rebuilt["entries"] != first["entries"]
+    assert row_index.find_records(path, "IPaddress", "10.0.0.1") == [
+        {"IPaddress": "10.0.0.1", "1001": None, "1002": "1"}]
+
+    # Другой размер
+    _write_csv(path, ["10.0.0.3,1,1\n", "10.0.0.1,1,1\n"], mtime_ns=2_000_000_000)
+    assert row_index.find_records(path, "IPaddress", "10.0.0.1") == [
+        {"IPaddress": "10.0.0.1", "1001": "1", "1002": "1"}]
+    with open(row_index.index_path(path), encoding="utf-8") as f:
+        assert json.load(f)["csv_size"] == os.path.getsize(path)
+
+
+def test_index_reused_when_csv_unchanged(tmp_path, monkeypatch):
+    path = str(tmp_path / "DB_ConnectLEtoARM.csv")
+    _write_csv(path, ["10.0.0.1,1,\n"])
+    row_index.load_row_index(path, "IPaddress")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("индекс пересобран без изменения CSV")
+
+    monkeypatch.setattr(row_index, "build_row_index", fail)
+    assert row_index.find_records(path, "IPaddress", "10.0.0.1") == [
+        {"IPaddress": "10.0.0.1", "1001": "1", "1002": None}]
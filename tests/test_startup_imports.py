@@ -0,0 +1,13 @@
+"""Импорт модулей точки входа не загружает пакеты, отложенные до первого использования."""
+
+import importlib.util
+
+from modules import benchmark
+
+
+def test_startup_does_not_load_deferred_packages():
+    # api_client требует requests: без него модуль не импортируется, и проверяются остальные
+    modules = tuple(module for module in benchmark.STARTUP_MODULES
+                    if module != "modules.api_client" or importlib.util.find_spec("requests"))
+    result = benchmark.bench_startup_imports(modules, runs=1)
+    assert result["deferred_loaded"] == [], benchmark.check_startup_imports(result)
@@ -0,0 +1,113 @@
+"""Контейнер v2: конвертация из v1 без потерь, произвольный доступ и проверка подписей."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import data_handler, table_container
+
+ROWS = 100
+
+
+@pytest.fixture(autouse=True)
+def no_popup(monkeypatch):
+    monkeypatch.setattr(data_handler, "show_popup_notification", lambda *args, **kwargs: None)
+
+
+@pytest.fixture
+def key():
+    return os.urandom(32)
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "IPaddress": [f"10.0.{i // 256}.{i % 256}" for i in range(ROWS)],
+        "Name": [f"АРМ «{i}», кабинет {i % 9}" if i % 4 else None for i in range(ROWS)],
+        "Comment": ["" if i % 3 else f"строка\nс переводом {i}" for i in range(ROWS)],
+    })
+
+
+def _expected(df):
+    # Пустые строки и None в обоих форматах читаются как NaN
+    return df.replace("", np.nan).astype(object)
+
+
+def test_v1_v2_round_trip(tmp_path, key, df):
+    v1, v2 = str(tmp_path / "table.csv"), str(tmp_path / "table.v2")
+    data_handler.write_encrypted_csv(df, v1, key, workers=1)
+
+    result = data_handler.convert_encrypted_table(v1, v2, key, format_version=2)
+
+    assert result["rows"] == ROWS
+    assert table_container.is_table_file(v2) and not table_container.is_table_file(v1)
+    from_v1 = data_handler.read_encrypted_csv(v1, key, workers=1).astype(object)
+    from_v2 = table_container.read_table(v2, key)
+    pd.testing.assert_frame_equal(from_v2, from_v1)
+    pd.testing.assert_frame_equal(from_v2, _expected(df))
+    pd.testing.assert_frame_equal(data_handler.read_encrypted_csv(v2, key).astype(object), from_v1)
+
+    # Обратно в v1 на месте
+    data_handler.convert_encrypted_table(v2, v2, key, format_version=1)
+    assert not table_container.is_table_file(v2)
+    pd.testing.assert_frame_equal(data_handler.read_encrypted_csv(v2, key, workers=1).astype(object), from_v1)
+
+
+@pytest.fixture
+def container(tmp_path, key, df):
+    path = str(tmp_path / "table.v2")
+    with open(path, "wb") as f:
+        stats = table_container.write_table(df, f, key, block_rows=16)
+    assert stats["blocks"] == 7
+    return path
+
+
+def test_random_access(container, key, df):
+    expected = _expected(df)
+    with table_container.TableReader(container, key) as reader:
+        rows = reader.read_rows([99, 3, 40, 3], ["IPaddress", "Name"])
+        pd.testing.assert_frame_equal(rows, expected.loc[[99, 3, 40, 3], ["IPaddress", "Name"]].reset_index(drop=True))
+        found = reader.find_rows("IPaddress", "10.0.0.37")
+        pd.testing.assert_frame_equal(found, expected.loc[[37]].reset_index(drop=True))
+        assert reader.find_rows("IPaddress", "10.9.9.9").empty
+        with pytest.raises(IndexError):
+            reader.read_rows([ROWS])
+
+
+def _flip(path, offset):
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        byte = f.read(1)
+        f.seek(offset)
+        f.write(bytes([byte[0] ^ 0x01]))
+
+
+def test_flipped_segment_byte_raises(container, key):
+    with table_container.TableReader(container, key) as reader:
+        offset, length, _ = reader._blocks[2]["segments"][1]
+    _flip(container, offset + length // 2)
+
+    with table_container.TableReader(container, key) as reader:
+        reader.read_block(0)
+        with pytest.raises(ValueError, match="Сегмент 2.1"):
+            reader.read_block(2)
+    with pytest.raises(ValueError):
+        table_container.read_table(container, key)
+
+
+@pytest.mark.parametrize("position", ["footer", "length", "magic"])
+def test_flipped_footer_byte_raises(container, key, position):
+    size = os.path.getsize(container)
+    tail = table_container._FOOTER.size + len(table_container.MAGIC)
+    offset = {"footer": size - tail - 20, "length": size - tail, "magic": size - 1}[position]
+    _flip(container, offset)
+
+    with pytest.raises(ValueError):
+        table_container.TableReader(container, key)
+
+
+def test_wrong_key_raises(container):
+    with pytest.raises(ValueError, match="подписи"):
+        table_container.TableReader(container, os.urandom(32))
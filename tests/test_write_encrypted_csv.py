@@ -0,0 +1,85 @@
+"""Атомарная запись зашифрованного CSV: содержимое, права файла и сбой на середине записи."""
+
+import os
+import stat
+
+import pandas as pd
+import pytest
+
+from modules import data_handler
+
+
+@pytest.fixture
+def key():
+    return os.urandom(32)
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"IPaddress": [f"10.0.0.{i}" for i in range(50)],
+                         "Name": [f"АРМ {i}" if i % 7 else "" for i in range(50)]})
+
+
+@pytest.fixture(autouse=True)
+def no_popup(monkeypatch):
+    monkeypatch.setattr(data_handler, "show_popup_notification", lambda *args, **kwargs: None)
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_round_trip(tmp_path, df, key):
+    path = str(tmp_path / "DB_InfoARM.csv")
+    data_handler.write_encrypted_csv(df, path, key, chunk_rows=16, workers=1)
+
+    result = data_handler.read_encrypted_csv(path, key, workers=1)
+
+    pd.testing.assert_frame_equal(result.fillna(""), df)
+    assert data_handler.read_encrypted_records(path, key) == [
+        {"IPaddress": ip, "Name": name or None} for ip, name in zip(df["IPaddress"], df["Name"])]
+
+
+def test_new_file_mode_follows_umask(tmp_path, df, key):
+    path = str(tmp_path / "DB_InfoARM.csv")
+    umask = os.umask(0o027)
+    try:
+        data_handler.write_encrypted_csv(df, path, key, workers=1)
+    finally:
+        os.umask(umask)
+    assert _mode(path) == 0o640
+
+
+def test_existing_file_mode_preserved(tmp_path, df, key):
+    path = str(tmp_path / "DB_InfoARM.csv")
+    data_handler.write_encrypted_csv(df, path, key, workers=1)
+    os.chmod(path, 0o604)
+
+    data_handler.write_encrypted_csv(df.iloc[:10], path, key, workers=1)
+
+    assert _mode(path) == 0o604
+    assert len(data_handler.read_encrypted_csv(path, key, workers=1)) == 10
+
+
+def test_failure_mid_write_keeps_original(tmp_path, df, key, monkeypatch):
+    path = str(tmp_path / "DB_InfoARM.csv")
+    data_handler.write_encrypted_csv(df, path, key, workers=1)
+    with open(path, "rb") as f:
+        original = f.read()
+
+    real_encrypt = data_handler.encrypt_dataframe
+    calls = []
+
+    def failing_encrypt(df_chunk, aes_key, executor=None):
+        calls.append(len(df_chunk))
+        if len(calls) == 2:
+            raise OSError("диск переполнен")
+        return real_encrypt(df_chunk, aes_key, executor)
+
+    monkeypatch.setattr(data_handler, "encrypt_dataframe", failing_encrypt)
+    with pytest.raises(SystemExit):
+        data_handler.write_encrypted_csv(df, path, key, chunk_rows=16, workers=1)
+
+    with open(path, "rb") as f:
+        assert f.read() == original
+    assert sorted(os.listdir(tmp_path)) == ["DB_InfoARM.csv"]
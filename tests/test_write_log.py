@@ -0,0 +1,103 @@
+"""Фоновая запись лога: файлы по режимам, flush_log, запись при выходе и процессы, созданные fork."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from modules import main_functions
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def logs(tmp_path):
+    paths = {kind: str(tmp_path / f"{kind}.log") for kind in ("all", "last", "error")}
+    for path in paths.values():
+        open(path, "w").close()
+    return paths
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.split("] ", 1)[1] for line in f.read().splitlines()]
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    """Отдельный фоновый писатель, который сам пакет не пишет (только по flush или при закрытии)."""
+    monkeypatch.setattr(main_functions, "LOG_ASYNC", True)
+    monkeypatch.setattr(main_functions, "LOG_FLUSH_INTERVAL_SEC", 3600)
+    writer = main_functions._LogWriter()
+    monkeypatch.setattr(main_functions, "_log_writer", writer)
+    yield writer
+    writer.close()
+
+
+def test_error_log_gets_only_errors(writer, logs):
+    main_functions.write_log("обычное", logs["all"], logs["last"])
+    main_functions.write_log("ошибка", logs["all"], logs["last"], "error", logs["error"])
+    main_functions.write_log("отладка", logs["all"], logs["last"], "debug")
+    main_functions.flush_log()
+
+    assert _lines(logs["all"]) == ["обычное", "ошибка"]
+    assert _lines(logs["last"]) == ["обычное", "ошибка"]
+    assert _lines(logs["error"]) == ["ошибка"]
+
+
+def test_flush_log_drains_queue(writer, logs):
+    for i in range(10):
+        main_functions.write_log(f"запись {i}", logs["all"], logs["last"])
+    assert len(writer._pending) == 10
+    assert _lines(logs["all"]) == []
+
+    main_functions.flush_log()
+
+    assert writer._pending == []
+    assert _lines(logs["all"]) == [f"запись {i}" for i in range(10)]
+
+
+def test_missing_log_file_not_created(writer, logs, tmp_path):
+    missing = str(tmp_path / "missing.log")
+    main_functions.write_log("запись", missing, logs["last"])
+    main_functions.flush_log()
+    assert not os.path.exists(missing)
+    assert _lines(logs["last"]) == ["запись"]
+
+
+def test_atexit_writes_pending(logs):
+    script = (
+        "from modules import main_functions\n"
+        "main_functions.LOG_FLUSH_INTERVAL_SEC = 3600\n"
+        f"for i in range(3):\n"
+        f"    main_functions.write_log(f'запись {{i}}', {logs['all']!r}, {logs['last']!r})\n"
+        "assert main_functions._log_writer._pending\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT_DIR, check=True)
+
+    assert _lines(logs["all"]) == ["запись 0", "запись 1", "запись 2"]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="нет os.fork")
+def test_forked_child_does_not_reuse_parent_writer(writer, logs):
+    main_functions.write_log("родитель до fork", logs["all"], logs["last"])
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            code = 0 if main_functions._get_log_writer() is None else 1
+            main_functions.write_log("потомок", logs["all"], logs["last"])
+            # Обработчик atexit копии писателя не должен записать очередь родителя второй раз
+            writer.close()
+        except BaseException:
+            code = 2
+        os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+
+    # Потомок пишет сразу (синхронно), очередь родителя записывается только родителем
+    assert _lines(logs["all"]) == ["потомок"]
+    assert main_functions._get_log_writer() is writer
+    main_functions.flush_log()
+    assert _lines(logs["all"]) == ["потомок", "родитель до fork"]